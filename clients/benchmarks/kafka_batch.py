@@ -0,0 +1,144 @@
+"""
+Compares KafkaClient throughput polling one record at a time against batch consumption, on
+recorded records replayed by a local stand-in for the confluent_kafka Consumer.
+
+The stand-in charges a fixed cost for every poll()/consume() call and the handler a fixed cost
+for every on_message()/on_messages() call, standing in for the per-call overhead of librdkafka
+and of a writer flush, which is what batching amortises.
+
+Run from the clients directory:
+
+    poetry run python -m benchmarks.kafka_batch --records-per-run 20000 --batch-sizes 10 50 100 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Optional
+
+from clients.kafka import KafkaClient
+from clients.stomp import MessageHandlerInterface, RawMessage
+
+RECORDS_PATH = "tests/fixtures/kafka_records.jsonl"
+
+
+def spin(secs: float) -> None:
+
+    until = time.perf_counter() + secs
+
+    while time.perf_counter() < until:
+        pass
+
+
+class LocalRecord:
+
+    def __init__(self, value: bytes) -> None:
+        self._value = value
+
+    def value(self) -> bytes:
+        return self._value
+
+    def error(self) -> None:
+        return None
+
+
+class LocalConsumer:
+    """Replays records from memory until total records have been handed out."""
+
+    def __init__(self, records: list[bytes], total: int, call_overhead_secs: float) -> None:
+        self._records = [LocalRecord(record) for record in records]
+        self._remaining = total
+        self._call_overhead_secs = call_overhead_secs
+        self._index = 0
+        self.client: Optional[KafkaClient] = None
+
+    def _take(self, count: int) -> list[LocalRecord]:
+
+        spin(self._call_overhead_secs)
+
+        count = min(count, self._remaining)
+        taken = [self._records[(self._index + offset) % len(self._records)] for offset in range(count)]
+
+        self._index += count
+        self._remaining -= count
+
+        if not self._remaining:
+            self.client._running = False  # type: ignore
+
+        return taken
+
+    def poll(self, timeout: float) -> Optional[LocalRecord]:
+        taken = self._take(1)
+        return taken[0] if taken else None
+
+    def consume(self, num_messages: int, timeout: float) -> list[LocalRecord]:
+        return self._take(num_messages)
+
+    def subscribe(self, topics: list[str]) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class CountingHandler(MessageHandlerInterface):
+
+    def __init__(self, call_overhead_secs: float) -> None:
+        self._call_overhead_secs = call_overhead_secs
+        self.count = 0
+
+    def on_message(self, raw_message: RawMessage) -> None:
+        spin(self._call_overhead_secs)
+        raw_message.body["uR"]
+        self.count += 1
+
+    def on_messages(self, raw_messages: list[RawMessage]) -> None:
+        spin(self._call_overhead_secs)
+
+        for raw_message in raw_messages:
+            raw_message.body["uR"]
+
+        self.count += len(raw_messages)
+
+
+def run(records: list[bytes], total: int, batch_size: int, consumer_overhead: float, handler_overhead: float) -> float:
+
+    consumer = LocalConsumer(records, total, consumer_overhead)
+    handler = CountingHandler(handler_overhead)
+    client = KafkaClient(consumer, handler, "topic", {}, fast_decode=True, batch_size=batch_size)  # type: ignore
+    consumer.client = client
+
+    start = time.perf_counter()
+    client.poll_messages()
+    secs = time.perf_counter() - start
+
+    assert handler.count == total
+
+    return total / secs
+
+
+def main() -> None:
+
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--records-per-run", type=int, default=20000)
+    arg_parser.add_argument("--batch-sizes", type=int, nargs="+", default=[10, 50, 100, 500])
+    arg_parser.add_argument("--consumer-overhead-us", type=float, default=5.0, help="Cost of each poll/consume")
+    arg_parser.add_argument("--handler-overhead-us", type=float, default=20.0, help="Cost of each handler call")
+    arg_parser.add_argument("--records", default=RECORDS_PATH, help="JSON lines file of recorded envelopes")
+    args = arg_parser.parse_args()
+
+    with open(args.records, "rb") as f:
+        records = f.read().splitlines()
+
+    overheads = (args.consumer_overhead_us / 1e6, args.handler_overhead_us / 1e6)
+
+    baseline = run(records, args.records_per_run, 1, *overheads)
+    print(f"{'poll, one at a time:':<24}{baseline:,.0f} records/s")
+
+    for batch_size in args.batch_sizes:
+        throughput = run(records, args.records_per_run, batch_size, *overheads)
+        label = f"consume, batch {batch_size}:"
+        print(f"{label:<24}{throughput:,.0f} records/s, speedup {throughput / baseline:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
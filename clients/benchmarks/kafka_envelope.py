@@ -0,0 +1,57 @@
+"""
+Compares the stdlib double-decode Kafka path against the single-decode msgspec envelope path
+on recorded records.
+
+Run from the clients directory:
+
+    poetry run python -m benchmarks.kafka_envelope --number 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import timeit
+
+from clients.stomp import RawMessage
+
+RECORDS_PATH = "tests/fixtures/kafka_records.jsonl"
+
+
+def json_path(records: list[bytes]) -> None:
+    for record in records:
+        RawMessage.create_from_kafka_json(json.loads(record.decode("utf-8"))).body["uR"]
+
+
+def envelope_path(records: list[bytes]) -> None:
+    for record in records:
+        RawMessage.create_from_kafka_bytes(record).body["uR"]
+
+
+def envelope_path_undecoded(records: list[bytes]) -> None:
+    for record in records:
+        RawMessage.create_from_kafka_bytes(record)
+
+
+def main() -> None:
+
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--number", type=int, default=20000)
+    arg_parser.add_argument("--records", default=RECORDS_PATH, help="JSON lines file of recorded envelopes")
+    args = arg_parser.parse_args()
+
+    with open(args.records, "rb") as f:
+        records = f.read().splitlines()
+
+    baseline = timeit.timeit(lambda: json_path(records), number=args.number)
+    count = args.number * len(records)
+
+    print(f"json + json:            {baseline / count * 1e6:.2f}us/record")
+
+    for name, func in [("envelope, body read", envelope_path), ("envelope, body unread", envelope_path_undecoded)]:
+        secs = timeit.timeit(lambda: func(records), number=args.number)
+        print(f"{name + ':':<24}{secs / count * 1e6:.2f}us/record, speedup {baseline / secs:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Compares KafkaClient throughput handling every partition on the poll loop against one worker
+thread per partition, with a handler that waits on I/O for each message, like a database or
+SQS writer.
+
+Run from the clients directory:
+
+    poetry run python -m benchmarks.kafka_partitions --partitions 1 2 4 8 --io-ms 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Optional
+
+from benchmarks.kafka_batch import LocalConsumer, LocalRecord
+from clients.kafka import KafkaClient
+from clients.partitions import PartitionWorkers
+from clients.stomp import MessageHandlerInterface, RawMessage
+
+RECORDS_PATH = "tests/fixtures/kafka_records.jsonl"
+
+
+class PartitionedRecord(LocalRecord):
+
+    def __init__(self, value: bytes, partition: int, offset: int) -> None:
+        super().__init__(value)
+        self._partition = partition
+        self._offset = offset
+
+    def topic(self) -> str:
+        return "topic"
+
+    def partition(self) -> int:
+        return self._partition
+
+    def offset(self) -> int:
+        return self._offset
+
+
+class PartitionedConsumer(LocalConsumer):
+    """Replays records spread round robin over partitions."""
+
+    def __init__(self, records: list[bytes], total: int, partitions: int) -> None:
+        super().__init__(records, total, call_overhead_secs=0.0)
+        self._records = [
+            PartitionedRecord(records[index % len(records)], index % partitions, index // partitions)
+            for index in range(len(records) * partitions)
+        ]
+
+
+class IOBoundHandler(MessageHandlerInterface):
+
+    def __init__(self, io_secs: float) -> None:
+        self._io_secs = io_secs
+
+    def on_message(self, raw_message: RawMessage) -> None:
+        raw_message.body["uR"]
+        time.sleep(self._io_secs)
+
+
+def run(records: list[bytes], total: int, partitions: int, io_secs: float, workers: bool) -> float:
+
+    consumer = PartitionedConsumer(records, total, partitions)
+    handler = IOBoundHandler(io_secs)
+    partition_workers: Optional[PartitionWorkers] = PartitionWorkers(handler) if workers else None
+    client = KafkaClient(consumer, handler, "topic", {}, fast_decode=True, partitions=partition_workers)  # type: ignore
+    consumer.client = client
+
+    start = time.perf_counter()
+    client.poll_messages()  # Drains the partition workers as it disconnects
+
+    return total / (time.perf_counter() - start)
+
+
+def main() -> None:
+
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--records-per-run", type=int, default=1000)
+    arg_parser.add_argument("--partitions", type=int, nargs="+", default=[1, 2, 4, 8])
+    arg_parser.add_argument("--io-ms", type=float, default=2.0, help="Time the handler waits on I/O per message")
+    arg_parser.add_argument("--records", default=RECORDS_PATH, help="JSON lines file of recorded envelopes")
+    args = arg_parser.parse_args()
+
+    with open(args.records, "rb") as f:
+        records = f.read().splitlines()
+
+    io_secs = args.io_ms / 1e3
+
+    for partitions in args.partitions:
+        serial = run(records, args.records_per_run, partitions, io_secs, workers=False)
+        parallel = run(records, args.records_per_run, partitions, io_secs, workers=True)
+
+        print(
+            f"{partitions} partitions: poll loop {serial:,.0f} records/s, "
+            f"partition workers {parallel:,.0f} records/s, speedup {parallel / serial:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,71 @@
+from .aio import AsyncMessageSource, AsyncPipeline, AsyncSinkInterface, ThreadedWriterSink
+from .backpressure import Backpressure, BackpressureMetrics
+from .envelope import KafkaEnvelope, LazyJSONBody
+from .filters import CompiledFilter, FilterStats, IngestFilter
+from .handoff import HandoffMetrics, HandoffQueue, OverflowPolicy
 from .kafka import KafkaClient, KafkaCredentials
+from .metrics import KafkaMetrics, MetricsServer, RollingHistogram
+from .offsets import OffsetTracker
+from .partitions import PartitionWorkers
+from .pool import ProcessPoolHandler
+from .replay import THROUGHPUT_PROFILE, CatchUp, FetchProfile
+from .sequence import SequenceStats, SequenceTracker
 from .stomp import (
     Credentials,
     InvalidCredentials,
     InvalidMessage,
+    LazyXMLBody,
     MessageHandlerInterface,
     RawMessage,
     StompClient,
     StompListener,
     WriterInterface,
 )
+from .supervisor import Backoff, ConnectionSupervisor, ReconnectMetrics
 
 __all__ = [
+    # Asyncio
+    "AsyncMessageSource",
+    "AsyncPipeline",
+    "AsyncSinkInterface",
+    "ThreadedWriterSink",
+    # Flow control
+    "Backpressure",
+    "BackpressureMetrics",
+    # Filtering
+    "CompiledFilter",
+    "FilterStats",
+    "IngestFilter",
     # Kafka
+    "CatchUp",
+    "FetchProfile",
     "KafkaClient",
     "KafkaCredentials",
+    "KafkaEnvelope",
+    "LazyJSONBody",
+    "KafkaMetrics",
+    "MetricsServer",
+    "RollingHistogram",
+    "OffsetTracker",
+    "PartitionWorkers",
+    "THROUGHPUT_PROFILE",
+    # Processing
+    "HandoffMetrics",
+    "HandoffQueue",
+    "OverflowPolicy",
+    "ProcessPoolHandler",
+    # Reconnection
+    "Backoff",
+    "ConnectionSupervisor",
+    "ReconnectMetrics",
+    # Sequencing
+    "SequenceStats",
+    "SequenceTracker",
     # STOMP
     "Credentials",
     "InvalidCredentials",
     "InvalidMessage",
+    "LazyXMLBody",
     "MessageHandlerInterface",
     "RawMessage",
     "StompClient",
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+from .stomp import MessageHandlerInterface, RawMessage, WriterInterface
+
+DEFAULT_QUEUE_SIZE = 1000
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_LINGER_SECS = 0.05
+DEFAULT_MAX_CONCURRENT_WRITES = 8
+
+_END = None
+
+
+class AsyncSinkInterface(ABC):
+
+    @abstractmethod
+    async def write(self, items: list[Any]) -> None: ...
+
+
+class ThreadedWriterSink(AsyncSinkInterface):
+    """
+    Adapts a blocking WriterInterface, running write_batch on a thread so the event loop is free
+    while it waits. With more than one concurrent write the writer must be thread safe.
+    """
+
+    def __init__(self, writer: WriterInterface) -> None:
+        self._writer = writer
+
+    async def write(self, items: list[tuple[dict, str]]) -> None:
+        await asyncio.to_thread(self._writer.write_batch, items)
+
+
+def in_thread(func: Callable[[list[RawMessage]], list]) -> Callable[[list[RawMessage]], Awaitable[list]]:
+    """Wraps a blocking batch function, such as a parser's, to run on a thread."""
+
+    async def run(raw_messages: list[RawMessage]) -> list:
+        return await asyncio.to_thread(func, raw_messages)
+
+    return run
+
+
+class AsyncMessageSource(MessageHandlerInterface):
+    """
+    Message handler bridging a thread based client, KafkaClient or StompClient, to asyncio.
+    Messages are queued for the event loop, blocking the client's thread while the queue is
+    full, and read back with batches().
+
+    Messages are acknowledged by AsyncPipeline once written, so with
+    KafkaClient.create(manual_commit=True) offsets are only committed after the sink.
+    """
+
+    acks_messages = True
+
+    def __init__(self, maxsize: int = DEFAULT_QUEUE_SIZE) -> None:
+        self._maxsize = maxsize
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue[Optional[list[RawMessage]]]] = None
+
+    def _attach(self) -> asyncio.Queue[Optional[list[RawMessage]]]:
+
+        if self._queue is None:
+            self._loop = asyncio.get_running_loop()
+            self._queue = asyncio.Queue(maxsize=self._maxsize)
+
+        return self._queue
+
+    def _put(self, item: Optional[list[RawMessage]]) -> None:
+
+        if self._loop is None or self._queue is None:
+            raise RuntimeError("AsyncMessageSource used before run_client() or batches()")
+
+        asyncio.run_coroutine_threadsafe(self._queue.put(item), self._loop).result()
+
+    def on_message(self, raw_message: RawMessage) -> None:
+        self._put([raw_message])
+
+    def on_messages(self, raw_messages: list[RawMessage]) -> None:
+        self._put(list(raw_messages))
+
+    def close(self) -> None:
+        """Ends batches() once everything queued has been read. Call from a thread other than the loop's."""
+        self._put(_END)
+
+    async def run_client(self, run: Callable[[], None]) -> None:
+        """
+        Runs a client's blocking loop, e.g. KafkaClient.run_with_reconnect, on a thread,
+        ending batches() when it returns.
+        """
+
+        queue = self._attach()
+
+        try:
+            await asyncio.to_thread(run)
+        finally:
+            await queue.put(_END)
+
+    async def batches(
+        self, batch_size: int = DEFAULT_BATCH_SIZE, linger_secs: float = DEFAULT_LINGER_SECS
+    ) -> AsyncIterator[list[RawMessage]]:
+        """Yields batches of at least batch_size messages, or whatever arrived within linger_secs."""
+
+        queue = self._attach()
+        loop = asyncio.get_running_loop()
+
+        while True:
+            item = await queue.get()
+
+            if item is _END:
+                return
+
+            batch = list(item)
+            deadline = loop.time() + linger_secs
+            ended = False
+
+            while len(batch) < batch_size:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+
+                    if remaining <= 0:
+                        break
+
+                    try:
+                        item = await asyncio.wait_for(queue.get(), remaining)
+                    except TimeoutError:
+                        break
+
+                if item is _END:
+                    ended = True
+                    break
+
+                batch.extend(item)
+
+            yield batch
+
+            if ended:
+                return
+
+
+@dataclass
+class PipelineMetrics:
+
+    batches: int = 0
+    messages: int = 0
+    failed_batches: int = 0
+    max_concurrent_writes: int = 0
+
+
+class AsyncPipeline:
+    """
+    Reads batches from an AsyncMessageSource, passes each to process, which may be a coroutine
+    function or a plain function, and writes the results to an AsyncSinkInterface.
+
+    Up to max_concurrent_writes writes run at once, so the network round trips of one batch
+    overlap with reading and processing the next. Writes may therefore finish out of order;
+    each batch is acknowledged once its write finishes, and the offset tracker only commits
+    past a message once everything before it is acknowledged too.
+    """
+
+    def __init__(
+        self,
+        source: AsyncMessageSource,
+        process: Callable[[list[RawMessage]], Any],
+        sink: AsyncSinkInterface,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        linger_secs: float = DEFAULT_LINGER_SECS,
+        max_concurrent_writes: int = DEFAULT_MAX_CONCURRENT_WRITES,
+    ) -> None:
+        self._source = source
+        self._process = process
+        self._sink = sink
+        self._batch_size = batch_size
+        self._linger_secs = linger_secs
+        self._max_concurrent_writes = max_concurrent_writes
+        self._writing = 0
+
+        self.metrics = PipelineMetrics()
+
+    async def run(self) -> None:
+        """Runs until the source ends, then waits for the outstanding writes."""
+
+        writes = asyncio.Semaphore(self._max_concurrent_writes)
+
+        async with asyncio.TaskGroup() as tasks:
+            async for batch in self._source.batches(self._batch_size, self._linger_secs):
+                self.metrics.batches += 1
+                self.metrics.messages += len(batch)
+
+                try:
+                    results = self._process(batch)
+
+                    if inspect.isawaitable(results):
+                        results = await results
+                except Exception as e:
+                    logging.error(f"Error processing batch of {len(batch)} messages: {e}")
+                    self.metrics.failed_batches += 1
+                    self._acknowledge(batch)
+                    continue
+
+                await writes.acquire()
+                tasks.create_task(self._write(results, batch, writes))
+
+    async def _write(self, results: list, batch: list[RawMessage], writes: asyncio.Semaphore) -> None:
+
+        self._writing += 1
+        self.metrics.max_concurrent_writes = max(self.metrics.max_concurrent_writes, self._writing)
+
+        try:
+            if results:
+                await self._sink.write(results)
+        except Exception as e:
+            logging.error(f"Error writing batch of {len(batch)} messages: {e}")
+            self.metrics.failed_batches += 1
+        finally:
+            self._writing -= 1
+            writes.release()
+            self._acknowledge(batch)
+
+    def _acknowledge(self, batch: list[RawMessage]) -> None:
+        for raw_message in batch:
+            raw_message.acknowledge()
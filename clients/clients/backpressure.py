@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+
+@dataclass
+class BackpressureMetrics:
+
+    pauses: int = 0
+    max_pending: int = 0
+    paused_secs: float = 0.0
+
+
+class Backpressure:
+    """
+    Hysteresis on the number of messages handed downstream but not yet done with, such as
+    OffsetTracker.in_flight or a writer's queue depth. update() reports when that passes
+    high_water, so the consumer should pause, and when it falls back to low_water, so it
+    should resume; the gap between the two stops it flapping on every poll.
+    """
+
+    def __init__(self, pending: Callable[[], int], high_water: int, low_water: Optional[int] = None) -> None:
+        self._pending = pending
+        self._high_water = high_water
+        self._low_water = low_water if low_water is not None else high_water // 2
+        self._paused_at: Optional[float] = None
+
+        self.metrics = BackpressureMetrics()
+
+    @property
+    def paused(self) -> bool:
+        return self._paused_at is not None
+
+    def update(self) -> Optional[bool]:
+        """Returns True when the consumer should pause, False when it should resume, and None otherwise."""
+
+        pending = self._pending()
+        self.metrics.max_pending = max(self.metrics.max_pending, pending)
+
+        if self._paused_at is None and pending >= self._high_water:
+            logging.warning(f"{pending} messages pending downstream, pausing consumption")
+
+            self._paused_at = time.monotonic()
+            self.metrics.pauses += 1
+            return True
+
+        if self._paused_at is not None and pending <= self._low_water:
+            paused_secs = time.monotonic() - self._paused_at
+            logging.info(f"{pending} messages pending downstream, resuming consumption after {paused_secs:.1f}s")
+
+            self._paused_at = None
+            self.metrics.paused_secs += paused_secs
+            return False
+
+        return None
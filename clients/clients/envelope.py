@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping
+from typing import Any, Optional
+
+import msgspec
+
+
+class EnvelopeProperty(msgspec.Struct):
+
+    string: Optional[str] = None
+
+
+class EnvelopeProperties(msgspec.Struct):
+
+    PushPortSequence: Optional[EnvelopeProperty] = None
+
+
+class KafkaEnvelope(msgspec.Struct):
+    """
+    The subset of the Kafka JSON envelope the ingest path reads. Every other field, including
+    the bulk of the properties map, is skipped by the decoder without being materialised.
+    """
+
+    payload: str = msgspec.field(name="bytes")
+    message_id: Optional[str] = msgspec.field(name="messageID", default=None)
+    timestamp: Optional[int] = None
+    properties: Optional[EnvelopeProperties] = None
+
+    @property
+    def sequence(self) -> Optional[int]:
+
+        if self.properties is None or self.properties.PushPortSequence is None:
+            return None
+
+        value = self.properties.PushPortSequence.string
+        return int(value) if value else None
+
+    @property
+    def headers(self) -> dict:
+        return {"messageID": self.message_id, "timestamp": self.timestamp}
+
+
+ENVELOPE_DECODER = msgspec.json.Decoder(KafkaEnvelope)
+
+
+class PushPortUpdate(msgspec.Struct):
+    """
+    The uR of a Push Port payload with every child element left as raw JSON, so its element
+    keys can be read without materialising the elements themselves.
+    """
+
+    uR: Optional[dict[str, msgspec.Raw]] = None
+
+
+UPDATE_KEYS_DECODER = msgspec.json.Decoder(PushPortUpdate)
+
+
+class LazyJSONBody(Mapping):
+    """Read-only mapping over a JSON document that is only decoded on first access."""
+
+    def __init__(self, payload: str | bytes) -> None:
+        self._payload = payload
+        self._data: Optional[dict] = None
+
+    @property
+    def data(self) -> dict:
+
+        if self._data is None:
+            self._data = self._decode()
+
+        return self._data
+
+    def _decode(self) -> dict:
+        return msgspec.json.decode(self._payload)
+
+    @property
+    def decoded(self) -> bool:
+        return self._data is not None
+
+    def __getitem__(self, key: str) -> Any:
+        return self.data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __eq__(self, other: object) -> bool:
+        return self.data == other
+
+    def __repr__(self) -> str:
+        name = type(self).__name__
+        return f"{name}({self.data!r})" if self.decoded else f"{name}(<pending>)"
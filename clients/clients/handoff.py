@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import logging
+import pickle
+import queue
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Optional
+
+
+class OverflowPolicy(str, Enum):
+
+    BLOCK = "block"  # Block the producer until a worker frees a slot
+    DROP_OLDEST = "drop_oldest"  # Discard the oldest queued item to make room
+    SPILL = "spill"  # Append to a temporary file, fed back into the queue as it drains
+
+
+@dataclass
+class HandoffMetrics:
+
+    enqueued: int = 0
+    processed: int = 0
+    failed: int = 0
+    dropped: int = 0
+    spilled: int = 0
+    depth: int = 0
+    max_depth: int = 0
+    total_wait_secs: float = 0.0
+    max_wait_secs: float = 0.0
+
+    @property
+    def mean_wait_secs(self) -> float:
+
+        handled = self.processed + self.failed
+
+        return self.total_wait_secs / handled if handled else 0.0
+
+
+class SpillBuffer:
+    """FIFO of pickled items in an anonymous temporary file, rewound whenever it empties."""
+
+    def __init__(self) -> None:
+        self._file = tempfile.TemporaryFile()
+        self._read_offset = 0
+        self._write_offset = 0
+        self.pending = 0
+
+    def append(self, item: Any) -> None:
+
+        self._file.seek(self._write_offset)
+        pickle.dump(item, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._write_offset = self._file.tell()
+        self.pending += 1
+
+    def pop(self) -> Any:
+
+        self._file.seek(self._read_offset)
+        item = pickle.load(self._file)
+        self._read_offset = self._file.tell()
+        self.pending -= 1
+
+        if not self.pending:
+            self._file.seek(0)
+            self._file.truncate()
+            self._read_offset = self._write_offset = 0
+
+        return item
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class HandoffQueue:
+    """
+    Bounded queue handing items from a producer thread, such as the stomp.py receiver thread,
+    to a pool of worker threads running process(item), so slow processing never stalls the
+    producer. What happens when the queue is full is set by the OverflowPolicy; with SPILL,
+    items must be picklable and keep their order across the spill file.
+
+    A single worker processes items in the order they were put; with more than one, items
+    may be processed concurrently and out of order.
+    """
+
+    def __init__(
+        self,
+        process: Callable[[Any], None],
+        maxsize: int = 1000,
+        workers: int = 1,
+        overflow: OverflowPolicy = OverflowPolicy.BLOCK,
+    ) -> None:
+        self._process = process
+        self._overflow = overflow
+        self._queue: queue.Queue[Optional[tuple[float, Any]]] = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._spill = SpillBuffer() if overflow == OverflowPolicy.SPILL else None
+
+        self.metrics = HandoffMetrics()
+
+        self._workers = [
+            threading.Thread(target=self._work, name=f"handoff-worker-{index}", daemon=True) for index in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def _record_depth(self) -> None:
+
+        depth = self._queue.qsize() + (self._spill.pending if self._spill else 0)
+
+        with self._metrics_lock:
+            self.metrics.depth = depth
+            self.metrics.max_depth = max(self.metrics.max_depth, depth)
+
+    def put(self, item: Any) -> None:
+
+        entry = (time.monotonic(), item)
+
+        with self._metrics_lock:
+            self.metrics.enqueued += 1
+
+        if self._overflow == OverflowPolicy.BLOCK:
+            self._queue.put(entry)
+        elif self._overflow == OverflowPolicy.DROP_OLDEST:
+            self._put_dropping_oldest(entry)
+        else:
+            self._put_spilling(entry)
+
+        self._record_depth()
+
+    def _put_dropping_oldest(self, entry: tuple[float, Any]) -> None:
+
+        while True:
+            try:
+                self._queue.put_nowait(entry)
+                return
+            except queue.Full:
+                pass
+
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                continue
+
+            with self._metrics_lock:
+                self.metrics.dropped += 1
+
+    def _put_spilling(self, entry: tuple[float, Any]) -> None:
+
+        with self._lock:
+            # Once anything has spilled, later items follow it so the order is kept
+            if not self._spill.pending:  # type: ignore
+                try:
+                    self._queue.put_nowait(entry)
+                    return
+                except queue.Full:
+                    pass
+
+            self._spill.append(entry)  # type: ignore
+
+        with self._metrics_lock:
+            self.metrics.spilled += 1
+
+    def _refill(self) -> None:
+
+        with self._lock:
+            while self._spill.pending and not self._queue.full():  # type: ignore
+                self._queue.put_nowait(self._spill.pop())  # type: ignore
+
+    def _work(self) -> None:
+
+        while True:
+            entry = self._queue.get()
+
+            if entry is None:
+                return
+
+            if self._spill is not None:
+                self._refill()
+
+            enqueued_at, item = entry
+            wait = time.monotonic() - enqueued_at
+
+            with self._metrics_lock:
+                self.metrics.total_wait_secs += wait
+                self.metrics.max_wait_secs = max(self.metrics.max_wait_secs, wait)
+
+            self._record_depth()
+
+            try:
+                self._process(item)
+            except Exception as e:
+                logging.error(f"Error processing message: {e}")
+
+                with self._metrics_lock:
+                    self.metrics.failed += 1
+            else:
+                with self._metrics_lock:
+                    self.metrics.processed += 1
+
+    def close(self) -> None:
+        """Processes everything already queued or spilled, then stops the workers."""
+
+        if self._spill is not None:
+            while self._spill.pending:
+                time.sleep(0.01)
+
+        for _ in self._workers:
+            self._queue.put(None)
+
+        for worker in self._workers:
+            worker.join()
+
+        if self._spill is not None:
+            self._spill.close()
@@ -5,19 +5,38 @@ import logging
 import os
 import time
 from dataclasses import dataclass
-from typing import Optional
+from typing import Callable, Optional
 
 from confluent_kafka import Consumer, KafkaError, KafkaException
 
-from .stomp import InvalidCredentials, MessageHandlerInterface, RawMessage
+from .backpressure import Backpressure
+from .metrics import DEFAULT_STATS_INTERVAL_MS, KafkaMetrics
+from .offsets import DEFAULT_COMMIT_EVERY_MESSAGES, DEFAULT_COMMIT_INTERVAL_SECS, OffsetTracker
+from .partitions import DEFAULT_PARTITION_QUEUE_SIZE, PartitionWorkers
+from .replay import CatchUp
+from .stomp import (
+    InvalidCredentials,
+    InvalidMessage,
+    MessageHandlerInterface,
+    RawMessage,
+)
+from .supervisor import Backoff, ConnectionSupervisor
 
 
-RECONNECT_DELAY_SECS = 15
 POLL_TIMEOUT_SECS = 1.0
+DEFAULT_BATCH_LINGER_SECS = 0.1  # Longest a partly filled batch waits for more records
 MAX_RECONNECT_ATTEMPTS = 60
 HEARTBEAT_LOG_INTERVAL_SECS = 300  # Log "still connected" every 5 minutes
 
 
+def log_commit(error: Optional[KafkaError], partitions: list) -> None:
+    """on_commit callback reporting the result of asynchronous offset commits."""
+    if error is not None:
+        logging.error(f"Failed to commit offsets: {error}")
+    else:
+        logging.debug(f"Committed offsets: {partitions}")
+
+
 class KafkaClient:
     """
     Kafka client for consuming Darwin PubSub messages via Rail Data Marketplace.
@@ -31,6 +50,15 @@ class KafkaClient:
         message_handler: MessageHandlerInterface,
         topic: str,
         config: dict,
+        fast_decode: bool = False,
+        backoff: Optional[Backoff] = None,
+        batch_size: int = 1,
+        batch_linger_secs: float = DEFAULT_BATCH_LINGER_SECS,
+        offsets: Optional[OffsetTracker] = None,
+        partitions: Optional[PartitionWorkers] = None,
+        backpressure: Optional[Backpressure] = None,
+        metrics: Optional[KafkaMetrics] = None,
+        catch_up: Optional[CatchUp] = None,
     ) -> None:
         self.consumer = consumer
         self._message_handler = message_handler
@@ -40,11 +68,41 @@ class KafkaClient:
         self._running = False
         self._last_heartbeat_log = time.time()
         self._message_count = 0
+        self._fast_decode = fast_decode
+        self._backoff = backoff
+        self.supervisor: Optional[ConnectionSupervisor] = None
+        self._batch_size = batch_size
+        self._batch_linger_secs = batch_linger_secs
+
+        # Set for manual commits, where only acknowledged offsets are committed
+        self._offsets = offsets
+
+        # Set to handle each partition on its own worker thread
+        self._partitions = partitions
+
+        # Set to pause the assigned partitions while too many messages are pending downstream
+        self.backpressure = backpressure
+
+        self.metrics = metrics
+
+        if metrics is not None:
+            self._add_gauges(metrics)
+
+        # Set to replay from a point in time, reading with its fetch profile until caught up
+        self.catch_up = catch_up
+
+        if catch_up is not None:
+            self._batch_size = catch_up.profile.batch_size
+            self._batch_linger_secs = catch_up.profile.batch_linger_secs
+
+        self._live_batch = (batch_size, batch_linger_secs)
 
     def connect(self) -> None:
         """Subscribe to the Kafka topic and mark as connected."""
         try:
-            self.consumer.subscribe([self._topic])
+            self.consumer.subscribe(
+                [self._topic], on_assign=self._on_assign, on_revoke=self._on_revoke, on_lost=self._on_lost
+            )
             self.connected = True
             logging.info(f"Connected and subscribed to topic: {self._topic}")
             print(f"Connected and subscribed to topic: {self._topic}")
@@ -58,6 +116,8 @@ class KafkaClient:
         self._running = False
         self.connected = False
         try:
+            self._drain_partitions()
+            self._commit_offsets(asynchronous=False)
             self.consumer.close()
             logging.info("Disconnected from Kafka")
         except Exception as e:
@@ -67,11 +127,17 @@ class KafkaClient:
         """Recreate the Kafka consumer after a disconnect."""
         try:
             if self.consumer:
+                self._drain_partitions()
+                self._commit_offsets(asynchronous=False)
                 self.consumer.close()
         except Exception as e:
             logging.warning(f"Error closing old consumer: {e}")
 
-        self.consumer = Consumer(self._config)
+        # Anything unacknowledged is redelivered to the new consumer from the last commit
+        if self._offsets is not None:
+            self._offsets.reset()
+
+        self.consumer = Consumer(self._consumer_config())
         self.connected = False
 
     def poll_messages(self) -> None:
@@ -86,25 +152,14 @@ class KafkaClient:
                 # Check connection and log heartbeat
                 self._check_heartbeat()
 
-                msg = self.consumer.poll(timeout=POLL_TIMEOUT_SECS)
-
-                if msg is None:
-                    # No message received within timeout - this is normal
-                    continue
-
-                if msg.error():
-                    if msg.error().code() == KafkaError._PARTITION_EOF:
-                        # End of partition - not an error
-                        logging.debug(f"Reached end of partition: {msg.partition()}")
-                        continue
-                    else:
-                        # Real error
-                        logging.error(f"Kafka error: {msg.error()}")
-                        self.connected = False
-                        raise KafkaException(msg.error())
+                error = self._handle_records(self._receive())
+                self._after_receive()
 
-                # Process the message
-                self._process_message(msg)
+                if error is not None:
+                    # Real error
+                    logging.error(f"Kafka error: {error}")
+                    self.connected = False
+                    raise KafkaException(error)
 
         except KeyboardInterrupt:
             logging.info("Interrupted by user")
@@ -115,51 +170,54 @@ class KafkaClient:
         finally:
             self.disconnect()
 
+    def _reconnect(self) -> None:
+        """Recreate the consumer and resubscribe, for the supervisor to retry."""
+        self._recreate_consumer()
+        self.connect()
+
     def run_with_reconnect(self, max_reconnect_attempts: int = MAX_RECONNECT_ATTEMPTS) -> None:
         """
         Run the client with automatic reconnection on failure.
 
-        This method will continuously try to connect and consume messages,
-        automatically reconnecting if the connection is lost.
+        This method will continuously try to connect and consume messages, reconnecting through
+        the ConnectionSupervisor, with exponential backoff and a fast first retry, whenever the
+        connection is lost.
 
         Args:
             max_reconnect_attempts: Maximum number of consecutive reconnection attempts
                                    before giving up. Set to -1 for infinite retries.
         """
-        reconnect_count = 0
+        self.supervisor = ConnectionSupervisor(self._reconnect, self._backoff, max_reconnect_attempts, name="kafka")
         self._running = True
 
+        try:
+            self.connect()
+        except KafkaException:
+            pass  # Left to the supervisor below
+
         while self._running:
             try:
                 # Connect if not connected
                 if not self.connected:
-                    logging.info(f"Connecting to Kafka... (attempt {reconnect_count + 1})")
-                    print(f"Connecting to Kafka... (attempt {reconnect_count + 1})")
+                    print("Reconnecting to Kafka...")
+
+                    if not self.supervisor.reconnect():
+                        print(f"Failed to reconnect after {max_reconnect_attempts} attempts. Exiting.")
+                        break
 
-                    self.connect()
-                    reconnect_count = 0  # Reset counter on successful connection
                     print("Successfully connected to Kafka")
 
                 # Poll for messages
-                self._running = True
                 while self._running and self.connected:
                     self._check_heartbeat()
 
-                    msg = self.consumer.poll(timeout=POLL_TIMEOUT_SECS)
+                    error = self._handle_records(self._receive())
+                    self._after_receive()
 
-                    if msg is None:
-                        continue
-
-                    if msg.error():
-                        if msg.error().code() == KafkaError._PARTITION_EOF:
-                            logging.debug(f"Reached end of partition: {msg.partition()}")
-                            continue
-                        else:
-                            logging.error(f"Kafka error: {msg.error()}")
-                            self.connected = False
-                            break  # Break to trigger reconnection
-
-                    self._process_message(msg)
+                    if error is not None:
+                        logging.error(f"Kafka error: {error}")
+                        self.connected = False
+                        break  # Break to trigger reconnection
 
             except KeyboardInterrupt:
                 logging.info("Interrupted by user")
@@ -170,57 +228,380 @@ class KafkaClient:
             except Exception as e:
                 logging.error(f"Error in Kafka client: {e}", exc_info=True)
                 self.connected = False
-                reconnect_count += 1
-
-                if max_reconnect_attempts != -1 and reconnect_count >= max_reconnect_attempts:
-                    logging.error(f"Max reconnection attempts ({max_reconnect_attempts}) reached. Giving up.")
-                    print(f"Failed to reconnect after {max_reconnect_attempts} attempts. Exiting.")
-                    break
 
-                logging.info(f"Reconnecting in {RECONNECT_DELAY_SECS} seconds...")
-                print(f"Connection lost. Reconnecting in {RECONNECT_DELAY_SECS} seconds...")
-                time.sleep(RECONNECT_DELAY_SECS)
-
-                # Recreate consumer for clean reconnection
-                self._recreate_consumer()
+            if not self.connected:
+                self.supervisor.disconnected()
 
         # Cleanup
         if self.connected:
             self.disconnect()
 
+    def _receive(self) -> list:
+        """
+        Fetch the next records: a single poll() by default, or in batch mode a consume() that
+        returns once batch_size records have arrived or batch_linger_secs has passed.
+        """
+        if self._batch_size > 1:
+            return self.consumer.consume(num_messages=self._batch_size, timeout=self._batch_linger_secs)
+
+        msg = self.consumer.poll(timeout=POLL_TIMEOUT_SECS)
+
+        return [msg] if msg is not None else []
+
+    def _handle_records(self, records: list) -> Optional[KafkaError]:
+        """
+        Pass records to the message handler, stopping at the first real error, which is returned.
+        Records ahead of the error are still handled.
+        """
+        error = None
+        msgs = []
+
+        for record in records:
+            if record.error():
+                if record.error().code() == KafkaError._PARTITION_EOF:
+                    # End of partition - not an error
+                    logging.debug(f"Reached end of partition: {record.partition()}")
+
+                    if self.catch_up is not None:
+                        self.catch_up.reached_end(record.topic(), record.partition())
+
+                    continue
+
+                error = record.error()
+                break
+
+            if self.catch_up is not None:
+                self.catch_up.observe(record.topic(), record.partition(), record.timestamp()[1])
+
+            msgs.append(record)
+
+        if not msgs and error is None:
+            self._idle()
+
+        # Records arriving show a reconnect has worked, not just that the subscribe went through
+        if msgs and self.supervisor is not None:
+            self.supervisor.healthy()
+
+        if self._batch_size > 1:
+            self._process_messages(msgs)
+        else:
+            for msg in msgs:
+                self._process_message(msg)
+
+        return error
+
+    def _idle(self) -> None:
+
+        try:
+            self._message_handler.on_idle()
+        except Exception as e:
+            logging.error(f"Error in idle handler: {e}")
+
+    def _add_gauges(self, metrics: KafkaMetrics) -> None:
+        """Expose the reconnect, commit and backpressure state alongside the consumer metrics."""
+
+        metrics.add_gauge(
+            "darwin_kafka_reconnects_total",
+            "Reconnections after the connection was lost",
+            lambda: self.supervisor.metrics.reconnects if self.supervisor else None,
+        )
+        metrics.add_gauge("darwin_kafka_connected", "Whether the consumer is connected", lambda: int(self.connected))
+
+        if self._offsets is not None:
+            offsets = self._offsets
+            metrics.add_gauge(
+                "darwin_kafka_unacknowledged",
+                "Messages handed over but not yet acknowledged",
+                lambda: offsets.in_flight,
+            )
+
+        if self.backpressure is not None:
+            backpressure = self.backpressure
+            metrics.add_gauge(
+                "darwin_kafka_paused", "Whether backpressure has paused consumption", lambda: int(backpressure.paused)
+            )
+            metrics.add_gauge(
+                "darwin_kafka_paused_seconds_total",
+                "Time spent paused by backpressure",
+                lambda: backpressure.metrics.paused_secs,
+            )
+
+    def _consumer_config(self) -> dict:
+        """The consumer config, with the catch-up fetch profile applied while replaying."""
+        if self.catch_up is None:
+            return self._config
+
+        return {**self._config, **self.catch_up.profile.config}
+
+    def _after_receive(self) -> None:
+        self._commit_offsets_if_due()
+        self._apply_backpressure()
+
+        if self.catch_up is not None and self.catch_up.caught_up:
+            self._finish_catch_up(self.catch_up)
+
+    def _finish_catch_up(self, catch_up: CatchUp) -> None:
+        """Switch back to the usual batching and fetch settings, which needs a new consumer."""
+        self.catch_up = None
+        self._batch_size, self._batch_linger_secs = self._live_batch
+
+        secs = time.monotonic() - catch_up.started
+        logging.info(f"Caught up after replaying {catch_up.records} records in {secs:.1f}s")
+        print(f"Caught up after replaying {catch_up.records} records in {secs:.1f}s")
+
+        # Processed offsets are committed as the old consumer closes, so the new one carries on from them
+        self._recreate_consumer()
+        self.connect()
+
+    def _on_assign(self, consumer: Consumer, partitions: list) -> None:
+        logging.info(f"Assigned partitions: {[p.partition for p in partitions]}")
+
+        if self.catch_up is not None:
+            consumer.assign(self.catch_up.seek(consumer, partitions))
+
+        # Newly assigned partitions start unpaused
+        if self.backpressure is not None and self.backpressure.paused:
+            consumer.pause(partitions)
+
+    def _apply_backpressure(self) -> None:
+        """
+        Pause or resume the assigned partitions as the backpressure high or low water mark is
+        crossed. Polling carries on while paused, returning nothing, which keeps the consumer
+        in its group rather than stalling past max.poll.interval.ms.
+        """
+        if self.backpressure is None:
+            return
+
+        pause = self.backpressure.update()
+
+        if pause is None:
+            return
+
+        try:
+            if pause:
+                self.consumer.pause(self.consumer.assignment())
+            else:
+                self.consumer.resume(self.consumer.assignment())
+        except KafkaException as e:
+            logging.error(f"Failed to {'pause' if pause else 'resume'} partitions: {e}")
+
+    def _on_revoke(self, consumer: Consumer, partitions: list) -> None:
+        """
+        Rebalance callback run before partitions move to another consumer: stop fetching them,
+        finish handling what was already fetched, then commit so the new owner starts after it.
+        """
+        logging.info(f"Revoking partitions: {[p.partition for p in partitions]}")
+
+        try:
+            consumer.pause(partitions)
+        except KafkaException as e:
+            logging.warning(f"Failed to pause revoked partitions: {e}")
+
+        self._drain_partitions(partitions)
+        self._commit_offsets(asynchronous=False)
+        self._forget_partitions(partitions)
+
+    def _on_lost(self, consumer: Consumer, partitions: list) -> None:
+        """Rebalance callback for partitions already owned elsewhere, so their offsets can't be committed."""
+        logging.warning(f"Lost partitions: {[p.partition for p in partitions]}")
+
+        self._drain_partitions(partitions)
+        self._forget_partitions(partitions)
+
+    def _drain_partitions(self, partitions: Optional[list] = None) -> None:
+        """Wait for the partition workers, of the given partitions or all of them, to finish their queues."""
+        if self._partitions is None:
+            return
+
+        if partitions is None:
+            self._partitions.close()
+        else:
+            self._partitions.revoke([(p.topic, p.partition) for p in partitions])
+
+    def _forget_partitions(self, partitions: list) -> None:
+        if self._offsets is not None:
+            for p in partitions:
+                self._offsets.revoke(p.topic, p.partition)
+
+        if self.catch_up is not None:
+            for p in partitions:
+                self.catch_up.revoke(p.topic, p.partition)
+
+    def _track(self, msg) -> Optional[Callable[[], None]]:
+        """Track a record for manual commits, returning the callable that acknowledges it."""
+        if self._offsets is None:
+            return None
+
+        return self._offsets.track(msg.topic(), msg.partition(), msg.offset())
+
+    def _done_callback(
+        self, raw_message: RawMessage, ack: Optional[Callable[[], None]]
+    ) -> Optional[Callable[[], None]]:
+        """
+        The callable that acknowledges raw_message. For handlers that acknowledge messages
+        themselves, e.g. once a pool or coalescer has written them, latency is recorded then
+        rather than when the message was handed over.
+        """
+
+        metrics = self.metrics
+
+        if metrics is None or not self._message_handler.acks_messages:
+            return ack
+
+        observed = False
+
+        def done() -> None:
+            nonlocal observed
+
+            if not observed:
+                observed = True
+                metrics.acknowledged(raw_message)
+
+            if ack is not None:
+                ack()
+
+        return done
+
+    def _commit_offsets_if_due(self) -> None:
+        if self._offsets is not None and self._offsets.commit_due():
+            self._commit_offsets()
+
+    def _commit_offsets(self, asynchronous: bool = True) -> None:
+        """Commit the offsets of acknowledged records, with failures of async commits logged by on_commit."""
+        if self._offsets is None:
+            return
+
+        offsets = self._offsets.committable()
+
+        if not offsets:
+            return
+
+        try:
+            self.consumer.commit(offsets=offsets, asynchronous=asynchronous)
+        except KafkaException as e:
+            logging.error(f"Failed to commit offsets: {e}")
+
     def _check_heartbeat(self) -> None:
         """Log periodic heartbeat to show the client is still running."""
         current_time = time.time()
         if current_time - self._last_heartbeat_log >= HEARTBEAT_LOG_INTERVAL_SECS:
             logging.info(f"Still connected. Processed {self._message_count} messages.")
             print(f"Still connected. Processed {self._message_count} messages.")
+
+            if self.metrics is not None:
+                logging.info(self.metrics.summary())
+                print(self.metrics.summary())
             self._last_heartbeat_log = current_time
 
+    def _decode_message(self, value: bytes) -> RawMessage:
+        """Decode a record value into a RawMessage using the configured decoding mode."""
+        if self._fast_decode:
+            return RawMessage.create_from_kafka_bytes(value)
+
+        # Parse JSON message
+        value_dict = json.loads(value.decode('utf-8'))
+
+        # Create RawMessage from the JSON data
+        return RawMessage.create_from_kafka_json(value_dict)
+
     def _process_message(self, msg) -> None:
         """Process a single Kafka message."""
+        ack = self._track(msg)
+        handed_over = False
+
         try:
-            # Decode key and value
-            key = msg.key().decode('utf-8') if msg.key() else None
-            value_str = msg.value().decode('utf-8') if msg.value() else None
+            value = msg.value()
 
-            if value_str:
-                # Parse JSON message
-                value_dict = json.loads(value_str)
-                print(value_dict)
+            if value:
+                raw_message = self._decode_message(value)
+                raw_message.ack = self._done_callback(raw_message, ack)
 
-                # # Create RawMessage from the JSON data
-                # raw_message = RawMessage.create_from_kafka_json(value_dict)
+                if self._partitions is not None:
+                    # The partition's worker handles it, and acknowledges it unless the handler does
+                    self._partitions.submit(msg.topic(), msg.partition(), raw_message)
+                    handed_over = True
+                else:
+                    started = time.perf_counter()
 
-                # # Pass to message handler
-                # self._message_handler.on_message(raw_message)
+                    # Pass to message handler
+                    self._message_handler.on_message(raw_message)
+                    handed_over = self._message_handler.acks_messages
+
+                    if self.metrics is not None:
+                        self.metrics.processed([raw_message], time.perf_counter() - started, latency=not handed_over)
 
                 # Increment message count
                 self._message_count += 1
 
         except json.JSONDecodeError as e:
             logging.error(f"Failed to decode JSON message: {e}")
+        except InvalidMessage as e:
+            logging.debug(f"Skipping message: {e}")
         except Exception as e:
             logging.error(f"Error processing message: {e}")
+        finally:
+            # Skipped and failed messages are done with too, so they never hold back the commit
+            if ack is not None and not handed_over:
+                ack()
+
+    def _process_messages(self, msgs: list) -> None:
+        """Decode a batch of Kafka messages and hand them to the message handler in one call."""
+        raw_messages = []
+        by_partition: dict[tuple[str, int], list[RawMessage]] = {}
+
+        for msg in msgs:
+            ack = self._track(msg)
+
+            try:
+                value = msg.value()
+
+                if value:
+                    raw_message = self._decode_message(value)
+                    raw_message.ack = self._done_callback(raw_message, ack)
+                    raw_messages.append(raw_message)
+
+                    if self._partitions is not None:
+                        by_partition.setdefault((msg.topic(), msg.partition()), []).append(raw_message)
+
+                    continue
+
+            except json.JSONDecodeError as e:
+                logging.error(f"Failed to decode JSON message: {e}")
+            except InvalidMessage as e:
+                logging.debug(f"Skipping message: {e}")
+            except Exception as e:
+                logging.error(f"Error processing message: {e}")
+
+            if ack is not None:
+                ack()
+
+        if not raw_messages:
+            return
+
+        if self._partitions is not None:
+            for (topic, partition), partition_messages in by_partition.items():
+                self._partitions.submit(topic, partition, partition_messages)
+
+            self._message_count += len(raw_messages)
+            return
+
+        handed_over = False
+        started = time.perf_counter()
+
+        try:
+            self._message_handler.on_messages(raw_messages)
+            handed_over = self._message_handler.acks_messages
+
+            if self.metrics is not None:
+                self.metrics.processed(raw_messages, time.perf_counter() - started, latency=not handed_over)
+        except Exception as e:
+            logging.error(f"Error processing batch of {len(raw_messages)} messages: {e}")
+        finally:
+            if not handed_over:
+                for raw_message in raw_messages:
+                    raw_message.acknowledge()
+
+        self._message_count += len(raw_messages)
 
     @classmethod
     def create(
@@ -232,6 +613,19 @@ class KafkaClient:
         message_handler: MessageHandlerInterface,
         ssl_ca_location: Optional[str] = None,
         group_id: Optional[str] = None,
+        fast_decode: bool = False,
+        backoff: Optional[Backoff] = None,
+        batch_size: int = 1,
+        batch_linger_secs: float = DEFAULT_BATCH_LINGER_SECS,
+        manual_commit: bool = False,
+        commit_every_messages: int = DEFAULT_COMMIT_EVERY_MESSAGES,
+        commit_interval_secs: float = DEFAULT_COMMIT_INTERVAL_SECS,
+        partition_workers: bool = False,
+        partition_queue_size: int = DEFAULT_PARTITION_QUEUE_SIZE,
+        max_pending: int = 0,
+        resume_pending: Optional[int] = None,
+        metrics: Optional[KafkaMetrics] = None,
+        catch_up: Optional[CatchUp] = None,
     ) -> KafkaClient:
         """
         Create a new KafkaClient instance.
@@ -244,6 +638,25 @@ class KafkaClient:
             message_handler: Handler for processing messages
             ssl_ca_location: Path to CA certificate bundle (optional, uses system default if not provided)
             group_id: Consumer group ID (optional, uses username if not provided)
+            fast_decode: Decode records with the single-pass msgspec envelope decoder, deferring
+                         decoding of the Push Port payload until it is accessed
+            backoff: Reconnection backoff policy (optional, uses the Backoff defaults if not provided)
+            batch_size: Records to consume per call, handed to MessageHandlerInterface.on_messages
+                        as one batch when greater than 1. The default polls one record at a time
+            batch_linger_secs: Longest to wait for a batch to fill before handing over what arrived
+            manual_commit: Commit offsets only once messages are acknowledged (see RawMessage.acknowledge),
+                           asynchronously and in batches, instead of auto-committing on receipt
+            commit_every_messages: With manual_commit, commit once this many messages are acknowledged
+            commit_interval_secs: With manual_commit, commit at least this often while messages are acknowledged
+            partition_workers: Handle each assigned partition on its own thread, keeping the order within
+                               a partition. The message handler must be thread safe
+            partition_queue_size: With partition_workers, messages queued per partition before polling blocks
+            max_pending: With manual_commit, pause the assigned partitions once this many messages are
+                         unacknowledged. Keep it below any queue that blocks polling when full
+            resume_pending: Resume once no more than this many are unacknowledged (default max_pending // 2)
+            metrics: Collect lag, throughput and latency metrics into this, including librdkafka statistics
+            catch_up: Replay from CatchUp.since with its fetch profile, switching back to the settings
+                      above once within CatchUp's head_secs of the head of every partition
 
         Returns:
             KafkaClient instance
@@ -256,7 +669,7 @@ class KafkaClient:
             'sasl.username': username,
             'sasl.password': password,
             'auto.offset.reset': 'earliest',
-            'enable.auto.commit': True,
+            'enable.auto.commit': not manual_commit,
             'session.timeout.ms': 45000,
             'heartbeat.interval.ms': 3000,
         }
@@ -272,18 +685,43 @@ class KafkaClient:
             config['group.id'] = username
             logging.info(f"Using username as consumer group ID: {username}")
 
+        if manual_commit:
+            config['on_commit'] = log_commit
+
         # Add SSL CA location if provided
         if ssl_ca_location:
             config['ssl.ca.location'] = ssl_ca_location
 
-        # Create consumer
-        consumer = Consumer(config)
+        if metrics is not None:
+            config['statistics.interval.ms'] = DEFAULT_STATS_INTERVAL_MS
+            config['stats_cb'] = metrics.on_stats
+
+        if max_pending and not manual_commit:
+            raise ValueError("max_pending counts unacknowledged messages, so needs manual_commit")
+
+        offsets = OffsetTracker(commit_every_messages, commit_interval_secs) if manual_commit else None
+        backpressure = None
+
+        if offsets is not None and max_pending:
+            backpressure = Backpressure(lambda: offsets.in_flight, max_pending, resume_pending)
+
+        # Create consumer, with the catch-up fetch profile while replaying
+        consumer = Consumer({**config, **catch_up.profile.config} if catch_up else config)
 
         return cls(
             consumer=consumer,
             message_handler=message_handler,
             topic=topic,
             config=config,
+            fast_decode=fast_decode,
+            backoff=backoff,
+            batch_size=batch_size,
+            batch_linger_secs=batch_linger_secs,
+            offsets=offsets,
+            partitions=PartitionWorkers(message_handler, partition_queue_size, metrics) if partition_workers else None,
+            backpressure=backpressure,
+            metrics=metrics,
+            catch_up=catch_up,
         )
 
 
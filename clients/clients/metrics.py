@@ -0,0 +1,360 @@
+from __future__ import annotations
+
+import json
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+from .stomp import RawMessage
+
+DEFAULT_WINDOW_SECS = 60
+DEFAULT_METRICS_PORT = 9108
+DEFAULT_STATS_INTERVAL_MS = 5000
+
+# Upper bounds, in seconds, of the latency buckets
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# The Push Port ts is the first key of the Kafka JSON payload, and follows the namespaces on Pport
+PUSH_PORT_TS = re.compile(rb'(?:"ts":"|\sts=")([^"]+)"')
+PUSH_PORT_TS_SEARCH_BYTES = 2048
+
+
+def push_port_ts(raw_message: RawMessage) -> Optional[datetime]:
+    """The Push Port ts of a message, found in the raw payload where there is one so the body isn't decoded."""
+
+    payload = raw_message.payload
+
+    try:
+        if payload is not None:
+            head = payload[:PUSH_PORT_TS_SEARCH_BYTES]
+            match = PUSH_PORT_TS.search(head.encode() if isinstance(head, str) else head)
+            return datetime.fromisoformat(match.group(1).decode()) if match else None
+
+        body = raw_message.body
+        ts = body["Pport"]["@ts"] if "Pport" in body else body.get("ts")
+        return datetime.fromisoformat(ts) if ts else None
+
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+@dataclass
+class _Slot:
+
+    second: int
+    counts: list[int]
+    total: float = 0.0
+
+
+class RollingHistogram:
+    """
+    Histogram of the observations made in the last window_secs, kept as one slot of bucket counts
+    per second so old observations fall out without storing them individually. Quantiles are
+    estimated from the bucket bounds.
+    """
+
+    def __init__(
+        self,
+        buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+        window_secs: int = DEFAULT_WINDOW_SECS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._buckets = buckets
+        self._window_secs = window_secs
+        self._clock = clock
+        self._slots: deque[_Slot] = deque()
+        self._lock = threading.Lock()
+
+    def _expire(self, second: int) -> None:
+        while self._slots and self._slots[0].second <= second - self._window_secs:
+            self._slots.popleft()
+
+    def observe(self, value: float) -> None:
+
+        second = int(self._clock())
+
+        with self._lock:
+            self._expire(second)
+
+            if not self._slots or self._slots[-1].second != second:
+                # The last bucket is for anything beyond the largest bound
+                self._slots.append(_Slot(second, [0] * (len(self._buckets) + 1)))
+
+            slot = self._slots[-1]
+            slot.counts[bisect_left(self._buckets, value)] += 1
+            slot.total += value
+
+    def snapshot(self) -> tuple[list[int], float]:
+        """Bucket counts and the sum of the observations in the window."""
+
+        with self._lock:
+            self._expire(int(self._clock()))
+
+            counts = [0] * (len(self._buckets) + 1)
+            total = 0.0
+
+            for slot in self._slots:
+                counts = [count + slot_count for count, slot_count in zip(counts, slot.counts)]
+                total += slot.total
+
+        return counts, total
+
+    def quantile(self, q: float, counts: Optional[list[int]] = None) -> Optional[float]:
+        """Upper bound of the bucket holding quantile q, or None without observations."""
+
+        counts = counts if counts is not None else self.snapshot()[0]
+        total = sum(counts)
+
+        if not total:
+            return None
+
+        rank = q * total
+        seen = 0
+
+        for index, count in enumerate(counts):
+            seen += count
+
+            if seen >= rank:
+                return self._buckets[index] if index < len(self._buckets) else float("inf")
+
+        return float("inf")
+
+
+class RollingCounter:
+    """Count of events in the last window_secs, for a rate."""
+
+    def __init__(self, window_secs: int = DEFAULT_WINDOW_SECS, clock: Callable[[], float] = time.monotonic) -> None:
+        self._window_secs = window_secs
+        self._clock = clock
+        self._slots: deque[list[int]] = deque()
+        self._lock = threading.Lock()
+
+    def _expire(self, second: int) -> None:
+        while self._slots and self._slots[0][0] <= second - self._window_secs:
+            self._slots.popleft()
+
+    def add(self, count: int = 1) -> None:
+
+        second = int(self._clock())
+
+        with self._lock:
+            self._expire(second)
+
+            if not self._slots or self._slots[-1][0] != second:
+                self._slots.append([second, 0])
+
+            self._slots[-1][1] += count
+
+    def rate(self) -> float:
+
+        with self._lock:
+            self._expire(int(self._clock()))
+            return sum(count for _, count in self._slots) / self._window_secs
+
+
+@dataclass
+class PartitionStats:
+
+    consumer_lag: int = -1
+    committed_offset: int = -1
+    high_watermark: int = -1
+    fetch_queue_count: int = 0
+
+
+@dataclass
+class KafkaMetrics:
+    """
+    Metrics for KafkaClient: librdkafka statistics via on_stats (its stats_cb), per-partition lag
+    and offsets, records per second, and rolling histograms of handler time and end-to-end latency,
+    from the Push Port ts to a message being done with: the handler returning, or for handlers
+    that acknowledge messages themselves, the acknowledgement. render() formats them for Prometheus.
+    """
+
+    window_secs: int = DEFAULT_WINDOW_SECS
+    records: int = 0
+    stats_updates: int = 0
+    partitions: dict[tuple[str, int], PartitionStats] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self.rate = RollingCounter(self.window_secs)
+        self.latency = RollingHistogram(window_secs=self.window_secs)
+        self.handler_time = RollingHistogram(window_secs=self.window_secs)
+        self._gauges: dict[str, tuple[str, Callable[[], Optional[float]]]] = {}
+        self._lock = threading.Lock()
+
+    def add_gauge(self, name: str, description: str, value: Callable[[], Optional[float]]) -> None:
+        """Adds a gauge read when rendering, e.g. for reconnects or backpressure."""
+        self._gauges[name] = (description, value)
+
+    def processed(self, raw_messages: list[RawMessage], handler_secs: float, latency: bool = True) -> None:
+        """
+        Records messages the handler has returned from. Pass latency=False when it acknowledges
+        them later, and call acknowledged() for each once it does.
+        """
+
+        with self._lock:
+            self.records += len(raw_messages)
+
+        self.rate.add(len(raw_messages))
+        self.handler_time.observe(handler_secs)
+
+        if latency:
+            self._observe_latency(raw_messages)
+
+    def acknowledged(self, raw_message: RawMessage) -> None:
+        self._observe_latency([raw_message])
+
+    def _observe_latency(self, raw_messages: list[RawMessage]) -> None:
+
+        now = datetime.now().astimezone()
+
+        for raw_message in raw_messages:
+            ts = push_port_ts(raw_message)
+
+            if ts is not None:
+                self.latency.observe(max(0.0, (now - ts).total_seconds()))
+
+    def on_stats(self, stats_json: str) -> None:
+        """librdkafka stats_cb, called from poll() every statistics.interval.ms."""
+
+        try:
+            stats = json.loads(stats_json)
+        except ValueError as e:
+            logging.warning(f"Unable to parse Kafka statistics: {e}")
+            return
+
+        partitions = {}
+
+        for topic, topic_stats in stats.get("topics", {}).items():
+            for partition, partition_stats in topic_stats.get("partitions", {}).items():
+
+                # -1 is librdkafka's internal unassigned partition
+                if partition == "-1" or partition_stats.get("fetch_state") == "none":
+                    continue
+
+                partitions[(topic, int(partition))] = PartitionStats(
+                    consumer_lag=partition_stats.get("consumer_lag", -1),
+                    committed_offset=partition_stats.get("committed_offset", -1),
+                    high_watermark=partition_stats.get("hi_offset", -1),
+                    fetch_queue_count=partition_stats.get("fetchq_cnt", 0),
+                )
+
+        with self._lock:
+            self.partitions = partitions
+            self.stats_updates += 1
+
+    @property
+    def total_lag(self) -> int:
+        return sum(stats.consumer_lag for stats in self.partitions.values() if stats.consumer_lag > 0)
+
+    def summary(self) -> str:
+
+        latency = self.latency.quantile(0.95)
+        latency_text = f"{latency}s" if latency is not None else "n/a"
+
+        return (
+            f"Processed {self.records} records, {self.rate.rate():.1f}/s, "
+            f"lag {self.total_lag}, p95 latency <= {latency_text}"
+        )
+
+    def _render_histogram(self, lines: list[str], name: str, description: str, histogram: RollingHistogram) -> None:
+
+        counts, total = histogram.snapshot()
+
+        lines.append(f"# HELP {name} {description}, over the last {self.window_secs}s")
+        lines.append(f"# TYPE {name} summary")
+
+        for q in QUANTILES:
+            value = histogram.quantile(q, counts)
+            lines.append(f'{name}{{quantile="{q}"}} {value if value is not None else "NaN"}')
+
+        lines.append(f"{name}_sum {total}")
+        lines.append(f"{name}_count {sum(counts)}")
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+
+        lines = [
+            "# HELP darwin_kafka_records_total Records handed to the message handler",
+            "# TYPE darwin_kafka_records_total counter",
+            f"darwin_kafka_records_total {self.records}",
+            f"# HELP darwin_kafka_records_per_second Records per second, over the last {self.window_secs}s",
+            "# TYPE darwin_kafka_records_per_second gauge",
+            f"darwin_kafka_records_per_second {self.rate.rate()}",
+        ]
+
+        partition_gauges = [
+            ("darwin_kafka_consumer_lag", "Messages behind the high watermark", "consumer_lag"),
+            ("darwin_kafka_committed_offset", "Last committed offset", "committed_offset"),
+            ("darwin_kafka_high_watermark", "Partition high watermark", "high_watermark"),
+            ("darwin_kafka_fetch_queue", "Messages fetched but not yet consumed", "fetch_queue_count"),
+        ]
+
+        for name, description, attribute in partition_gauges:
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} gauge")
+
+            for (topic, partition), stats in sorted(self.partitions.items()):
+                lines.append(f'{name}{{topic="{topic}",partition="{partition}"}} {getattr(stats, attribute)}')
+
+        self._render_histogram(
+            lines, "darwin_latency_seconds", "Time from the Push Port ts to the message being done with", self.latency
+        )
+        self._render_histogram(lines, "darwin_handler_seconds", "Time spent in the message handler", self.handler_time)
+
+        for name, (description, value) in self._gauges.items():
+            current = value()
+
+            if current is not None:
+                lines.extend([f"# HELP {name} {description}", f"# TYPE {name} gauge", f"{name} {current}"])
+
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serves KafkaMetrics.render() at /metrics from a daemon thread, for Prometheus to scrape."""
+
+    def __init__(self, metrics: KafkaMetrics, port: int = DEFAULT_METRICS_PORT, host: str = "127.0.0.1") -> None:
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self) -> None:
+
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+
+                body = metrics.render().encode()
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                logging.debug(format % args)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def start(self) -> MetricsServer:
+        self._thread.start()
+        logging.info(f"Serving metrics on http://{self._server.server_address[0]}:{self.port}/metrics")
+        return self
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
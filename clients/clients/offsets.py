@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+from confluent_kafka import TopicPartition
+
+DEFAULT_COMMIT_EVERY_MESSAGES = 1000
+DEFAULT_COMMIT_INTERVAL_SECS = 5.0
+
+
+class OffsetTracker:
+    """
+    Tracks the records handed to a message handler and which of them have been acknowledged,
+    so only offsets below the oldest unacknowledged record in each partition are committed.
+    Acknowledgements may arrive out of order and from any thread.
+
+    A commit is due once commit_every_messages records have been acknowledged since the last
+    one, or commit_interval_secs has passed with anything acknowledged, so a busy feed does not
+    pay for one commit round trip per message.
+    """
+
+    def __init__(
+        self,
+        commit_every_messages: int = DEFAULT_COMMIT_EVERY_MESSAGES,
+        commit_interval_secs: float = DEFAULT_COMMIT_INTERVAL_SECS,
+    ) -> None:
+        self._commit_every_messages = commit_every_messages
+        self._commit_interval_secs = commit_interval_secs
+
+        self._lock = threading.Lock()
+        self._pending: dict[tuple[str, int], deque[int]] = {}
+        self._acked: dict[tuple[str, int], set[int]] = {}
+        self._next_offsets: dict[tuple[str, int], int] = {}
+        self._acked_since_commit = 0
+        self._last_commit = time.monotonic()
+
+    def track(self, topic: str, partition: int, offset: int) -> Callable[[], None]:
+        """Records that offset was handed to the handler, returning the callable that acknowledges it."""
+
+        key = (topic, partition)
+
+        with self._lock:
+            self._pending.setdefault(key, deque()).append(offset)
+            self._acked.setdefault(key, set())
+
+        return lambda: self.ack(topic, partition, offset)
+
+    def ack(self, topic: str, partition: int, offset: int) -> None:
+
+        key = (topic, partition)
+
+        with self._lock:
+            pending = self._pending.get(key)
+
+            # Dropped by reset() or revoke() since it was tracked, or already acknowledged
+            if not pending or offset < pending[0]:
+                return
+
+            acked = self._acked[key]
+            acked.add(offset)
+            self._acked_since_commit += 1
+
+            while pending and pending[0] in acked:
+                acked.discard(pending[0])
+                self._next_offsets[key] = pending.popleft() + 1
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return sum(len(pending) for pending in self._pending.values())
+
+    def commit_due(self) -> bool:
+
+        with self._lock:
+            if not self._next_offsets:
+                return False
+
+            return (
+                self._acked_since_commit >= self._commit_every_messages
+                or time.monotonic() - self._last_commit >= self._commit_interval_secs
+            )
+
+    def committable(self) -> list[TopicPartition]:
+        """Takes the offsets to commit, the next offset to read in each partition that has advanced."""
+
+        with self._lock:
+            offsets = [
+                TopicPartition(topic, partition, offset) for (topic, partition), offset in self._next_offsets.items()
+            ]
+
+            self._next_offsets = {}
+            self._acked_since_commit = 0
+            self._last_commit = time.monotonic()
+
+        return offsets
+
+    def revoke(self, topic: str, partition: int) -> None:
+        """Forgets a partition, e.g. once it has been reassigned to another consumer."""
+
+        key = (topic, partition)
+
+        with self._lock:
+            self._pending.pop(key, None)
+            self._acked.pop(key, None)
+            self._next_offsets.pop(key, None)
+
+    def reset(self) -> None:
+        """Forgets everything, e.g. when the consumer is recreated and records will be redelivered."""
+
+        with self._lock:
+            self._pending = {}
+            self._acked = {}
+            self._next_offsets = {}
+            self._acked_since_commit = 0
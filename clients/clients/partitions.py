@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from typing import Iterable, Optional
+
+from .metrics import KafkaMetrics
+from .stomp import InvalidMessage, MessageHandlerInterface, RawMessage
+
+DEFAULT_PARTITION_QUEUE_SIZE = 1000
+
+_STOP = None
+
+
+class PartitionWorker:
+    """Thread handling the messages of one partition, in the order they were submitted."""
+
+    def __init__(
+        self, handler: MessageHandlerInterface, name: str, maxsize: int, metrics: Optional[KafkaMetrics] = None
+    ) -> None:
+        self._handler = handler
+        self._metrics = metrics
+        self._queue: queue.Queue[Optional[RawMessage | list[RawMessage]]] = queue.Queue(maxsize=maxsize)
+        self._thread = threading.Thread(target=self._work, name=name, daemon=True)
+        self._thread.start()
+
+        self.processed = 0
+
+    def put(self, item: RawMessage | list[RawMessage]) -> None:
+        self._queue.put(item)
+
+    def _handle(self, item: RawMessage | list[RawMessage]) -> None:
+
+        started = time.perf_counter()
+
+        try:
+            if isinstance(item, list):
+                self._handler.on_messages(item)
+            else:
+                self._handler.on_message(item)
+
+            # As KafkaClient records them when it calls the handler itself
+            if self._metrics is not None:
+                self._metrics.processed(
+                    item if isinstance(item, list) else [item],
+                    time.perf_counter() - started,
+                    latency=not self._handler.acks_messages,
+                )
+        except InvalidMessage as e:
+            logging.debug(f"Skipping message: {e}")
+        except Exception as e:
+            logging.error(f"Error processing message: {e}")
+
+        # As in KafkaClient, unless the handler acknowledges messages itself they are done with here
+        if not self._handler.acks_messages:
+            for raw_message in item if isinstance(item, list) else [item]:
+                raw_message.acknowledge()
+
+        self.processed += len(item) if isinstance(item, list) else 1
+
+    def _work(self) -> None:
+
+        while True:
+            item = self._queue.get()
+
+            if item is _STOP:
+                return
+
+            self._handle(item)
+
+    def stop(self) -> None:
+        """Stops the thread once everything already submitted has been handled."""
+        self._queue.put(_STOP)
+
+    def join(self) -> None:
+        self._thread.join()
+
+
+class PartitionWorkers:
+    """
+    Hands the messages of each assigned Kafka partition to a worker thread of its own, so
+    partitions are handled in parallel while messages within a partition keep their order.
+    Worth it when the handler spends its time waiting on I/O, such as a database or SQS
+    writer; the handler is called from several threads at once so must be thread safe.
+
+    Workers are started on a partition's first message, and drained on revoke(), which
+    KafkaClient calls from its rebalance callbacks before committing offsets.
+    Each worker queues up to maxsize submissions, blocking the poll loop when full, and records
+    what it handles into metrics if given.
+    """
+
+    def __init__(
+        self,
+        handler: MessageHandlerInterface,
+        maxsize: int = DEFAULT_PARTITION_QUEUE_SIZE,
+        metrics: Optional[KafkaMetrics] = None,
+    ) -> None:
+        self._handler = handler
+        self._maxsize = maxsize
+        self._metrics = metrics
+        self._workers: dict[tuple[str, int], PartitionWorker] = {}
+
+    def submit(self, topic: str, partition: int, item: RawMessage | list[RawMessage]) -> None:
+        """Queues a message, or a batch for on_messages, for the partition's worker."""
+
+        key = (topic, partition)
+        worker = self._workers.get(key)
+
+        if worker is None:
+            worker = PartitionWorker(self._handler, f"partition-{topic}-{partition}", self._maxsize, self._metrics)
+            self._workers[key] = worker
+
+        worker.put(item)
+
+    @property
+    def partitions(self) -> list[tuple[str, int]]:
+        return list(self._workers)
+
+    def revoke(self, partitions: Iterable[tuple[str, int]]) -> None:
+        """Drains and stops the workers of partitions that are no longer assigned."""
+
+        workers = [self._workers.pop(key) for key in partitions if key in self._workers]
+
+        # Stopped together so the partitions drain in parallel
+        for worker in workers:
+            worker.stop()
+
+        for worker in workers:
+            worker.join()
+
+    def close(self) -> None:
+        self.revoke(self.partitions)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import replace
+from typing import Any, Callable, Optional
+
+from .stomp import InvalidMessage, MessageHandlerInterface, RawMessage
+
+DEFAULT_MAX_IN_FLIGHT = 1024
+
+_STOP = None
+
+
+class ProcessPoolHandler(MessageHandlerInterface):
+    """
+    Message handler that fans decoding and parsing out over a process pool, so bursts are not
+    capped at the one core running the STOMP receiver thread or the Kafka poll loop.
+
+    Each RawMessage is handed to process(raw_message) in a worker, and results are passed to
+    on_result on a single delivery thread in the order the messages arrived. Arrival order is
+    kept across all messages rather than per rid, as the rids are only known once a message has
+    been decoded, which still guarantees updates for the same train are never reordered.
+
+    Use it with lazy bodies (StompClient.create(lazy_xml=True) or KafkaClient(fast_decode=True))
+    so the XML/JSON decode runs in the workers. process, and the RawMessage body, must be
+    picklable, so LazyFormattedMessage results and lambda predicates are not supported.
+
+    Messages are acknowledged once on_result has been called for them, so with
+    KafkaClient.create(manual_commit=True) offsets are only committed after delivery. With
+    passes_messages, on_result is called as on_result(result, raw_message) and acknowledges the
+    message itself, e.g. once output it holds back has been written.
+    """
+
+    acks_messages = True
+
+    def __init__(
+        self,
+        process: Callable[[RawMessage], Any],
+        on_result: Callable[..., None],
+        workers: Optional[int] = None,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        executor: Optional[Executor] = None,
+        passes_messages: bool = False,
+    ) -> None:
+        self._process = process
+        self._on_result = on_result
+        self._passes_messages = passes_messages
+        self._executor = executor or ProcessPoolExecutor(max_workers=workers)
+
+        # Bounds the messages submitted but not yet delivered, blocking the receiver when full
+        self._pending: queue.Queue[Optional[tuple[Future, RawMessage]]] = queue.Queue(maxsize=max_in_flight)
+
+        self._delivery = threading.Thread(target=self._deliver, name="process-pool-delivery", daemon=True)
+        self._delivery.start()
+
+    def on_message(self, raw_message: RawMessage) -> None:
+
+        # The ack stays in this process, it refers to the client's offset tracker
+        future = self._executor.submit(self._process, replace(raw_message, ack=None))
+        self._pending.put((future, raw_message))
+
+    def _deliver(self) -> None:
+
+        while True:
+            pending = self._pending.get()
+
+            if pending is _STOP:
+                return
+
+            future, raw_message = pending
+
+            try:
+                if self._passes_messages:
+                    self._on_result(future.result(), raw_message)
+                    continue
+
+                self._on_result(future.result())
+            except InvalidMessage as e:
+                logging.debug(f"Skipping message: {e}")
+            except Exception as e:
+                logging.error(f"Error processing message: {e}")
+
+            raw_message.acknowledge()
+
+    def close(self) -> None:
+        """Delivers everything already submitted, then shuts the pool down."""
+
+        self._pending.put(_STOP)
+        self._delivery.join()
+        self._executor.shutdown()
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+from confluent_kafka import OFFSET_END, Consumer, TopicPartition
+
+DEFAULT_HEAD_SECS = 30.0
+OFFSETS_FOR_TIMES_TIMEOUT_SECS = 10.0
+
+
+@dataclass(frozen=True)
+class FetchProfile:
+    """Consumer settings tuned for a kind of read, applied on top of the client's own config."""
+
+    batch_size: int
+    batch_linger_secs: float
+    config: dict = field(default_factory=dict)
+
+
+# Fetch large batches, waiting for them to fill, to read a backlog as fast as possible
+THROUGHPUT_PROFILE = FetchProfile(
+    batch_size=500,
+    batch_linger_secs=0.5,
+    config={
+        'fetch.min.bytes': 1024 * 1024,
+        'fetch.wait.max.ms': 500,
+        'max.partition.fetch.bytes': 8 * 1024 * 1024,
+        'fetch.max.bytes': 64 * 1024 * 1024,
+        'queued.max.messages.kbytes': 256 * 1024,
+        # Reports the end of each partition, which is how partitions with little to replay catch up
+        'enable.partition.eof': True,
+    },
+)
+
+
+class CatchUp:
+    """
+    Replays a topic from a wall-clock time after downtime. seek() moves each newly assigned
+    partition to the first offset at or after since, found with offsets_for_times, and the
+    client reads with profile until every partition it seeked is within head_secs of its head,
+    when caught_up turns true and the client switches back to its usual settings.
+
+    A partition counts as at its head once a record no older than head_secs arrives from it,
+    or its end is reached, so partitions with nothing to replay never hold the switch back.
+    Revoked partitions are forgotten, as their new owner replays them.
+    """
+
+    def __init__(
+        self, since: datetime, head_secs: float = DEFAULT_HEAD_SECS, profile: FetchProfile = THROUGHPUT_PROFILE
+    ) -> None:
+        self.since = since
+        self.profile = profile
+        self._head_ms = head_secs * 1000
+        self._seeked: set[tuple[str, int]] = set()
+        self._behind: dict[tuple[str, int], bool] = {}
+        self.started = time.monotonic()
+        self.records = 0
+
+    def seek(self, consumer: Consumer, partitions: list[TopicPartition]) -> list[TopicPartition]:
+        """
+        Sets the offset of each partition not already seeked to the first record at or after since.
+        Partitions seen before keep their position, so a rebalance mid-replay doesn't go back.
+        """
+
+        since_ms = int(self.since.timestamp() * 1000)
+        to_seek = [p for p in partitions if (p.topic, p.partition) not in self._seeked]
+
+        if not to_seek:
+            return partitions
+
+        found = consumer.offsets_for_times(
+            [TopicPartition(p.topic, p.partition, since_ms) for p in to_seek], timeout=OFFSETS_FOR_TIMES_TIMEOUT_SECS
+        )
+        offsets = {(p.topic, p.partition): p.offset for p in found}
+
+        for p in to_seek:
+            # -1 when there is nothing at or after since
+            offset = offsets.get((p.topic, p.partition), -1)
+            p.offset = offset if offset >= 0 else OFFSET_END
+
+            self._seeked.add((p.topic, p.partition))
+
+            # Behind until a recent record or the end shows otherwise, so one fast partition can't end the replay
+            self._behind[(p.topic, p.partition)] = offset >= 0
+
+            logging.info(f"Replaying partition {p.partition} of {p.topic} from offset {p.offset}")
+
+        return partitions
+
+    def observe(self, topic: str, partition: int, timestamp_ms: int) -> None:
+        """Records the broker timestamp of a record read from a partition."""
+
+        self.records += 1
+
+        if timestamp_ms > 0:
+            self._behind[(topic, partition)] = time.time() * 1000 - timestamp_ms > self._head_ms
+
+    def reached_end(self, topic: str, partition: int) -> None:
+        self._behind[(topic, partition)] = False
+
+    def revoke(self, topic: str, partition: int) -> None:
+        self._behind.pop((topic, partition), None)
+
+    @property
+    def caught_up(self) -> bool:
+        return bool(self._behind) and not any(self._behind.values())
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from .stomp import RawMessage
+
+# PushPortSequence rolls over to 0 after 9999999
+PUSH_PORT_SEQUENCE_MODULUS = 10_000_000
+DEFAULT_SEQUENCE_WINDOW = 4096
+
+
+@dataclass
+class SequenceStats:
+
+    seen: int = 0
+    unsequenced: int = 0
+    gaps: int = 0
+    missing: int = 0
+    duplicates: int = 0
+    out_of_order: int = 0
+    too_old: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"Sequenced {self.seen} messages, {self.gaps} gaps ({self.missing} missing), "
+            f"{self.duplicates} duplicates, {self.out_of_order} out of order, {self.too_old} too old to check"
+        )
+
+
+class SequenceTracker:
+    """
+    Predicate over RawMessages checking their PushPortSequence, which returns False for duplicates
+    so they can be dropped before they are parsed. Only the highest sequence seen and a bitmap of
+    the window sequences below it are kept, so memory and time per message are constant.
+
+    The sequence is numbered across the whole feed, while a Kafka topic spreads it over
+    partitions consumed independently, so sequences routinely arrive ahead of ones still on
+    their way. A sequence is only missing once it falls out of the window unseen: each run of
+    them is then reported as a gap to on_gap, with the first and last missing sequences so they
+    can be replayed. A sequence behind the highest is out of order if it wasn't seen, filling a
+    hole before it was ever counted missing, and a duplicate if it was. Ones more than window
+    behind can't be checked and are let through. Messages without a sequence are always let
+    through.
+    """
+
+    def __init__(
+        self,
+        window: int = DEFAULT_SEQUENCE_WINDOW,
+        on_gap: Optional[Callable[[int, int], None]] = None,
+        modulus: int = PUSH_PORT_SEQUENCE_MODULUS,
+    ) -> None:
+        self._window = window
+        self._on_gap = on_gap
+        self._modulus = modulus
+        self._mask = (1 << window) - 1
+        self._highest: Optional[int] = None
+
+        # Bit n is set when the sequence n below the highest has been seen, for the first tracked of them
+        self._seen = 0
+        self._tracked = 0
+
+        # The missing sequences fallen out of the window so far that the next may extend
+        self._run: Optional[tuple[int, int]] = None
+        self._lock = threading.Lock()
+
+        self.stats = SequenceStats()
+
+    @property
+    def highest(self) -> Optional[int]:
+        return self._highest
+
+    def _miss(self, first: int, last: int, gaps: list[tuple[int, int]]) -> None:
+
+        self.stats.missing += last - first + 1
+        first, last = first % self._modulus, last % self._modulus
+
+        if self._run is not None and (first - self._run[1]) % self._modulus == 1:
+            self._run = (self._run[0], last)
+        else:
+            self._close_run(gaps)
+            self._run = (first, last)
+            self.stats.gaps += 1
+
+    def _close_run(self, gaps: list[tuple[int, int]]) -> None:
+
+        if self._run is not None:
+            gaps.append(self._run)
+            self._run = None
+
+    def _expire(self, ahead: int) -> list[tuple[int, int]]:
+        """The gaps closed by moving the highest on by ahead, pushing sequences out of the window."""
+
+        gaps: list[tuple[int, int]] = []
+
+        # Oldest first, so runs of missing sequences build up in order, and are reported once one seen ends them
+        for n in range(self._tracked - 1, max(0, self._window - ahead) - 1, -1):
+            if self._seen >> n & 1:
+                self._close_run(gaps)
+            else:
+                self._miss(self._highest - n, self._highest - n, gaps)
+
+        # Sequences jumped over entirely never entered the window
+        if ahead > self._window:
+            self._miss(self._highest + 1, self._highest + ahead - self._window, gaps)
+
+        return gaps
+
+    def _check(self, sequence: int) -> tuple[bool, list[tuple[int, int]]]:
+
+        self.stats.seen += 1
+
+        if self._highest is None:
+            self._highest = sequence
+            self._seen = 1
+            self._tracked = 1
+            return True, []
+
+        ahead = (sequence - self._highest) % self._modulus
+
+        # Over half the sequence space ahead is read as behind, across the rollover
+        if ahead and ahead < self._modulus // 2:
+            gaps = self._expire(ahead)
+
+            self._highest = sequence
+            self._seen = ((self._seen << ahead) | 1) & self._mask if ahead < self._window else 1
+            self._tracked = min(self._window, self._tracked + ahead)
+            return True, gaps
+
+        behind = (self._modulus - ahead) % self._modulus
+
+        if behind >= self._window:
+            self.stats.too_old += 1
+            return True, []
+
+        if self._seen >> behind & 1:
+            self.stats.duplicates += 1
+            return False, []
+
+        self._seen |= 1 << behind
+        self.stats.out_of_order += 1
+        return True, []
+
+    def __call__(self, raw_message: RawMessage) -> bool:
+
+        if raw_message.sequence is None:
+            self.stats.unsequenced += 1
+            return True
+
+        with self._lock:
+            keep, gaps = self._check(raw_message.sequence)
+
+        for first, last in gaps:
+            logging.warning(f"PushPortSequence gap, missing {first} to {last}")
+
+            if self._on_gap is not None:
+                self._on_gap(first, last)
+
+        return keep
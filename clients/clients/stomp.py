@@ -4,16 +4,21 @@ import io
 import logging
 import os
 import socket
-import time
 import zlib
 import json
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Callable, Optional
 
+import msgspec
 import stomp
 import xmltodict
 from stomp.utils import Frame
 
+from .envelope import ENVELOPE_DECODER, UPDATE_KEYS_DECODER, LazyJSONBody
+from .handoff import HandoffMetrics, HandoffQueue, OverflowPolicy
+from .supervisor import Backoff, ConnectionSupervisor
+
 
 class InvalidCredentials(Exception): ...
 
@@ -21,7 +26,35 @@ class InvalidCredentials(Exception): ...
 class InvalidMessage(Exception): ...
 
 
-RECONNECT_DELAY_SECS = 15
+# uR element keys in precedence order. Every element type is listed, so a uR carrying e.g. only an
+# association still reaches the handler and the UpdateDispatcher decides whether anything parses it
+KAFKA_MESSAGE_TYPE_KEYS = (
+    ("TS", "TS"),
+    ("schedule", "SC"),
+    ("formationLoading", "LO"),
+    ("scheduleFormations", "SF"),
+    ("association", "AS"),
+    ("trainOrder", "TO"),
+    ("OW", "OW"),
+    ("trainAlert", "NO"),
+)
+
+
+def kafka_message_type(uR: dict) -> str:
+    """Returns the message type of the highest precedence Push Port element in a Kafka uR."""
+
+    for key, message_type in KAFKA_MESSAGE_TYPE_KEYS:
+        if key in uR:
+            return message_type
+
+    raise InvalidMessage(f"Unknown message type for uR elements {list(uR)}")
+
+
+class LazyXMLBody(LazyJSONBody):
+    """Read-only mapping over a Pport XML document that is only run through xmltodict on first access."""
+
+    def _decode(self) -> dict:
+        return xmltodict.parse(self._payload)
 
 
 class WriterInterface(ABC):
@@ -29,17 +62,57 @@ class WriterInterface(ABC):
     @abstractmethod
     def write(self, msg: dict, message_type: str) -> None: ...
 
+    def write_batch(self, msgs: list[tuple[dict, str]]) -> None:
+        """Writes (msg, message_type) pairs; override to flush a batch in one go."""
+
+        for msg, message_type in msgs:
+            self.write(msg, message_type)
+
 
 class MessageHandlerInterface(ABC):
 
+    # Set by handlers that call RawMessage.acknowledge() themselves once a message is durable,
+    # e.g. after their writer flushes. Otherwise a message is acknowledged once the handler returns
+    acks_messages = False
+
     @abstractmethod
     def on_message(self, raw_message: RawMessage) -> None: ...
 
+    def on_messages(self, raw_messages: list[RawMessage]) -> None:
+        """
+        Handles a batch of messages, as delivered by KafkaClient in batch mode. Override to
+        amortise per-call overhead, e.g. a single parse_batch or write_batch per batch.
+        """
+
+        for raw_message in raw_messages:
+            try:
+                self.on_message(raw_message)
+            except InvalidMessage as e:
+                logging.debug(f"Skipping message: {e}")
+            except Exception as e:
+                logging.error(f"Error processing message: {e}")
+
+    def on_idle(self) -> None:
+        """Called by KafkaClient when a poll returns no records, e.g. to write output held back for a time."""
+
 
 class StompListener(stomp.ConnectionListener):
 
-    def __init__(self, message_handler: MessageHandlerInterface) -> None:
+    def __init__(
+        self,
+        message_handler: MessageHandlerInterface,
+        decode_xml: bool = True,
+        lazy_xml: bool = False,
+        queue_size: int = 0,
+        workers: int = 1,
+        overflow: OverflowPolicy = OverflowPolicy.BLOCK,
+    ) -> None:
         self._message_handler = message_handler
+        self._decode_xml = decode_xml
+        self._lazy_xml = lazy_xml
+
+        # With a queue, frames are handed off so the receiver thread only ever enqueues them
+        self.handoff = HandoffQueue(self._handle, queue_size, workers, overflow) if queue_size else None
 
     def on_heartbeat(self) -> None:
         print("Received a heartbeat")
@@ -52,7 +125,6 @@ class StompListener(stomp.ConnectionListener):
         print(message)
 
     def on_disconnected(self) -> None:
-        time.sleep(RECONNECT_DELAY_SECS)
         print("Disconnected")
 
     def on_connecting(self, host_and_port) -> None:
@@ -60,30 +132,78 @@ class StompListener(stomp.ConnectionListener):
 
     def on_message(self, frame) -> None:
 
-        raw_message = RawMessage.create(frame)
+        if self.handoff is not None:
+            self.handoff.put(frame)
+        else:
+            self._handle(frame)
+
+    def _handle(self, frame: Frame) -> None:
+
+        raw_message = RawMessage.create(frame, decode_xml=self._decode_xml, lazy_xml=self._lazy_xml)
         self._message_handler.on_message(raw_message)
 
     @classmethod
-    def create(cls, message_handler: MessageHandlerInterface) -> StompListener:
-        return cls(message_handler)
+    def create(
+        cls,
+        message_handler: MessageHandlerInterface,
+        decode_xml: bool = True,
+        lazy_xml: bool = False,
+        queue_size: int = 0,
+        workers: int = 1,
+        overflow: OverflowPolicy = OverflowPolicy.BLOCK,
+    ) -> StompListener:
+        return cls(message_handler, decode_xml, lazy_xml, queue_size, workers, overflow)
 
 
 HEARTBEAT_INTERVAL_MS = 25000
 
 
+class _ReconnectListener(stomp.ConnectionListener):
+
+    def __init__(self, client: StompClient) -> None:
+        self._client = client
+
+    def on_disconnected(self) -> None:
+        self._client._on_disconnected()
+
+    def on_message(self, frame) -> None:
+        self._client._on_message()
+
+
 class StompClient:
 
-    def __init__(self, conn: stomp.Connection12, listener: stomp.ConnectionListener) -> None:
+    def __init__(
+        self, conn: stomp.Connection12, listener: stomp.ConnectionListener, backoff: Optional[Backoff] = None
+    ) -> None:
 
         self.conn = conn
         self._listener = listener
         self.connected = False
 
+        self._backoff = backoff
+        self._credentials: Optional[tuple[str, str, str]] = None
+        self.supervisor: Optional[ConnectionSupervisor] = None
+
     def connect(self, username: str, password: str, topic: str) -> None:
 
+        # Kept so the supervisor can reconnect with them after the connection drops
+        self._credentials = (username, password, topic)
+
+        if self.supervisor is None:
+            self.supervisor = ConnectionSupervisor(self._reconnect, self._backoff, name="stomp")
+
+        self.supervisor.resume()
+        self._open(username, password, topic)
+
+    def _reconnect(self) -> None:
+        self._open(*self._credentials)  # type: ignore
+
+    def _open(self, username: str, password: str, topic: str) -> None:
+
         client_id = socket.getfqdn()
 
         self.conn.set_listener("", self._listener)
+        self.conn.set_listener("supervisor", _ReconnectListener(self))
 
         connect_header = {"client-id": username + "-" + client_id}
         subscribe_header = {"activemq.subscriptionName": client_id}
@@ -94,27 +214,64 @@ class StompClient:
 
         print("Connected")
 
+    def _on_disconnected(self) -> None:
+
+        self.connected = False
+
+        # Reconnect off the receiver thread, which stomp.py is calling us on
+        if self.supervisor is not None:
+            self.supervisor.reconnect_in_background()
+
+    def _on_message(self) -> None:
+
+        if self.supervisor is not None:
+            self.supervisor.healthy()
+
+    @property
+    def metrics(self) -> Optional[HandoffMetrics]:
+        handoff = getattr(self._listener, "handoff", None)
+        return handoff.metrics if handoff is not None else None
+
     def disconnect(self) -> None:
         print("Disconnected")
         self.connected = False
-        
+
+        # A deliberate disconnect must not be reconnected
+        if self.supervisor is not None:
+            self.supervisor.stop()
+
         self.conn.disconnect()
 
+        # No more frames arrive now, so handle those still queued or spilled, then stop the workers
+        handoff = getattr(self._listener, "handoff", None)
+
+        if handoff is not None:
+            handoff.close()
+
     @classmethod
-    def create(cls, hostname: str, port: int, message_handler: MessageHandlerInterface) -> StompClient:
+    def create(
+        cls,
+        hostname: str,
+        port: int,
+        message_handler: MessageHandlerInterface,
+        decode_xml: bool = True,
+        lazy_xml: bool = False,
+        queue_size: int = 0,
+        workers: int = 1,
+        overflow: OverflowPolicy = OverflowPolicy.BLOCK,
+        backoff: Optional[Backoff] = None,
+    ) -> StompClient:
         return cls(
             stomp.Connection12(
                 [(hostname, port)],
                 auto_decode=False,
                 heartbeats=(HEARTBEAT_INTERVAL_MS, HEARTBEAT_INTERVAL_MS),
-                reconnect_sleep_initial=1,
-                reconnect_sleep_increase=2,
-                reconnect_sleep_jitter=0.6,
-                reconnect_sleep_max=60.0,
-                reconnect_attempts_max=60,
+                # Retries are left to the ConnectionSupervisor, so there is one backoff policy
+                reconnect_attempts_max=1,
                 heart_beat_receive_scale=2.5,
             ),
-            StompListener.create(message_handler),
+            StompListener.create(message_handler, decode_xml, lazy_xml, queue_size, workers, overflow),
+            backoff,
         )
 
 
@@ -143,9 +300,19 @@ class RawMessage:
 
     message_type: str
     body: dict
+    payload: Optional[bytes | str] = None
+    sequence: Optional[int] = None
+    headers: Optional[dict] = None
+    ack: Optional[Callable[[], None]] = field(default=None, compare=False, repr=False)
+
+    def acknowledge(self) -> None:
+        """Marks the message as durably handled, so KafkaClient may commit its offset."""
+
+        if self.ack is not None:
+            self.ack()
 
     @classmethod
-    def create(cls, frame: Frame) -> RawMessage:
+    def create(cls, frame: Frame, decode_xml: bool = True, lazy_xml: bool = False) -> RawMessage:
 
         try:
             message_type = frame.headers["MessageType"]
@@ -156,9 +323,20 @@ class RawMessage:
         bio.write(str.encode("utf-16"))
         bio.seek(0)
         msg = zlib.decompress(frame.body, zlib.MAX_WBITS | 32)  # type: ignore
+
+        sequence = frame.headers.get("PushPortSequence")
+        sequence = int(sequence) if sequence else None
+
+        if not decode_xml:
+            return cls(message_type, {}, payload=msg, sequence=sequence)
+
+        # Keep the XML so handlers can inspect or filter it before paying for xmltodict
+        if lazy_xml:
+            return cls(message_type, LazyXMLBody(msg), payload=msg, sequence=sequence)  # type: ignore
+
         data = xmltodict.parse(msg)
 
-        return cls(message_type, data)
+        return cls(message_type, data, sequence=sequence)
 
     @classmethod
     def create_from_dict(cls, body: dict) -> RawMessage:
@@ -188,13 +366,49 @@ class RawMessage:
         except KeyError:
             raise InvalidMessage(f"MessageType not found in Kafka JSON: {data}")
 
-        if 'TS' in uR:
-            message_type = "TS"
-        elif 'schedule' in uR:
-            message_type = "SC"
-        elif 'formationLoading' in uR:
-            message_type = "LO"
-        else:
+        if not isinstance(uR, dict):
             raise InvalidMessage(f"Unknown message type: {uR}")
 
-        return cls(message_type, data)
\ No newline at end of file
+        message_type = kafka_message_type(uR)
+
+        try:
+            sequence = int(body["properties"]["PushPortSequence"]["string"])
+        except (KeyError, TypeError, ValueError):
+            sequence = None
+
+        return cls(message_type, data, sequence=sequence)
+
+    @classmethod
+    def create_from_kafka_bytes(cls, value: bytes) -> RawMessage:
+        """
+        Single-decode alternative to create_from_kafka_json, taking the undecoded record value.
+        Only the payload, PushPortSequence and headers are read from the envelope, and the
+        payload itself is decoded the first time body is accessed. The undecoded payload is also
+        kept so it can be handed to a typed schema decoder instead.
+        """
+
+        try:
+            envelope = ENVELOPE_DECODER.decode(value)
+        except msgspec.ValidationError:
+            raise InvalidMessage(f"Bytes not found in Kafka JSON: {value!r}")
+        except msgspec.DecodeError:
+            raise InvalidMessage(f"Invalid JSON: {value!r}")
+
+        payload = envelope.payload
+
+        # Only the uR element keys are decoded here, the elements themselves stay raw
+        try:
+            update = UPDATE_KEYS_DECODER.decode(payload)
+        except msgspec.ValidationError:
+            raise InvalidMessage(f"Unknown message type: {payload}")
+        except msgspec.DecodeError:
+            raise InvalidMessage(f"Invalid JSON: {payload}")
+
+        if update.uR is None:
+            raise InvalidMessage(f"MessageType not found in Kafka JSON: {payload}")
+
+        message_type = kafka_message_type(update.uR)
+
+        return cls(
+            message_type, LazyJSONBody(payload), payload, sequence=envelope.sequence, headers=envelope.headers  # type: ignore
+        )
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+DEFAULT_HEALTHY_SECS = 60.0
+
+
+@dataclass
+class Backoff:
+    """
+    Exponential backoff with jitter. The first retry waits first_retry_secs, so a brief blip
+    is recovered from straight away, and retry n after that waits base_secs * multiplier ** (n - 1)
+    capped at max_secs, less up to jitter of that delay at random.
+    """
+
+    first_retry_secs: float = 0.0
+    base_secs: float = 1.0
+    multiplier: float = 2.0
+    max_secs: float = 60.0
+    jitter: float = 0.5
+
+    def delay(self, attempt: int) -> float:
+
+        if attempt == 0:
+            return self.first_retry_secs
+
+        delay = min(self.max_secs, self.base_secs * self.multiplier ** (attempt - 1))
+
+        return delay * (1 - self.jitter * random.random())
+
+
+@dataclass
+class ReconnectMetrics:
+
+    disconnects: int = 0
+    reconnects: int = 0
+    failed_attempts: int = 0
+    last_recovery_secs: Optional[float] = None
+    max_recovery_secs: float = 0.0
+    total_recovery_secs: float = 0.0
+
+    @property
+    def mean_recovery_secs(self) -> float:
+        return self.total_recovery_secs / self.reconnects if self.reconnects else 0.0
+
+
+class ConnectionSupervisor:
+    """
+    Reconnects a client after it drops, shared by StompClient and KafkaClient. connect is
+    retried with exponential backoff until it returns without raising, and the supervisor
+    keeps its metrics, including the time to recover from each outage, across reconnects.
+
+    A connect that returns isn't a recovery on its own, as a Kafka subscribe succeeds even while
+    every poll fails. The outage, and the attempt count that the backoff and max_attempts go by,
+    carry on across reconnect() calls until the client reports healthy(), e.g. on its first
+    message, or the connection stays up for healthy_secs. A connection that drops before then
+    counts as a failed attempt.
+
+    reconnect() blocks the calling thread, for clients that own their loop such as
+    KafkaClient; reconnect_in_background() runs it on a thread, for callbacks such as
+    stomp.py's on_disconnected that must return promptly.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], None],
+        backoff: Optional[Backoff] = None,
+        max_attempts: int = -1,
+        name: str = "connection",
+        healthy_secs: float = DEFAULT_HEALTHY_SECS,
+    ) -> None:
+        self._connect = connect
+        self._backoff = backoff or Backoff()
+        self._max_attempts = max_attempts
+        self._name = name
+        self._healthy_secs = healthy_secs
+
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._down_since: Optional[float] = None
+        self._connected_at: Optional[float] = None
+        self._attempt = 0
+
+        self.gave_up = False
+        self.metrics = ReconnectMetrics()
+
+    def disconnected(self) -> None:
+        """Marks the connection as down, starting the recovery clock if it isn't already running."""
+
+        with self._lock:
+            connected_at = self._connected_at
+            self._connected_at = None
+
+            if connected_at is not None and self._down_since is not None:
+                if time.monotonic() - connected_at >= self._healthy_secs:
+                    self._recovered(connected_at)
+                else:
+                    logging.warning(f"Reconnected {self._name} dropped again before it was healthy")
+                    self.metrics.failed_attempts += 1
+
+            if self._down_since is None:
+                self._down_since = time.monotonic()
+                self.metrics.disconnects += 1
+
+    def healthy(self) -> None:
+        """Marks the connection as working, e.g. once a message arrives on it, ending any outage."""
+
+        # Checked without the lock first, as clients call this for every message
+        if self._down_since is None:
+            return
+
+        with self._lock:
+            if self._down_since is not None and self._connected_at is not None:
+                self._recovered(self._connected_at)
+
+    def reconnect(self) -> bool:
+        """Retries connect until it succeeds, returning False if stopped or out of attempts."""
+
+        self.disconnected()
+
+        while not self._stopped.is_set():
+
+            if self._max_attempts != -1 and self._attempt >= self._max_attempts:
+                logging.error(f"Unable to reconnect {self._name} after {self._attempt} attempts, giving up")
+                self.gave_up = True
+                return False
+
+            delay = self._backoff.delay(self._attempt)
+            logging.info(f"Reconnecting {self._name} in {delay:.1f}s (attempt {self._attempt + 1})")
+
+            if self._stopped.wait(delay):
+                break
+
+            # Counted until the connection proves healthy, so one that keeps dropping backs off and gives up
+            self._attempt += 1
+
+            try:
+                self._connect()
+            except Exception as e:
+                logging.warning(f"Reconnecting {self._name} failed: {e}")
+                self.metrics.failed_attempts += 1
+                continue
+
+            with self._lock:
+                self._connected_at = time.monotonic()
+
+            logging.info(f"Connected {self._name}, waiting for it to prove healthy")
+            return True
+
+        return False
+
+    def _recovered(self, connected_at: float) -> None:
+        """Records the outage as over from connected_at. Called with the lock held."""
+
+        recovery_secs = connected_at - self._down_since if self._down_since is not None else 0.0
+        self._down_since = None
+        self._attempt = 0
+
+        self.metrics.reconnects += 1
+        self.metrics.last_recovery_secs = recovery_secs
+        self.metrics.max_recovery_secs = max(self.metrics.max_recovery_secs, recovery_secs)
+        self.metrics.total_recovery_secs += recovery_secs
+
+        logging.info(f"Reconnected {self._name} after {recovery_secs:.1f}s")
+
+    def reconnect_in_background(self) -> None:
+        """Starts reconnect() on a thread, unless one is already running."""
+
+        if self._stopped.is_set():
+            return
+
+        self.disconnected()
+
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            self._thread = threading.Thread(target=self.reconnect, name=f"{self._name}-reconnect", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stops any reconnect in progress, e.g. for a deliberate disconnect."""
+
+        self._stopped.set()
+
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def resume(self) -> None:
+        self._stopped.clear()
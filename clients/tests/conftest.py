@@ -0,0 +1,70 @@
+import json
+import threading
+import time
+from typing import Optional
+from unittest import mock
+
+from clients.stomp import MessageHandlerInterface, RawMessage
+
+
+class MockMessageHandler(MessageHandlerInterface):
+    """Records the messages it is handed and the threads handing them over, optionally slowly."""
+
+    def __init__(self, delay_secs: float = 0.0) -> None:
+        self._delay_secs = delay_secs
+        self._lock = threading.Lock()
+        self.messages: list[RawMessage] = []
+        self.threads: set[str] = set()
+
+    def on_message(self, raw_message: RawMessage) -> None:
+
+        if self._delay_secs:
+            time.sleep(self._delay_secs)
+
+        with self._lock:
+            self.messages.append(raw_message)
+            self.threads.add(threading.current_thread().name)
+
+
+class MockBatchHandler(MockMessageHandler):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.batches: list[list[RawMessage]] = []
+
+    def on_messages(self, raw_messages: list[RawMessage]) -> None:
+        self.batches.append(raw_messages)
+
+
+class DeferredAckHandler(MockMessageHandler):
+
+    acks_messages = True
+
+
+def create_record(
+    value: Optional[dict] = None,
+    offset: int = 0,
+    partition: int = 0,
+    rid: str = "1",
+    age_secs: Optional[float] = None,
+) -> mock.Mock:
+    """
+    A mock Kafka record carrying the given envelope, or else a TS for rid. Given age_secs, the
+    record's timestamp is that long ago.
+    """
+
+    if value is None:
+        value = {"bytes": json.dumps({"uR": {"TS": {"rid": rid}}}, separators=(",", ":"))}
+
+    record = mock.Mock()
+    record.topic.return_value = "topic"
+    record.partition.return_value = partition
+    record.offset.return_value = offset
+    record.key.return_value = None
+    record.value.return_value = json.dumps(value).encode("utf-8")
+    record.error.return_value = None
+
+    if age_secs is not None:
+        record.timestamp.return_value = (1, int((time.time() - age_secs) * 1000))
+
+    return record
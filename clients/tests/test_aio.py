@@ -0,0 +1,131 @@
+import asyncio
+import time
+
+from clients.aio import AsyncMessageSource, AsyncPipeline, AsyncSinkInterface, ThreadedWriterSink, in_thread
+from clients.stomp import RawMessage, WriterInterface
+
+
+class SlowSink(AsyncSinkInterface):
+
+    def __init__(self, delay_secs: float) -> None:
+        self._delay_secs = delay_secs
+        self.written: list[int] = []
+
+    async def write(self, items: list[int]) -> None:
+        await asyncio.sleep(self._delay_secs)
+        self.written.extend(items)
+
+
+class MockWriter(WriterInterface):
+
+    def __init__(self) -> None:
+        self.data: list[tuple[dict, str]] = []
+
+    def write(self, msg: dict, message_type: str) -> None:
+        self.data.append((msg, message_type))
+
+
+def produce(source: AsyncMessageSource, count: int, acked: list[int]) -> None:
+
+    for seq in range(count):
+        source.on_message(RawMessage("TS", {"seq": seq}, ack=lambda seq=seq: acked.append(seq)))
+
+
+def sequences(raw_messages: list[RawMessage]) -> list[int]:
+    return [raw_message.body["seq"] for raw_message in raw_messages]
+
+
+class TestAsyncPipeline:
+
+    def test__writes_overlap(self) -> None:
+
+        acked: list[int] = []
+        source = AsyncMessageSource()
+        sink = SlowSink(delay_secs=0.05)
+        pipeline = AsyncPipeline(source, sequences, sink, batch_size=10, linger_secs=0.01, max_concurrent_writes=8)
+
+        async def main() -> None:
+            await asyncio.gather(source.run_client(lambda: produce(source, 80, acked)), pipeline.run())
+
+        start = time.monotonic()
+        asyncio.run(main())
+
+        assert sorted(sink.written) == list(range(80))
+        assert sorted(acked) == list(range(80))
+        assert pipeline.metrics.messages == 80
+        assert pipeline.metrics.max_concurrent_writes > 1
+        assert time.monotonic() - start < 0.05 * pipeline.metrics.batches
+
+    def test__acknowledged_only_after_write(self) -> None:
+
+        acked: list[int] = []
+        source = AsyncMessageSource()
+        sink = SlowSink(delay_secs=0.1)
+        pipeline = AsyncPipeline(source, sequences, sink, batch_size=5)
+
+        async def main() -> None:
+            run = asyncio.create_task(pipeline.run())
+            await source.run_client(lambda: produce(source, 5, acked))
+            await asyncio.sleep(0.02)
+
+            assert acked == []
+
+            await run
+
+        asyncio.run(main())
+
+        assert sorted(acked) == list(range(5))
+
+    def test__failed_batches_skipped(self) -> None:
+
+        def process(raw_messages: list[RawMessage]) -> list[int]:
+            if 0 in sequences(raw_messages):
+                raise ValueError("Bad batch")
+
+            return sequences(raw_messages)
+
+        acked: list[int] = []
+        source = AsyncMessageSource()
+        sink = SlowSink(delay_secs=0)
+        pipeline = AsyncPipeline(source, in_thread(process), sink, batch_size=2, linger_secs=1)
+
+        async def main() -> None:
+            await asyncio.gather(source.run_client(lambda: produce(source, 4, acked)), pipeline.run())
+
+        asyncio.run(main())
+
+        assert sink.written == [2, 3]
+        assert sorted(acked) == [0, 1, 2, 3]
+        assert pipeline.metrics.failed_batches == 1
+
+
+class TestAsyncMessageSource:
+
+    def test__batches_linger(self) -> None:
+
+        source = AsyncMessageSource()
+
+        def produce_slowly() -> None:
+            source.on_messages([RawMessage("TS", {"seq": 0}), RawMessage("TS", {"seq": 1})])
+            time.sleep(0.1)
+            source.on_message(RawMessage("TS", {"seq": 2}))
+
+        async def main() -> list[list[int]]:
+            client = asyncio.create_task(source.run_client(produce_slowly))
+            batches = [sequences(batch) async for batch in source.batches(batch_size=10, linger_secs=0.02)]
+            await client
+
+            return batches
+
+        assert asyncio.run(main()) == [[0, 1], [2]]
+
+
+class TestThreadedWriterSink:
+
+    def test(self) -> None:
+
+        writer = MockWriter()
+
+        asyncio.run(ThreadedWriterSink(writer).write([({"rid": "1"}, "TS"), ({"rid": "2"}, "SC")]))
+
+        assert writer.data == [({"rid": "1"}, "TS"), ({"rid": "2"}, "SC")]
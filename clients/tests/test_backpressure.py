@@ -0,0 +1,97 @@
+from unittest import mock
+
+import pytest
+from confluent_kafka import TopicPartition
+from tests.conftest import DeferredAckHandler, create_record
+
+from clients.backpressure import Backpressure
+from clients.kafka import KafkaClient
+from clients.offsets import OffsetTracker
+
+
+class TestBackpressure:
+
+    def test__hysteresis(self) -> None:
+
+        pending = [0]
+        backpressure = Backpressure(lambda: pending[0], high_water=10, low_water=4)
+
+        updates = []
+
+        for value in [5, 10, 12, 7, 4, 8, 3]:
+            pending[0] = value
+            updates.append(backpressure.update())
+
+        assert updates == [None, True, None, None, False, None, None]
+        assert backpressure.metrics.pauses == 1
+        assert backpressure.metrics.max_pending == 12
+        assert not backpressure.paused
+
+    def test__default_low_water(self) -> None:
+
+        pending = [10]
+        backpressure = Backpressure(lambda: pending[0], high_water=10)
+
+        assert backpressure.update()
+
+        pending[0] = 6
+        assert backpressure.update() is None
+
+        pending[0] = 5
+        assert backpressure.update() is False
+
+
+class TestKafkaClientBackpressure:
+
+    def test__pauses_and_resumes_assignment(self) -> None:
+
+        consumer = mock.Mock()
+        consumer.assignment.return_value = [TopicPartition("topic", 0)]
+
+        handler = DeferredAckHandler()
+        offsets = OffsetTracker()
+        client = KafkaClient(
+            consumer,
+            handler,
+            "topic",
+            {},
+            offsets=offsets,
+            backpressure=Backpressure(lambda: offsets.in_flight, high_water=3, low_water=1),
+        )
+
+        for offset in range(3):
+            client._handle_records([create_record(offset=offset)])
+            client._apply_backpressure()
+
+        consumer.pause.assert_called_once_with([TopicPartition("topic", 0)])
+
+        handler.messages[0].acknowledge()
+        client._apply_backpressure()
+        consumer.resume.assert_not_called()
+
+        handler.messages[1].acknowledge()
+        client._apply_backpressure()
+        consumer.resume.assert_called_once_with([TopicPartition("topic", 0)])
+
+    def test__assigned_partitions_paused_while_paused(self) -> None:
+
+        consumer = mock.Mock()
+        backpressure = Backpressure(lambda: 5, high_water=5)
+        client = KafkaClient(consumer, DeferredAckHandler(), "topic", {}, backpressure=backpressure)
+
+        client._apply_backpressure()
+        client._on_assign(consumer, [TopicPartition("topic", 1)])
+
+        consumer.pause.assert_called_with([TopicPartition("topic", 1)])
+
+    @mock.patch("clients.kafka.Consumer")
+    def test_create__needs_manual_commit(self, _) -> None:
+
+        with pytest.raises(ValueError):
+            KafkaClient.create("server", "topic", "user", "password", DeferredAckHandler(), max_pending=100)
+
+        client = KafkaClient.create(
+            "server", "topic", "user", "password", DeferredAckHandler(), manual_commit=True, max_pending=100
+        )
+
+        assert client.backpressure is not None
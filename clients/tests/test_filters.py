@@ -0,0 +1,93 @@
+import pytest
+
+from clients.filters import IngestFilter
+from clients.stomp import LazyXMLBody, RawMessage
+
+SC_XML = (
+    b'<Pport ts="2024-06-25T18:57:01+01:00"><uR><schedule rid="202406258080789" uid="P80789" trainId="2B21" '
+    b'toc="SR"><OR tpl="EKILBRD" wtd="23:57"/><DT tpl="GLGC" wta="00:29"/></schedule></uR></Pport>'
+)
+
+
+@pytest.fixture
+def records() -> list[RawMessage]:
+    with open("tests/fixtures/kafka_records.jsonl", "rb") as f:
+        return [RawMessage.create_from_kafka_bytes(line.strip()) for line in f if line.strip()]
+
+
+class TestIngestFilter:
+
+    def test__no_restrictions(self, records: list[RawMessage]) -> None:
+
+        ingest_filter = IngestFilter().compile()
+
+        assert all(ingest_filter(raw_message) for raw_message in records)
+        assert ingest_filter.stats.dropped == 0
+
+    def test__message_types(self, records: list[RawMessage]) -> None:
+
+        ingest_filter = IngestFilter(message_types=["TS", "SC"]).compile()
+
+        assert [ingest_filter(raw_message) for raw_message in records] == [True, True, False]
+        assert ingest_filter.stats.dropped_by == {"message_type": 1}
+
+    @pytest.mark.parametrize("tocs,expected", [(["NT"], [True, True, True]), (["SR"], [False, True, True])])
+    def test__tocs_without_decoding(self, records: list[RawMessage], tocs: list[str], expected: list[bool]) -> None:
+
+        ingest_filter = IngestFilter(tocs=tocs).compile()
+
+        # Only the schedule carries a toc, so TS and LO are never dropped on it
+        assert [ingest_filter(raw_message) for raw_message in records] == expected
+        assert not any(raw_message.body.decoded for raw_message in records)
+
+    def test__tpls(self, records: list[RawMessage]) -> None:
+
+        ingest_filter = IngestFilter(tpls=["CRDFCEN", "ROMFORD"]).compile()
+
+        assert [ingest_filter(raw_message) for raw_message in records] == [False, True, True]
+        assert ingest_filter.stats.dropped_by == {"tpl": 1}
+
+    def test__rid_prefixes(self, records: list[RawMessage]) -> None:
+
+        ingest_filter = IngestFilter(rid_prefixes=["2025110187", "2025110171"]).compile()
+
+        assert [ingest_filter(raw_message) for raw_message in records] == [True, True, False]
+
+    @pytest.mark.parametrize("tpls,expected", [(["GLGC"], True), (["EDB"], False)])
+    def test__xml_payload(self, tpls: list[str], expected: bool) -> None:
+
+        raw_message = RawMessage("SC", LazyXMLBody(SC_XML), payload=SC_XML)  # type: ignore
+
+        assert IngestFilter(tocs=["SR"], tpls=tpls).compile()(raw_message) is expected
+        assert not raw_message.body.decoded
+
+    @pytest.mark.parametrize("tocs,expected", [(["SR"], True), (["NT"], False)])
+    def test__decoded_body(self, tocs: list[str], expected: bool) -> None:
+
+        raw_message = RawMessage("SC", LazyXMLBody(SC_XML).data)
+
+        assert IngestFilter(tocs=tocs).compile()(raw_message) is expected
+
+    def test__stats(self, records: list[RawMessage]) -> None:
+
+        ingest_filter = IngestFilter(message_types=["SC"]).compile()
+
+        for raw_message in records:
+            if ingest_filter(raw_message):
+                with ingest_filter.processing():
+                    raw_message.body["uR"]
+
+        stats = ingest_filter.stats
+
+        assert (stats.seen, stats.dropped, stats.processed) == (3, 2, 1)
+        assert stats.saved_cpu_secs == pytest.approx(2 * stats.processed_cpu_secs - stats.filter_cpu_secs)
+        assert stats.summary().startswith("Filtered 3 messages, dropped 2 (message_type=2)")
+
+    def test__processing_batch(self) -> None:
+
+        ingest_filter = IngestFilter().compile()
+
+        with ingest_filter.processing(5):
+            pass
+
+        assert ingest_filter.stats.processed == 5
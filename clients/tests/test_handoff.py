@@ -0,0 +1,120 @@
+import gzip
+import threading
+import time
+from unittest import mock
+
+from stomp.utils import Frame
+from tests.conftest import MockMessageHandler
+
+from clients.handoff import HandoffQueue, OverflowPolicy
+from clients.stomp import RawMessage, StompClient, StompListener
+
+
+class BlockedProcessor:
+    """Records items, holding the first one until released so the queue backs up."""
+
+    def __init__(self) -> None:
+        self.items: list[int] = []
+        self.release = threading.Event()
+
+    def __call__(self, item: int) -> None:
+        self.release.wait(timeout=5)
+        self.items.append(item)
+
+
+class TestHandoffQueue:
+
+    def test__block(self) -> None:
+
+        processor = BlockedProcessor()
+        handoff = HandoffQueue(processor, maxsize=2)
+
+        processor.release.set()
+        for item in range(10):
+            handoff.put(item)
+
+        handoff.close()
+
+        assert processor.items == list(range(10))
+        assert handoff.metrics.processed == 10
+        assert handoff.metrics.dropped == 0
+
+    def test__drop_oldest(self) -> None:
+
+        processor = BlockedProcessor()
+        handoff = HandoffQueue(processor, maxsize=3, overflow=OverflowPolicy.DROP_OLDEST)
+
+        handoff.put(0)
+        while not handoff._queue.empty():
+            time.sleep(0.001)
+
+        for item in range(1, 10):
+            handoff.put(item)
+
+        processor.release.set()
+        handoff.close()
+
+        # 0 was taken by the worker before the queue filled; only the last 3 queued survive
+        assert processor.items == [0, 7, 8, 9]
+        assert handoff.metrics.dropped == 6
+        assert handoff.metrics.max_depth == 3
+
+    def test__spill(self) -> None:
+
+        processor = BlockedProcessor()
+        handoff = HandoffQueue(processor, maxsize=2, overflow=OverflowPolicy.SPILL)
+
+        for item in range(20):
+            handoff.put(item)
+
+        processor.release.set()
+        handoff.close()
+
+        assert processor.items == list(range(20))
+        assert handoff.metrics.spilled > 0
+        assert handoff.metrics.max_depth >= 18
+        assert handoff.metrics.mean_wait_secs > 0
+
+    def test__failures_counted(self) -> None:
+
+        def process(item: int) -> None:
+            raise ValueError(item)
+
+        handoff = HandoffQueue(process)
+        handoff.put(1)
+        handoff.close()
+
+        assert (handoff.metrics.processed, handoff.metrics.failed) == (0, 1)
+
+
+class TestStompListenerHandoff:
+
+    def test(self) -> None:
+
+        xml = b'<Pport ts="2024-06-25T18:57:01+01:00"><uR><TS rid="1" uid="A"/></uR></Pport>'
+        handler = MockMessageHandler()
+        listener = StompListener.create(handler, decode_xml=False, queue_size=10)
+
+        for _ in range(3):
+            listener.on_message(Frame(cmd="MESSAGE", headers={"MessageType": "TS"}, body=gzip.compress(xml)))
+
+        listener.handoff.close()
+
+        assert handler.messages == [RawMessage("TS", {}, payload=xml)] * 3
+        assert handler.threads == {"handoff-worker-0"}
+        assert listener.handoff.metrics.enqueued == 3
+
+    def test__drained_on_disconnect(self) -> None:
+
+        xml = b'<Pport ts="2024-06-25T18:57:01+01:00"><uR><TS rid="1" uid="A"/></uR></Pport>'
+        handler = MockMessageHandler()
+        listener = StompListener.create(handler, decode_xml=False, queue_size=2, overflow=OverflowPolicy.SPILL)
+        client = StompClient(mock.Mock(), listener)
+
+        for _ in range(10):
+            listener.on_message(Frame(cmd="MESSAGE", headers={"MessageType": "TS"}, body=gzip.compress(xml)))
+
+        client.disconnect()
+
+        assert len(handler.messages) == 10
+        assert not any(worker.is_alive() for worker in listener.handoff._workers)
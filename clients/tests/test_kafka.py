@@ -0,0 +1,163 @@
+from unittest import mock
+
+from confluent_kafka import KafkaError, TopicPartition
+from tests.conftest import (
+    DeferredAckHandler,
+    MockBatchHandler,
+    MockMessageHandler,
+    create_record,
+)
+
+from clients.kafka import KafkaClient
+from clients.offsets import OffsetTracker
+from clients.stomp import RawMessage
+
+
+class TestKafkaClient:
+
+    def test_process_message(self) -> None:
+
+        handler = MockMessageHandler()
+        client = KafkaClient(mock.Mock(), handler, "topic", {})
+
+        client._process_message(create_record({"bytes": '{"uR":{"TS":{"rid":"test"}}}'}))
+
+        assert handler.messages == [RawMessage("TS", {"uR": {"TS": {"rid": "test"}}})]
+
+    def test_process_message__other_element_passed_through(self) -> None:
+
+        handler = MockMessageHandler()
+        client = KafkaClient(mock.Mock(), handler, "topic", {})
+
+        client._process_message(create_record({"bytes": '{"uR":{"OW":{"id":"1"}}}'}))
+
+        assert handler.messages == [RawMessage("OW", {"uR": {"OW": {"id": "1"}}})]
+
+    def test_process_message__unknown_type_skipped(self) -> None:
+
+        handler = MockMessageHandler()
+        client = KafkaClient(mock.Mock(), handler, "topic", {})
+
+        client._process_message(create_record({"bytes": '{"uR":{"updateOrigin":"Test"}}'}))
+
+        assert handler.messages == []
+
+    def test_receive__batch(self) -> None:
+
+        consumer = mock.Mock()
+        consumer.consume.return_value = [create_record({"bytes": '{"uR":{"TS":{"rid":"test"}}}'})] * 3
+
+        handler = MockBatchHandler()
+        client = KafkaClient(consumer, handler, "topic", {}, batch_size=500, batch_linger_secs=0.05)
+
+        assert client._handle_records(client._receive()) is None
+
+        consumer.consume.assert_called_once_with(num_messages=500, timeout=0.05)
+        consumer.poll.assert_not_called()
+        assert handler.batches == [[RawMessage("TS", {"uR": {"TS": {"rid": "test"}}})] * 3]
+        assert client._message_count == 3
+
+    def test_handle_records__batch_stops_at_error(self) -> None:
+
+        error_record = mock.Mock()
+        error_record.error.return_value.code.return_value = KafkaError._TRANSPORT
+
+        eof_record = mock.Mock()
+        eof_record.error.return_value.code.return_value = KafkaError._PARTITION_EOF
+
+        record = create_record({"bytes": '{"uR":{"TS":{"rid":"test"}}}'})
+
+        handler = MockBatchHandler()
+        client = KafkaClient(mock.Mock(), handler, "topic", {}, batch_size=10)
+
+        error = client._handle_records([record, eof_record, record, error_record, record])
+
+        assert error is error_record.error.return_value
+        assert [len(batch) for batch in handler.batches] == [2]
+
+    def test_handle_records__idle(self) -> None:
+
+        eof_record = mock.Mock()
+        eof_record.error.return_value.code.return_value = KafkaError._PARTITION_EOF
+
+        handler = MockMessageHandler()
+        handler.on_idle = mock.Mock()
+        client = KafkaClient(mock.Mock(), handler, "topic", {})
+
+        client._handle_records([])
+        client._handle_records([eof_record])
+        client._handle_records([create_record({"bytes": '{"uR":{"TS":{"rid":"test"}}}'})])
+
+        assert handler.on_idle.call_count == 2
+
+    def test_on_messages__default_calls_on_message(self) -> None:
+
+        handler = MockMessageHandler()
+        client = KafkaClient(mock.Mock(), handler, "topic", {}, batch_size=10)
+
+        client._process_messages(
+            [
+                create_record({"bytes": '{"uR":{"TS":{"rid":"1"}}}'}),
+                create_record({"bytes": '{"uR":{"updateOrigin":"Test"}}'}),
+                create_record({"bytes": '{"uR":{"TS":{"rid":"2"}}}'}),
+            ]
+        )
+
+        assert handler.messages == [
+            RawMessage("TS", {"uR": {"TS": {"rid": "1"}}}),
+            RawMessage("TS", {"uR": {"TS": {"rid": "2"}}}),
+        ]
+
+    def test_manual_commit__committed_once_handled(self) -> None:
+
+        consumer = mock.Mock()
+        offsets = OffsetTracker(commit_every_messages=2)
+        client = KafkaClient(consumer, MockMessageHandler(), "topic", {}, offsets=offsets)
+
+        client._handle_records([create_record({"bytes": '{"uR":{"TS":{"rid":"1"}}}'}, offset=4)])
+        client._commit_offsets_if_due()
+        consumer.commit.assert_not_called()
+
+        # Skipped messages are acknowledged too, so they don't hold back the commit
+        client._handle_records([create_record({"bytes": '{"uR":{"updateOrigin":"Test"}}'}, offset=5)])
+        client._commit_offsets_if_due()
+
+        consumer.commit.assert_called_once_with(offsets=[TopicPartition("topic", 0, 6)], asynchronous=True)
+
+    def test_manual_commit__waits_for_handler_ack(self) -> None:
+
+        consumer = mock.Mock()
+        handler = DeferredAckHandler()
+        client = KafkaClient(consumer, handler, "topic", {}, offsets=OffsetTracker(commit_every_messages=1))
+
+        client._handle_records([create_record({"bytes": '{"uR":{"TS":{"rid":"1"}}}'}, offset=9)])
+        client._commit_offsets_if_due()
+        consumer.commit.assert_not_called()
+
+        handler.messages[0].acknowledge()
+        client._commit_offsets_if_due()
+
+        consumer.commit.assert_called_once_with(offsets=[TopicPartition("topic", 0, 10)], asynchronous=True)
+
+    def test_manual_commit__batch_committed_on_disconnect(self) -> None:
+
+        consumer = mock.Mock()
+        client = KafkaClient(
+            consumer, MockBatchHandler(), "topic", {}, batch_size=10, offsets=OffsetTracker(commit_every_messages=100)
+        )
+
+        client._handle_records([create_record({"bytes": '{"uR":{"TS":{"rid":"1"}}}'}, offset) for offset in range(3)])
+        client._commit_offsets_if_due()
+        consumer.commit.assert_not_called()
+
+        client.disconnect()
+
+        consumer.commit.assert_called_once_with(offsets=[TopicPartition("topic", 0, 3)], asynchronous=False)
+
+    @mock.patch("clients.kafka.Consumer")
+    def test_create__manual_commit(self, _) -> None:
+
+        client = KafkaClient.create("server", "topic", "user", "password", MockMessageHandler(), manual_commit=True)
+
+        assert client._config["enable.auto.commit"] is False
+        assert client._offsets is not None
@@ -426,3 +426,101 @@ class TestKafkaMessageTypes:
         raw_message = RawMessage.create_from_kafka_json(kafka_message)
         # TS is checked first in the code
         assert raw_message.message_type == "TS"
+
+    @pytest.mark.parametrize(
+        "key,message_type",
+        [
+            ("scheduleFormations", "SF"),
+            ("association", "AS"),
+            ("trainOrder", "TO"),
+            ("OW", "OW"),
+            ("trainAlert", "NO"),
+        ],
+    )
+    def test_detects_other_element_types(self, key: str, message_type: str) -> None:
+        """Verify that a uR without TS, schedule or formationLoading is still typed and passed on."""
+        kafka_message = {
+            'bytes': json.dumps({"uR": {"updateOrigin": "Test", key: {}}}),
+        }
+
+        assert RawMessage.create_from_kafka_json(kafka_message).message_type == message_type
+        assert RawMessage.create_from_kafka_bytes(json.dumps(kafka_message).encode()).message_type == message_type
+
+
+class TestKafkaBytesDecoding:
+    """Tests for the single-decode create_from_kafka_bytes path."""
+
+    @pytest.fixture
+    def records(self) -> list[bytes]:
+        with open("tests/fixtures/kafka_records.jsonl", "rb") as f:
+            return f.read().splitlines()
+
+    def test_matches_json_path(self, records: list[bytes]) -> None:
+        """Verify that both decoding paths agree on type and body."""
+        for record in records:
+            expected = RawMessage.create_from_kafka_json(json.loads(record))
+            raw_message = RawMessage.create_from_kafka_bytes(record)
+
+            assert raw_message.message_type == expected.message_type
+            assert raw_message.body == expected.body
+            assert raw_message.sequence == expected.sequence
+
+    def test_extracts_sequence_and_headers(self, records: list[bytes]) -> None:
+        """Verify that PushPortSequence and headers are read from the envelope."""
+        raw_message = RawMessage.create_from_kafka_bytes(records[0])
+
+        assert raw_message.sequence == 9977553
+        assert raw_message.headers == {
+            "messageID": "ID:liv1-dwnpp102-49747-638894340902160133-1:22:1:1:189977554",
+            "timestamp": 1762016116898,
+        }
+
+    def test_json_path_extracts_sequence(self, records: list[bytes]) -> None:
+        """Verify that create_from_kafka_json also reads PushPortSequence."""
+        assert RawMessage.create_from_kafka_json(json.loads(records[0])).sequence == 9977553
+
+    def test_body_is_decoded_lazily(self, records: list[bytes]) -> None:
+        """Verify that the payload is only decoded when the body is accessed."""
+        raw_message = RawMessage.create_from_kafka_bytes(records[1])
+
+        assert not raw_message.body.decoded
+        assert raw_message.payload.startswith('{"ts":"2025-11-01T16:55:17.776923+00:00"')
+        assert raw_message.body["uR"]["TS"]["rid"] == "202511017156103"
+        assert raw_message.body.decoded
+
+    def test_missing_sequence(self) -> None:
+        """Verify that envelopes without properties still decode."""
+        raw_message = RawMessage.create_from_kafka_bytes(b'{"bytes": "{\\"uR\\":{\\"TS\\":{\\"rid\\":\\"test\\"}}}"}')
+
+        assert raw_message.message_type == "TS"
+        assert raw_message.sequence is None
+
+    @pytest.mark.parametrize(
+        "payload,message_type",
+        [
+            ('{"uR": {"TS" : {"rid": "test"}}}', "TS"),
+            ('{"uR": {"schedule": {"rid": "test", "TS": {}}}}', "SC"),
+            ('{"uR": {"formationLoading": {"fid": "\\"TS\\":"}}}', "LO"),
+            ('{"TS": {}, "uR": {"schedule": {"rid": "test"}}}', "SC"),
+        ],
+    )
+    def test_detects_type_from_ur_keys(self, payload: str, message_type: str) -> None:
+        """Verify that only uR element keys decide the type, not whitespace or nested and quoted text."""
+        raw_message = RawMessage.create_from_kafka_bytes(json.dumps({"bytes": payload}).encode())
+
+        assert raw_message.message_type == message_type
+        assert raw_message.message_type == RawMessage.create_from_kafka_json({"bytes": payload}).message_type
+
+    @pytest.mark.parametrize(
+        "value,error_msg",
+        [
+            (b'{"messageID": "test-id"}', "Bytes not found"),
+            (b"this is not valid json {{{", "Invalid JSON"),
+            (b'{"bytes": "{\\"ts\\":\\"2025-11-01T16:55:16.897896+00:00\\"}"}', "MessageType not found"),
+            (b'{"bytes": "{\\"uR\\":{\\"unknownField\\":\\"value\\"}}"}', "Unknown message type"),
+        ],
+    )
+    def test_errors(self, value: bytes, error_msg: str) -> None:
+        """Verify that malformed envelopes raise InvalidMessage."""
+        with pytest.raises(InvalidMessage, match=error_msg):
+            RawMessage.create_from_kafka_bytes(value)
@@ -0,0 +1,232 @@
+import json
+import urllib.request
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from tests.conftest import (
+    DeferredAckHandler,
+    MockMessageHandler,
+    create_record,
+)
+
+from clients.kafka import KafkaClient
+from clients.metrics import (
+    KafkaMetrics,
+    MetricsServer,
+    RollingCounter,
+    RollingHistogram,
+    push_port_ts,
+)
+from clients.stomp import RawMessage
+
+STATS = {
+    "topics": {
+        "topic": {
+            "partitions": {
+                "0": {"consumer_lag": 12, "committed_offset": 100, "hi_offset": 112, "fetchq_cnt": 3},
+                "1": {"consumer_lag": 0, "committed_offset": 50, "hi_offset": 50, "fetchq_cnt": 0},
+                "-1": {"consumer_lag": -1},
+            }
+        }
+    }
+}
+
+
+PAYLOAD = {"bytes": '{"ts":"2025-11-01T16:55:16+00:00","uR":{"TS":{}}}'}
+
+
+class Clock:
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestRollingHistogram:
+
+    def test__quantiles(self) -> None:
+
+        histogram = RollingHistogram(buckets=(0.1, 1.0, 10.0))
+
+        for value in [0.05] * 50 + [0.5] * 45 + [5.0] * 4 + [50.0]:
+            histogram.observe(value)
+
+        assert histogram.quantile(0.5) == 0.1
+        assert histogram.quantile(0.95) == 1.0
+        assert histogram.quantile(0.99) == 10.0
+        assert histogram.quantile(1.0) == float("inf")
+
+    def test__window(self) -> None:
+
+        clock = Clock()
+        histogram = RollingHistogram(buckets=(1.0,), window_secs=10, clock=clock)
+
+        histogram.observe(0.5)
+        clock.now += 5
+        histogram.observe(2.0)
+
+        assert histogram.snapshot() == ([1, 1], 2.5)
+
+        clock.now += 6
+        assert histogram.snapshot() == ([0, 1], 2.0)
+
+        clock.now += 10
+        assert histogram.quantile(0.5) is None
+
+
+class TestRollingCounter:
+
+    def test__rate(self) -> None:
+
+        clock = Clock()
+        counter = RollingCounter(window_secs=10, clock=clock)
+
+        counter.add(50)
+        clock.now += 9
+        counter.add(50)
+
+        assert counter.rate() == 10.0
+
+        clock.now += 1
+        assert counter.rate() == 5.0
+
+
+class TestPushPortTs:
+
+    def test__kafka_payload(self) -> None:
+
+        payload = b'{"ts":"2025-11-01T16:55:16.897896+00:00","version":"18.0","uR":{}}'
+
+        assert push_port_ts(RawMessage("TS", {}, payload)) == datetime(2025, 11, 1, 16, 55, 16, 897896, timezone.utc)
+
+    def test__xml_payload(self) -> None:
+
+        payload = b'<Pport xmlns="http://www.thalesgroup.com/rtti/PushPort/v16" ts="2024-06-25T18:57:01.3811322+01:00">'
+
+        assert push_port_ts(RawMessage("TS", {}, payload)) == datetime(
+            2024, 6, 25, 18, 57, 1, 381132, timezone(timedelta(hours=1))
+        )
+
+    def test__decoded_body(self) -> None:
+
+        assert push_port_ts(RawMessage("TS", {"Pport": {"@ts": "2024-06-25T18:57:01+00:00"}})) is not None
+        assert push_port_ts(RawMessage("TS", {"uR": {}})) is None
+
+
+class TestKafkaMetrics:
+
+    def test__on_stats(self) -> None:
+
+        metrics = KafkaMetrics()
+        metrics.on_stats(json.dumps(STATS))
+
+        assert sorted(metrics.partitions) == [("topic", 0), ("topic", 1)]
+        assert metrics.partitions[("topic", 0)].high_watermark == 112
+        assert metrics.total_lag == 12
+
+    def test__processed(self) -> None:
+
+        metrics = KafkaMetrics()
+        ts = (datetime.now(timezone.utc) - timedelta(seconds=2)).isoformat()
+
+        metrics.processed([RawMessage("TS", {}, f'{{"ts":"{ts}"}}'.encode())] * 3, handler_secs=0.002)
+
+        assert metrics.records == 3
+        assert metrics.latency.quantile(0.5) == 2.5
+        assert metrics.handler_time.quantile(0.5) == 0.005
+
+    def test__render(self) -> None:
+
+        metrics = KafkaMetrics()
+        metrics.on_stats(json.dumps(STATS))
+        metrics.processed([RawMessage("TS", {})], handler_secs=0.01)
+        metrics.add_gauge("darwin_test_gauge", "A gauge", lambda: 7)
+        metrics.add_gauge("darwin_missing_gauge", "Not available yet", lambda: None)
+
+        rendered = metrics.render()
+
+        assert "darwin_kafka_records_total 1" in rendered
+        assert 'darwin_kafka_consumer_lag{topic="topic",partition="0"} 12' in rendered
+        assert 'darwin_handler_seconds{quantile="0.5"} 0.01' in rendered
+        assert 'darwin_latency_seconds{quantile="0.5"} NaN' in rendered
+        assert "darwin_test_gauge 7" in rendered
+        assert "darwin_missing_gauge" not in rendered
+
+
+class TestMetricsServer:
+
+    def test__serves_metrics(self) -> None:
+
+        metrics = KafkaMetrics()
+        metrics.processed([RawMessage("TS", {})] * 2, handler_secs=0.01)
+
+        server = MetricsServer(metrics, port=0).start()
+
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics") as response:
+                body = response.read().decode()
+        finally:
+            server.close()
+
+        assert "darwin_kafka_records_total 2" in body
+
+
+class TestKafkaClientMetrics:
+
+    def test__records_processed(self) -> None:
+
+        record = create_record(PAYLOAD)
+
+        metrics = KafkaMetrics()
+        client = KafkaClient(mock.Mock(), MockMessageHandler(), "topic", {}, fast_decode=True, metrics=metrics)
+
+        client._handle_records([record, record])
+
+        assert metrics.records == 2
+        assert metrics.latency.snapshot()[0][-1] == 2  # Recorded long ago, so beyond the largest bucket
+        assert "darwin_kafka_connected 0" in metrics.render()
+
+    def test__latency_recorded_on_acknowledgement(self) -> None:
+
+        record = create_record(PAYLOAD)
+
+        metrics = KafkaMetrics()
+        handler = DeferredAckHandler()
+        client = KafkaClient(mock.Mock(), handler, "topic", {}, fast_decode=True, metrics=metrics)
+
+        client._handle_records([record])
+
+        assert metrics.records == 1
+        assert sum(metrics.latency.snapshot()[0]) == 0
+
+        handler.messages[0].acknowledge()
+        handler.messages[0].acknowledge()
+
+        assert sum(metrics.latency.snapshot()[0]) == 1
+
+    @mock.patch("clients.kafka.Consumer")
+    def test__records_processed_by_partition_workers(self, _) -> None:
+
+        record = create_record(PAYLOAD)
+
+        metrics = KafkaMetrics()
+        client = KafkaClient.create(
+            "server", "topic", "user", "password", MockMessageHandler(), partition_workers=True, metrics=metrics
+        )
+
+        client._handle_records([record, record])
+        client._drain_partitions()
+
+        assert metrics.records == 2
+        assert sum(metrics.handler_time.snapshot()[0]) == 2
+
+    @mock.patch("clients.kafka.Consumer")
+    def test_create__stats_cb(self, _) -> None:
+
+        metrics = KafkaMetrics()
+        client = KafkaClient.create("server", "topic", "user", "password", MockMessageHandler(), metrics=metrics)
+
+        assert client._config["stats_cb"] == metrics.on_stats
+        assert client.metrics is metrics
@@ -0,0 +1,78 @@
+from confluent_kafka import TopicPartition
+
+from clients.offsets import OffsetTracker
+
+
+class TestOffsetTracker:
+
+    def test__commits_up_to_oldest_unacknowledged(self) -> None:
+
+        tracker = OffsetTracker()
+        acks = [tracker.track("topic", 0, offset) for offset in range(10, 14)]
+
+        acks[0]()
+        acks[2]()
+        acks[3]()
+
+        assert tracker.committable() == [TopicPartition("topic", 0, 11)]
+        assert tracker.in_flight == 3
+
+        acks[1]()
+
+        assert tracker.committable() == [TopicPartition("topic", 0, 14)]
+        assert tracker.in_flight == 0
+
+    def test__nothing_committable_until_acknowledged(self) -> None:
+
+        tracker = OffsetTracker(commit_every_messages=1)
+        tracker.track("topic", 0, 5)
+
+        assert not tracker.commit_due()
+        assert tracker.committable() == []
+
+    def test__partitions_tracked_separately(self) -> None:
+
+        tracker = OffsetTracker()
+        partition_0 = tracker.track("topic", 0, 7)
+        tracker.track("topic", 1, 3)
+        partition_1 = tracker.track("topic", 1, 4)
+
+        partition_0()
+        partition_1()
+
+        assert tracker.committable() == [TopicPartition("topic", 0, 8)]
+
+    def test__commit_due(self) -> None:
+
+        tracker = OffsetTracker(commit_every_messages=3, commit_interval_secs=60)
+        acks = [tracker.track("topic", 0, offset) for offset in range(3)]
+
+        acks[0]()
+        acks[1]()
+        assert not tracker.commit_due()
+
+        acks[2]()
+        assert tracker.commit_due()
+
+        tracker.committable()
+        assert not tracker.commit_due()
+
+    def test__commit_due_after_interval(self) -> None:
+
+        tracker = OffsetTracker(commit_every_messages=1000, commit_interval_secs=0)
+        tracker.track("topic", 0, 0)()
+
+        assert tracker.commit_due()
+
+    def test__repeated_and_stale_acks_ignored(self) -> None:
+
+        tracker = OffsetTracker()
+        ack = tracker.track("topic", 0, 0)
+
+        ack()
+        ack()
+        tracker.revoke("topic", 0)
+        tracker.ack("topic", 0, 0)
+
+        assert tracker.committable() == []
+        assert tracker.in_flight == 0
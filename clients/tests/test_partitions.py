@@ -0,0 +1,102 @@
+import time
+from unittest import mock
+
+from confluent_kafka import TopicPartition
+from tests.conftest import MockMessageHandler, create_record
+
+from clients.kafka import KafkaClient
+from clients.offsets import OffsetTracker
+from clients.partitions import PartitionWorkers
+from clients.stomp import RawMessage
+
+
+class TestPartitionWorkers:
+
+    def test__order_kept_within_partition(self) -> None:
+
+        handler = MockMessageHandler(delay_secs=0.001)
+        workers = PartitionWorkers(handler)
+
+        for seq in range(30):
+            workers.submit("topic", seq % 3, RawMessage("TS", {"partition": seq % 3, "seq": seq}))
+
+        workers.close()
+
+        for partition in range(3):
+            seqs = [msg.body["seq"] for msg in handler.messages if msg.body["partition"] == partition]
+            assert seqs == [seq for seq in range(30) if seq % 3 == partition]
+
+        assert handler.threads == {"partition-topic-0", "partition-topic-1", "partition-topic-2"}
+
+    def test__partitions_handled_in_parallel(self) -> None:
+
+        handler = MockMessageHandler(delay_secs=0.05)
+        workers = PartitionWorkers(handler)
+
+        start = time.monotonic()
+
+        for partition in range(4):
+            workers.submit("topic", partition, RawMessage("TS", {}))
+
+        workers.close()
+
+        assert len(handler.messages) == 4
+        assert time.monotonic() - start < 0.15
+
+    def test__acknowledged_once_handled(self) -> None:
+
+        acked: list[int] = []
+        workers = PartitionWorkers(MockMessageHandler())
+
+        workers.submit("topic", 0, [RawMessage("TS", {}, ack=lambda seq=seq: acked.append(seq)) for seq in range(3)])
+        workers.revoke([("topic", 0)])
+
+        assert acked == [0, 1, 2]
+        assert workers.partitions == []
+
+
+class TestKafkaClientPartitions:
+
+    def test__records_routed_by_partition(self) -> None:
+
+        handler = MockMessageHandler()
+        client = KafkaClient(mock.Mock(), handler, "topic", {}, partitions=PartitionWorkers(handler))
+
+        client._handle_records([create_record(rid=f"rid{offset}", partition=offset % 2, offset=offset) for offset in range(6)])
+        client._drain_partitions()
+
+        assert sorted(msg.body["uR"]["TS"]["rid"] for msg in handler.messages) == [f"rid{i}" for i in range(6)]
+        assert handler.threads == {"partition-topic-0", "partition-topic-1"}
+
+    def test__revoke_pauses_drains_and_commits(self) -> None:
+
+        consumer = mock.Mock()
+        handler = MockMessageHandler(delay_secs=0.01)
+        offsets = OffsetTracker(commit_every_messages=1000, commit_interval_secs=60)
+        client = KafkaClient(
+            consumer, handler, "topic", {}, batch_size=10, offsets=offsets, partitions=PartitionWorkers(handler)
+        )
+
+        client._handle_records([create_record(rid="rid", offset=offset) for offset in range(5)])
+
+        revoked = [TopicPartition("topic", 0)]
+        client._on_revoke(consumer, revoked)
+
+        consumer.pause.assert_called_once_with(revoked)
+        assert len(handler.messages) == 5
+        consumer.commit.assert_called_once_with(offsets=[TopicPartition("topic", 0, 5)], asynchronous=False)
+        assert offsets.in_flight == 0
+
+    def test__lost_partitions_not_committed(self) -> None:
+
+        consumer = mock.Mock()
+        handler = MockMessageHandler()
+        offsets = OffsetTracker()
+        client = KafkaClient(consumer, handler, "topic", {}, offsets=offsets, partitions=PartitionWorkers(handler))
+
+        client._handle_records([create_record(rid="rid", partition=1)])
+        client._on_lost(consumer, [TopicPartition("topic", 1)])
+
+        assert len(handler.messages) == 1
+        consumer.commit.assert_not_called()
+        assert offsets.committable() == []
@@ -0,0 +1,81 @@
+import random
+import time
+
+from clients.pool import ProcessPoolHandler
+from clients.stomp import InvalidMessage, RawMessage
+
+
+def process(raw_message: RawMessage) -> tuple[str, int]:
+
+    # Finish out of order, so delivery order has to be restored
+    time.sleep(random.random() / 100)
+
+    if raw_message.body["seq"] == 3:
+        raise InvalidMessage("Skip me")
+
+    return raw_message.body["rid"], raw_message.body["seq"]
+
+
+def message_type_and_ts(raw_message: RawMessage) -> tuple[str, str]:
+    return raw_message.message_type, raw_message.body["ts"]
+
+
+class TestProcessPoolHandler:
+
+    def test__delivers_in_arrival_order(self) -> None:
+
+        results: list[tuple[str, int]] = []
+        handler = ProcessPoolHandler(process, results.append, workers=4, max_in_flight=8)
+
+        for seq in range(40):
+            handler.on_message(RawMessage("TS", {"rid": f"rid{seq % 3}", "seq": seq}))
+
+        handler.close()
+
+        assert results == [(f"rid{seq % 3}", seq) for seq in range(40) if seq != 3]
+
+    def test__lazy_bodies_decoded_in_workers(self) -> None:
+
+        with open("tests/fixtures/kafka_records.jsonl", "rb") as f:
+            raw_messages = [RawMessage.create_from_kafka_bytes(line.strip()) for line in f if line.strip()]
+
+        results: list[tuple[str, str]] = []
+        handler = ProcessPoolHandler(message_type_and_ts, results.append, workers=2)
+
+        for raw_message in raw_messages:
+            handler.on_message(raw_message)
+
+        handler.close()
+
+        assert results == [(raw_message.message_type, raw_message.body["ts"]) for raw_message in raw_messages]
+
+    def test__acknowledged_after_delivery(self) -> None:
+
+        acked: list[int] = []
+        results: list[tuple[str, int]] = []
+        handler = ProcessPoolHandler(process, results.append, workers=2)
+
+        for seq in range(5):
+            handler.on_message(RawMessage("TS", {"rid": "rid", "seq": seq}, ack=lambda seq=seq: acked.append(seq)))
+
+        handler.close()
+
+        assert acked == list(range(5))
+        assert ProcessPoolHandler.acks_messages
+
+    def test__passes_messages(self) -> None:
+
+        acked: list[int] = []
+        held: list[RawMessage] = []
+        handler = ProcessPoolHandler(
+            process, lambda result, raw_message: held.append(raw_message), workers=2, passes_messages=True
+        )
+
+        for seq in range(5):
+            handler.on_message(RawMessage("TS", {"rid": "rid", "seq": seq}, ack=lambda seq=seq: acked.append(seq)))
+
+        handler.close()
+
+        # Left to on_result, except for the message that failed to process
+        assert acked == [3]
+        assert [raw_message.body["seq"] for raw_message in held] == [0, 1, 2, 4]
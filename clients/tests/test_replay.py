@@ -0,0 +1,122 @@
+import time
+from datetime import datetime, timezone
+from unittest import mock
+
+from confluent_kafka import OFFSET_END, TopicPartition
+from tests.conftest import MockMessageHandler, create_record
+
+from clients.kafka import KafkaClient
+from clients.replay import THROUGHPUT_PROFILE, CatchUp, FetchProfile
+
+SINCE = datetime(2025, 11, 1, 12, 0, tzinfo=timezone.utc)
+
+
+class TestCatchUp:
+
+    def test__seek(self) -> None:
+
+        consumer = mock.Mock()
+        consumer.offsets_for_times.return_value = [TopicPartition("topic", 0, 1500), TopicPartition("topic", 1, -1)]
+
+        catch_up = CatchUp(SINCE)
+        partitions = catch_up.seek(consumer, [TopicPartition("topic", 0), TopicPartition("topic", 1)])
+
+        consumer.offsets_for_times.assert_called_once_with(
+            [TopicPartition("topic", 0, 1761998400000), TopicPartition("topic", 1, 1761998400000)], timeout=10.0
+        )
+        assert [(p.partition, p.offset) for p in partitions] == [(0, 1500), (1, OFFSET_END)]
+        assert not catch_up.caught_up
+
+    def test__caught_up_waits_for_every_seeked_partition(self) -> None:
+
+        consumer = mock.Mock()
+        consumer.offsets_for_times.return_value = [TopicPartition("topic", 0, 1500), TopicPartition("topic", 1, 900)]
+
+        catch_up = CatchUp(SINCE, head_secs=30)
+        catch_up.seek(consumer, [TopicPartition("topic", 0), TopicPartition("topic", 1)])
+
+        # Partition 1 hasn't been read from yet, so it is still behind
+        catch_up.observe("topic", 0, int((time.time() - 5) * 1000))
+        assert not catch_up.caught_up
+
+        catch_up.revoke("topic", 1)
+        assert catch_up.caught_up
+
+    def test__seek_once_per_partition(self) -> None:
+
+        consumer = mock.Mock()
+        consumer.offsets_for_times.return_value = [TopicPartition("topic", 0, 1500)]
+
+        catch_up = CatchUp(SINCE)
+        catch_up.seek(consumer, [TopicPartition("topic", 0)])
+        partitions = catch_up.seek(consumer, [TopicPartition("topic", 0, 1800)])
+
+        assert consumer.offsets_for_times.call_count == 1
+        assert partitions[0].offset == 1800
+
+    def test__caught_up(self) -> None:
+
+        catch_up = CatchUp(SINCE, head_secs=30)
+        assert not catch_up.caught_up
+
+        catch_up.observe("topic", 0, int((time.time() - 5) * 1000))
+        catch_up.observe("topic", 1, int((time.time() - 3600) * 1000))
+        assert not catch_up.caught_up
+
+        catch_up.reached_end("topic", 1)
+        assert catch_up.caught_up
+        assert catch_up.records == 2
+
+
+class TestKafkaClientCatchUp:
+
+    def test__reads_with_profile_until_caught_up(self) -> None:
+
+        profile = FetchProfile(batch_size=200, batch_linger_secs=0.5, config={"fetch.min.bytes": 1024})
+        catch_up = CatchUp(SINCE, head_secs=30, profile=profile)
+
+        consumer = mock.Mock()
+        consumer.consume.return_value = [create_record(age_secs=3600)]
+
+        handler = MockMessageHandler()
+        client = KafkaClient(consumer, handler, "topic", {"group.id": "group"}, batch_size=1, catch_up=catch_up)
+
+        assert client._consumer_config() == {"group.id": "group", "fetch.min.bytes": 1024}
+
+        client._handle_records(client._receive())
+        client._after_receive()
+
+        consumer.consume.assert_called_once_with(num_messages=200, timeout=0.5)
+        assert client.catch_up is catch_up
+
+        with mock.patch("clients.kafka.Consumer") as consumer_class:
+            client._handle_records([create_record(age_secs=1)])
+            client._after_receive()
+
+        assert client.catch_up is None
+        assert client._batch_size == 1
+        consumer.close.assert_called_once()
+        consumer_class.assert_called_once_with({"group.id": "group"})
+        consumer_class.return_value.subscribe.assert_called_once()
+        assert len(handler.messages) == 2
+
+    def test__assign_seeks(self) -> None:
+
+        consumer = mock.Mock()
+        consumer.offsets_for_times.return_value = [TopicPartition("topic", 0, 42)]
+
+        client = KafkaClient(mock.Mock(), MockMessageHandler(), "topic", {}, catch_up=CatchUp(SINCE))
+        client._on_assign(consumer, [TopicPartition("topic", 0)])
+
+        consumer.assign.assert_called_once_with([TopicPartition("topic", 0, 42)])
+
+    @mock.patch("clients.kafka.Consumer")
+    def test_create__throughput_profile(self, consumer_class: mock.Mock) -> None:
+
+        KafkaClient.create("server", "topic", "user", "password", MockMessageHandler(), catch_up=CatchUp(SINCE))
+
+        config = consumer_class.call_args[0][0]
+
+        assert config["fetch.max.bytes"] == THROUGHPUT_PROFILE.config["fetch.max.bytes"]
+        assert config["enable.partition.eof"] is True
+        assert config["bootstrap.servers"] == "server"
@@ -0,0 +1,101 @@
+from typing import Optional
+
+from clients.sequence import SequenceTracker
+from clients.stomp import RawMessage
+
+
+def message(sequence: Optional[int]) -> RawMessage:
+    return RawMessage("TS", {}, sequence=sequence)
+
+
+def run(tracker: SequenceTracker, sequences: list[Optional[int]]) -> list[bool]:
+    return [tracker(message(sequence)) for sequence in sequences]
+
+
+class TestSequenceTracker:
+
+    def test__in_order(self) -> None:
+
+        tracker = SequenceTracker()
+
+        assert run(tracker, [10, 11, 12, 13]) == [True] * 4
+        assert tracker.highest == 13
+        assert tracker.stats.gaps == tracker.stats.duplicates == tracker.stats.out_of_order == 0
+
+    def test__gap(self) -> None:
+
+        gaps = []
+        tracker = SequenceTracker(window=8, on_gap=lambda first, last: gaps.append((first, last)))
+
+        assert run(tracker, [10, 11, 15, 16]) == [True] * 4
+        assert gaps == []
+
+        # Reported once the missing sequences, and the one after them, fall out of the window
+        assert run(tracker, list(range(17, 23))) == [True] * 6
+        assert gaps == []
+
+        assert run(tracker, [23]) == [True]
+        assert gaps == [(12, 14)]
+        assert tracker.stats.gaps == 1
+        assert tracker.stats.missing == 3
+
+    def test__interleaved_partitions(self) -> None:
+
+        gaps = []
+        tracker = SequenceTracker(window=8, on_gap=lambda first, last: gaps.append((first, last)))
+
+        # Two partitions read in turn, each a little ahead of the other
+        assert run(tracker, [10, 12, 14, 11, 16, 13, 15, 17] + list(range(18, 30))) == [True] * 20
+        assert gaps == []
+        assert tracker.stats.missing == 0
+        assert tracker.stats.out_of_order == 3
+
+    def test__duplicates_are_dropped(self) -> None:
+
+        tracker = SequenceTracker()
+
+        assert run(tracker, [10, 11, 11, 12, 10]) == [True, True, False, True, False]
+        assert tracker.stats.duplicates == 2
+
+    def test__out_of_order_fills_gap(self) -> None:
+
+        tracker = SequenceTracker()
+
+        assert run(tracker, [10, 13, 12, 11, 12]) == [True, True, True, True, False]
+        assert tracker.stats.out_of_order == 2
+        assert tracker.stats.duplicates == 1
+        assert tracker.highest == 13
+
+    def test__too_old(self) -> None:
+
+        tracker = SequenceTracker(window=8)
+
+        assert run(tracker, [100, 90, 100]) == [True, True, False]
+        assert tracker.stats.too_old == 1
+
+    def test__large_jump(self) -> None:
+
+        tracker = SequenceTracker(window=8)
+
+        assert run(tracker, [1, 1_000_000, 999_999, 1_000_000]) == [True, True, True, False]
+
+        # The last window's worth may still arrive
+        assert tracker.stats.gaps == 1
+        assert tracker.stats.missing == 999_991
+
+    def test__rollover(self) -> None:
+
+        gaps = []
+        tracker = SequenceTracker(window=4, on_gap=lambda first, last: gaps.append((first, last)), modulus=100)
+
+        assert run(tracker, [98, 99, 0, 2, 99, 3, 4, 5, 6]) == [True] * 4 + [False] + [True] * 4
+        assert gaps == [(1, 1)]
+        assert tracker.highest == 6
+
+    def test__unsequenced(self) -> None:
+
+        tracker = SequenceTracker()
+
+        assert run(tracker, [None, 1, None]) == [True, True, True]
+        assert tracker.stats.unsequenced == 2
+        assert tracker.stats.seen == 1
@@ -1,3 +1,4 @@
+import gzip
 import os
 from unittest import mock
 
@@ -9,7 +10,6 @@ from clients.stomp import (
     Credentials,
     InvalidCredentials,
     InvalidMessage,
-    MessageHandlerInterface,
     RawMessage,
     StompClient,
 )
@@ -31,11 +31,6 @@ class MockStompListener(stomp.ConnectionListener):
     def on_message(self, frame) -> None: ...
 
 
-class MockMessageHandler(MessageHandlerInterface):
-
-    def on_message(self, raw_message: RawMessage) -> None: ...
-
-
 class TestStompClient:
 
     def test_connect(self) -> None:
@@ -179,6 +174,7 @@ class TestRawMessage:
                     },
                 }
             },
+            sequence=8957657,
         )
 
     def test__no_meeting_type(self) -> None:
@@ -187,3 +183,21 @@ class TestRawMessage:
 
         with pytest.raises(InvalidMessage):
             RawMessage.create(frame)
+
+    def test__without_xml_decode(self) -> None:
+
+        xml = b'<Pport ts="2024-06-25T18:57:01.3811322+01:00"><uR><TS rid="1" uid="A"/></uR></Pport>'
+        frame = Frame(cmd="MESSAGE", headers={"MessageType": "TS"}, body=gzip.compress(xml))
+
+        assert RawMessage.create(frame, decode_xml=False) == RawMessage("TS", {}, payload=xml)
+
+    def test__lazy_xml(self) -> None:
+
+        xml = b'<Pport ts="2024-06-25T18:57:01.3811322+01:00"><uR><TS rid="1" uid="A"/></uR></Pport>'
+        frame = Frame(cmd="MESSAGE", headers={"MessageType": "TS"}, body=gzip.compress(xml))
+
+        raw_message = RawMessage.create(frame, lazy_xml=True)
+
+        assert raw_message.payload == xml
+        assert not raw_message.body.decoded
+        assert raw_message.body == RawMessage.create(frame).body
@@ -0,0 +1,193 @@
+from unittest import mock
+
+import pytest
+from confluent_kafka import KafkaError, KafkaException
+
+from clients.kafka import KafkaClient
+from clients.stomp import StompClient, _ReconnectListener
+from clients.supervisor import Backoff, ConnectionSupervisor
+
+NO_WAIT = Backoff(first_retry_secs=0.0, base_secs=0.0)
+
+
+class FlakyConnect:
+
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self) -> None:
+        self.calls += 1
+
+        if self.calls <= self.failures:
+            raise ConnectionError("refused")
+
+
+class TestBackoff:
+
+    @mock.patch("clients.supervisor.random.random", return_value=0.0)
+    def test__delay(self, _) -> None:
+
+        backoff = Backoff(first_retry_secs=0.1, base_secs=1.0, multiplier=2.0, max_secs=5.0)
+
+        assert [backoff.delay(attempt) for attempt in range(6)] == [0.1, 1.0, 2.0, 4.0, 5.0, 5.0]
+
+    @mock.patch("clients.supervisor.random.random", return_value=1.0)
+    def test__jitter(self, _) -> None:
+
+        assert Backoff(base_secs=4.0, jitter=0.5).delay(1) == 2.0
+
+
+class TestConnectionSupervisor:
+
+    def test__reconnect(self) -> None:
+
+        connect = FlakyConnect(failures=2)
+        supervisor = ConnectionSupervisor(connect, NO_WAIT)
+
+        assert supervisor.reconnect()
+        assert connect.calls == 3
+        assert supervisor.metrics.reconnects == 0
+
+        supervisor.healthy()
+
+        assert supervisor.metrics.disconnects == 1
+        assert supervisor.metrics.reconnects == 1
+        assert supervisor.metrics.failed_attempts == 2
+        assert supervisor.metrics.last_recovery_secs is not None
+
+    def test__metrics_kept_across_reconnects(self) -> None:
+
+        supervisor = ConnectionSupervisor(FlakyConnect(failures=0), NO_WAIT)
+
+        for _ in range(3):
+            supervisor.disconnected()
+            supervisor.reconnect()
+            supervisor.healthy()
+
+        assert (supervisor.metrics.disconnects, supervisor.metrics.reconnects) == (3, 3)
+        assert supervisor.metrics.mean_recovery_secs >= 0.0
+
+    def test__gives_up(self) -> None:
+
+        connect = FlakyConnect(failures=10)
+        supervisor = ConnectionSupervisor(connect, NO_WAIT, max_attempts=3)
+
+        assert not supervisor.reconnect()
+        assert supervisor.gave_up
+        assert connect.calls == 3
+
+    def test__dropping_before_healthy_counts_as_failed(self) -> None:
+
+        connect = FlakyConnect(failures=0)
+        supervisor = ConnectionSupervisor(connect, NO_WAIT, max_attempts=3)
+
+        # Every connect goes through, but the connection drops again before anything arrives
+        while supervisor.reconnect():
+            supervisor.disconnected()
+
+        assert supervisor.gave_up
+        assert connect.calls == 3
+        assert supervisor.metrics.disconnects == 1
+        assert supervisor.metrics.reconnects == 0
+        assert supervisor.metrics.failed_attempts == 3
+
+    @mock.patch("clients.supervisor.random.random", return_value=0.0)
+    def test__backoff_kept_until_healthy(self, _) -> None:
+
+        backoff = mock.Mock(wraps=Backoff(first_retry_secs=0.0, base_secs=0.0))
+        supervisor = ConnectionSupervisor(FlakyConnect(failures=0), backoff)
+
+        supervisor.reconnect()
+        supervisor.disconnected()
+        supervisor.reconnect()
+        supervisor.healthy()
+        supervisor.disconnected()
+        supervisor.reconnect()
+
+        assert [call.args[0] for call in backoff.delay.call_args_list] == [0, 1, 0]
+
+    def test__healthy_after_staying_up(self) -> None:
+
+        supervisor = ConnectionSupervisor(FlakyConnect(failures=0), NO_WAIT, healthy_secs=0.0)
+
+        supervisor.reconnect()
+        supervisor.disconnected()
+
+        assert supervisor.metrics.reconnects == 1
+        assert supervisor.metrics.failed_attempts == 0
+        assert supervisor.metrics.disconnects == 2
+
+    def test__stopped(self) -> None:
+
+        connect = FlakyConnect(failures=0)
+        supervisor = ConnectionSupervisor(connect, NO_WAIT)
+        supervisor.stop()
+
+        supervisor.reconnect_in_background()
+
+        assert not supervisor.reconnect()
+        assert connect.calls == 0
+
+
+class TestStompClientReconnect:
+
+    def test__reconnects_in_background_after_drop(self) -> None:
+
+        conn = mock.Mock()
+        client = StompClient(conn, mock.Mock(), backoff=NO_WAIT)
+        client.connect("username", "password", "topic")
+
+        client._on_disconnected()
+        client.supervisor._thread.join()
+        _ReconnectListener(client).on_message(mock.Mock())
+
+        assert client.connected
+        assert conn.connect.call_count == 2
+        assert client.supervisor.metrics.reconnects == 1
+
+    def test__deliberate_disconnect_not_reconnected(self) -> None:
+
+        conn = mock.Mock()
+        client = StompClient(conn, mock.Mock(), backoff=NO_WAIT)
+        client.connect("username", "password", "topic")
+
+        client.disconnect()
+        client._on_disconnected()
+
+        assert conn.connect.call_count == 1
+        assert client.supervisor.metrics.disconnects == 0
+
+
+class TestKafkaClientReconnect:
+
+    @mock.patch("clients.kafka.Consumer")
+    def test__gives_up_after_max_attempts(self, consumer_class: mock.Mock) -> None:
+
+        consumer = mock.Mock()
+        consumer.subscribe.side_effect = KafkaException("down")
+        consumer_class.return_value = consumer
+
+        client = KafkaClient(consumer, mock.Mock(), "topic", {}, backoff=NO_WAIT)
+        client.run_with_reconnect(max_reconnect_attempts=2)
+
+        assert client.supervisor.gave_up
+        assert consumer.subscribe.call_count == 3
+        assert consumer_class.call_count == 2
+
+    @mock.patch("clients.kafka.Consumer")
+    def test__gives_up_when_every_poll_fails(self, consumer_class: mock.Mock) -> None:
+
+        record = mock.Mock()
+        record.error.return_value.code.return_value = KafkaError._TRANSPORT
+
+        consumer = mock.Mock()
+        consumer.poll.return_value = record
+        consumer_class.return_value = consumer
+
+        client = KafkaClient(consumer, mock.Mock(), "topic", {}, backoff=NO_WAIT)
+        client.run_with_reconnect(max_reconnect_attempts=2)
+
+        assert client.supervisor.gave_up
+        assert consumer.subscribe.call_count == 3
+        assert client.supervisor.metrics.failed_attempts == 2
@@ -6,6 +6,7 @@ from parser import RawMessageHandler
 import click
 from writer import StdOutWriter
 
+from clients.filters import IngestFilter
 from clients.stomp import Credentials, StompClient
 from models.common import MessageType
 from models.schedule import ScheduleParser
@@ -13,7 +14,16 @@ from models.ts import TSParser
 
 
 @click.command()
-def main() -> None:
+@click.option("--message-type", "message_types", multiple=True)
+@click.option("--toc", "tocs", multiple=True)
+@click.option("--tpl", "tpls", multiple=True)
+@click.option("--rid-prefix", "rid_prefixes", multiple=True)
+def main(
+    message_types: tuple[str, ...],
+    tocs: tuple[str, ...],
+    tpls: tuple[str, ...],
+    rid_prefixes: tuple[str, ...],
+) -> None:
 
     hostname = "darwin-dist-44ae45.nationalrail.co.uk"
     port = 61613
@@ -21,14 +31,19 @@ def main() -> None:
 
     credentials = Credentials.parse()
 
+    ingest_filter = IngestFilter(message_types, tocs, tpls, rid_prefixes).compile()
+
     message_handler = RawMessageHandler(
-        parsers={MessageType.SC: ScheduleParser(), MessageType.TS: TSParser()}, writer=StdOutWriter()
+        parsers={MessageType.SC: ScheduleParser(), MessageType.TS: TSParser()},
+        writer=StdOutWriter(),
+        ingest_filter=ingest_filter,
     )
 
     client = StompClient.create(
         hostname=hostname,
         port=port,
         message_handler=message_handler,
+        lazy_xml=True,
     )
 
     print("Opening connection")
@@ -39,6 +54,7 @@ def main() -> None:
             time.sleep(1)
     finally:
         print("Closing connection")
+        print(ingest_filter.stats.summary())
         client.disconnect()
 
 
@@ -1,5 +1,6 @@
 import json
 
+from clients.filters import IngestFilter
 from clients.stomp import RawMessage, WriterInterface
 from example.parser import RawMessageHandler
 
@@ -24,3 +25,32 @@ class TestRawMessageParser:
         handler.on_message(raw_message)
 
         assert mock_writer.data == [json.load(open("tests/fixtures/sc/darwin_1.json", "r"))]
+
+    def test__ingest_filter(self) -> None:
+
+        raw_message = RawMessage("SC", json.load(open("tests/fixtures/sc/darwin_1.json", "r")))
+
+        mock_writer = MockWriter()
+        ingest_filter = IngestFilter(message_types=["TS"]).compile()
+        handler = RawMessageHandler({}, mock_writer, ingest_filter)
+        handler.on_message(raw_message)
+
+        assert mock_writer.data == []
+        assert ingest_filter.stats.dropped_by == {"message_type": 1}
+
+    def test__on_messages(self) -> None:
+
+        body = json.load(open("tests/fixtures/sc/darwin_1.json", "r"))
+        raw_messages = [
+            RawMessage("SC", body),
+            RawMessage("TS", body),
+            RawMessage("TS", body),
+        ]
+
+        mock_writer = MockWriter()
+        ingest_filter = IngestFilter(message_types=["TS"]).compile()
+        handler = RawMessageHandler({}, mock_writer, ingest_filter)
+        handler.on_messages(raw_messages)
+
+        assert mock_writer.data == [body, body]
+        assert ingest_filter.stats.processed == 2
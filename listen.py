@@ -2,8 +2,10 @@ from __future__ import annotations
 
 import os
 import time
+from contextlib import nullcontext
 from typing import Optional
 
+from clients.filters import CompiledFilter, IngestFilter
 from clients.stomp import (
     Credentials,
     MessageHandlerInterface,
@@ -20,12 +22,20 @@ class InvalidEnvironment(Exception): ...
 class RawMessageHandler(MessageHandlerInterface):
 
     def __init__(
-        self, parsers: dict[MessageType, MessageParserInterface] = {}, writer: Optional[WriterInterface] = None
-    ) -> None: ...
+        self,
+        parsers: dict[MessageType, MessageParserInterface] = {},
+        writer: Optional[WriterInterface] = None,
+        ingest_filter: Optional[CompiledFilter] = None,
+    ) -> None:
+        self._ingest_filter = ingest_filter
 
     def on_message(self, raw_message: RawMessage) -> None:
-        if raw_message.message_type == MessageType.TS or raw_message.message_type == MessageType.SC:
-            print(raw_message)
+        if self._ingest_filter is not None and not self._ingest_filter(raw_message):
+            return
+
+        with self._ingest_filter.processing() if self._ingest_filter else nullcontext():
+            if raw_message.message_type == MessageType.TS or raw_message.message_type == MessageType.SC:
+                print(raw_message)
 
 
 def main() -> None:
@@ -36,36 +46,32 @@ def main() -> None:
 
     credentials = Credentials.parse()
 
-    message_handler = RawMessageHandler(parsers={}, writer=None)
+    # Drop everything but TS and SC before the XML is decoded
+    ingest_filter = IngestFilter(message_types=(MessageType.TS, MessageType.SC)).compile()
+
+    message_handler = RawMessageHandler(parsers={}, writer=None, ingest_filter=ingest_filter)
     client = StompClient.create(
         hostname=hostname,
         port=port,
         message_handler=message_handler,
+        lazy_xml=True,
+        queue_size=1000,  # Keep handling off the receiver thread so heartbeats are never starved
     )
 
     client.connect(credentials.username, credentials.password, topic)
 
-    reconnect = 0
     log_timer = 0
 
     try:
-        while True:
-            if not client.connected:
-                print(f"Reconnecting... {reconnect}")
-
-                if reconnect >= 3:
-                    print(f"Unable to connect after {reconnect} attempts.")
-                    break
-
-                client.connect(credentials.username, credentials.password, topic)
-                reconnect += 1
-            else:
-                reconnect = 0
-
+        # Dropped connections are recovered in the background by the client's supervisor
+        while not client.supervisor.gave_up:
             if log_timer > 300:
-                print("Still connected")
+                print("Still connected" if client.connected else "Reconnecting...")
+                print(ingest_filter.stats.summary())
+                print(client.metrics)
+                print(client.supervisor.metrics)
                 log_timer = 0
-    
+
             log_timer += 1
             time.sleep(1)
 
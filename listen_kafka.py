@@ -1,12 +1,27 @@
 from __future__ import annotations
 
 import logging
-from typing import Optional
+import os
+import threading
+from contextlib import nullcontext
+from datetime import datetime
+from functools import partial
+from typing import Callable, Optional, Sequence
 
+from clients.filters import CompiledFilter, IngestFilter
 from clients.kafka import KafkaClient, KafkaCredentials
+from clients.metrics import DEFAULT_METRICS_PORT, KafkaMetrics, MetricsServer
+from clients.pool import ProcessPoolHandler
+from clients.replay import CatchUp
+from clients.sequence import SequenceTracker
 from clients.stomp import MessageHandlerInterface, RawMessage, WriterInterface
-from models.common import MessageParserInterface, MessageType
-
+from models.board import DepartureBoard
+from models.coalesce import Coalescer, Emitted
+from models.common import FormattedMessage, MessageParserInterface, MessageType
+from models.dedup import Deduplicator
+from models.dispatch import UpdateDispatcher
+from models.kafka import LOParser, ScheduleParser, TSParser
+from models.state import ServiceStateStore
 
 # Configure logging
 logging.basicConfig(
@@ -15,6 +30,15 @@ logging.basicConfig(
 )
 
 
+def dispatch_message(dispatcher: UpdateDispatcher, raw_message: RawMessage) -> list[FormattedMessage]:
+    return dispatcher.dispatch(raw_message.body)
+
+
+def print_messages(formatted_messages: list[FormattedMessage]) -> None:
+    for formatted_message in formatted_messages:
+        print(formatted_message)
+
+
 class RawMessageHandler(MessageHandlerInterface):
     """Handler for raw Kafka messages."""
 
@@ -22,11 +46,45 @@ class RawMessageHandler(MessageHandlerInterface):
         self,
         parsers: dict[MessageType, MessageParserInterface] = {},
         writer: Optional[WriterInterface] = None,
+        ingest_filter: Optional[CompiledFilter] = None,
+        workers: int = 0,
+        sequence_tracker: Optional[SequenceTracker] = None,
+        deduplicator: Optional[Deduplicator] = None,
+        coalescer: Optional[Coalescer] = None,
+        state: Optional[ServiceStateStore] = None,
     ) -> None:
         self.parsers = parsers
+        self.dispatcher = UpdateDispatcher(parsers)
         self.writer = writer
+        self.ingest_filter = ingest_filter
+        self.sequence_tracker = sequence_tracker
+        self.deduplicator = deduplicator
+        self.coalescer = coalescer
+        self.state = state
         self.message_count = 0
 
+        # Writes come from the pool's delivery thread and idle polls from the client's
+        self._write_lock = threading.Lock()
+
+        # Decode and parse on a process pool, printing results in arrival order
+        self.pool: Optional[ProcessPoolHandler] = None
+
+        if workers:
+            if coalescer is not None:
+                self.pool = ProcessPoolHandler(
+                    partial(dispatch_message, self.dispatcher), self.write_message, workers, passes_messages=True
+                )
+            else:
+                self.pool = ProcessPoolHandler(partial(dispatch_message, self.dispatcher), self.write, workers)
+
+        # The pool acknowledges messages once printed, and the coalescer once the updates it holds
+        # are, so offsets are not committed ahead of either
+        self.acks_messages = self.pool is not None or coalescer is not None
+
+        # Acknowledgements of sequence duplicates, by the sequence of the original they wait on
+        self._held: dict[int, list[Callable[[], None]]] = {}
+        self._held_lock = threading.Lock()
+
     def on_message(self, raw_message: RawMessage) -> None:
         """Process incoming message."""
         self.message_count += 1
@@ -34,9 +92,144 @@ class RawMessageHandler(MessageHandlerInterface):
         # Log every message for debugging
         print(f"Message {self.message_count}: Type={raw_message.message_type}")
 
-        # Example: Print LO messages in detail
-        if raw_message.message_type == MessageType.LO:
-            print(f"LO Message: {raw_message}")
+        # Checked against the raw payload, so dropped messages are never decoded
+        if not self.keep(raw_message):
+            return
+
+        if self.pool is not None:
+            self.pool.on_message(raw_message)
+            return
+
+        # Every element in the uR is routed to its parser, not just the one the message was typed as
+        with self.ingest_filter.processing() if self.ingest_filter else nullcontext():
+            try:
+                formatted_messages = dispatch_message(self.dispatcher, raw_message)
+            except Exception:
+                # Nothing from it is held, so it is done with
+                if self.acks_messages:
+                    raw_message.acknowledge()
+                raise
+
+            self.write(formatted_messages, [raw_message])
+
+    def keep(self, raw_message: RawMessage) -> bool:
+        """
+        Drops duplicate deliveries, then messages rejected by the ingest filter, acknowledging them
+        if this handler acknowledges messages. A duplicate of a message still in the pool or the
+        coalescer is only acknowledged once that message is, so it is never committed first.
+        """
+
+        # Every message is sequenced, filtered or not, so gaps are only reported for ones never received
+        if self.sequence_tracker is not None and not self.sequence_tracker(raw_message):
+            self._drop_duplicate(raw_message)
+            return False
+
+        if self.ingest_filter is not None and not self.ingest_filter(raw_message):
+            self._drop(raw_message)
+            return False
+
+        if self.acks_messages and self.sequence_tracker is not None:
+            self._hold(raw_message)
+
+        return True
+
+    def _drop(self, raw_message: RawMessage) -> None:
+
+        # Otherwise the client acknowledges it once the handler returns
+        if self.acks_messages:
+            raw_message.acknowledge()
+
+    def _drop_duplicate(self, raw_message: RawMessage) -> None:
+
+        with self._held_lock:
+            waiting = self._held.get(raw_message.sequence)  # type: ignore[arg-type]
+
+            if waiting is not None:
+                waiting.append(raw_message.acknowledge)
+                return
+
+        self._drop(raw_message)
+
+    def _hold(self, raw_message: RawMessage) -> None:
+
+        if raw_message.sequence is None or raw_message.ack is None:
+            return
+
+        with self._held_lock:
+            self._held[raw_message.sequence] = []
+
+        raw_message.ack = partial(self._release, raw_message.sequence, raw_message.ack)
+
+    def _release(self, sequence: int, ack: Callable[[], None]) -> None:
+
+        ack()
+
+        with self._held_lock:
+            waiting = self._held.pop(sequence, [])
+
+        for duplicate_ack in waiting:
+            duplicate_ack()
+
+    def on_messages(self, raw_messages: list[RawMessage]) -> None:
+        """Process a batch of incoming messages, printing the results once per batch."""
+        self.message_count += len(raw_messages)
+
+        print(f"Batch of {len(raw_messages)} messages, {self.message_count} in total")
+
+        if self.pool is not None:
+            for raw_message in raw_messages:
+                if self.keep(raw_message):
+                    self.pool.on_message(raw_message)
+            return
+
+        if self.ingest_filter is not None or self.sequence_tracker is not None:
+            raw_messages = [raw_message for raw_message in raw_messages if self.keep(raw_message)]
+
+        formatted_messages: list[FormattedMessage] = []
+
+        with self.ingest_filter.processing(len(raw_messages)) if self.ingest_filter else nullcontext():
+            for raw_message in raw_messages:
+                try:
+                    formatted_messages.extend(dispatch_message(self.dispatcher, raw_message))
+                except Exception as e:
+                    logging.error(f"Error processing message: {e}")
+
+        self.write(formatted_messages, raw_messages)
+
+    def on_idle(self) -> None:
+        """Writes the coalesced updates whose window closed while nothing was arriving."""
+
+        if self.coalescer is not None:
+            with self._write_lock:
+                self._emit(self.coalescer.poll())
+
+    def write(self, formatted_messages: list[FormattedMessage], raw_messages: Sequence[RawMessage] = ()) -> None:
+        """
+        Writes the updates parsed from raw_messages. With a coalescer the raw messages are
+        acknowledged here, once every update from them has been written.
+        """
+
+        with self._write_lock:
+            # Redelivered updates are dropped here rather than written again
+            if self.deduplicator is not None:
+                formatted_messages = self.deduplicator(formatted_messages)
+
+            # Kept up to date with every update, ahead of coalescing
+            if self.state is not None:
+                self.state.apply(formatted_messages)
+
+            # Forecasts for a service are held for the window and merged, then written with a later batch
+            if self.coalescer is not None:
+                self._emit(self.coalescer.add(formatted_messages, [m.acknowledge for m in raw_messages]))
+            else:
+                print_messages(formatted_messages)
+
+    def write_message(self, formatted_messages: list[FormattedMessage], raw_message: RawMessage) -> None:
+        self.write(formatted_messages, [raw_message])
+
+    def _emit(self, emitted: Emitted) -> None:
+        print_messages(emitted)
+        emitted.acknowledge()
 
 
 def main() -> None:
@@ -53,8 +246,63 @@ def main() -> None:
     # - DARWIN_KAFKA_GROUP_ID (or DARWIN_GROUP_ID) - from RDM portal "Pub/Sub" tab
     credentials = KafkaCredentials.parse()
 
+    parsers = {MessageType.SC: ScheduleParser(), MessageType.TS: TSParser(), MessageType.LO: LOParser()}
+
+    # Drop message types without a parser before their payload is decoded
+    ingest_filter = IngestFilter(message_types=parsers.keys()).compile()
+
+    # Optional number of worker processes to decode and parse on, e.g. DARWIN_WORKERS=4
+    workers = int(os.environ.get("DARWIN_WORKERS", "0"))
+
+    # Records to consume per call and hand to the handler as one batch, e.g. DARWIN_BATCH_SIZE=100
+    batch_size = int(os.environ.get("DARWIN_BATCH_SIZE", "1"))
+
+    # Lag, throughput and latency, scraped from http://127.0.0.1:<port>/metrics
+    metrics = KafkaMetrics()
+    metrics_port = int(os.environ.get("DARWIN_METRICS_PORT", DEFAULT_METRICS_PORT))
+    metrics_server = MetricsServer(metrics, port=metrics_port).start()
+
+    # Optional time to replay from after downtime, e.g. DARWIN_REPLAY_SINCE=2025-11-01T12:00:00+00:00
+    replay_since = os.environ.get("DARWIN_REPLAY_SINCE")
+    catch_up = CatchUp(datetime.fromisoformat(replay_since)) if replay_since else None
+
+    # Drop redelivered messages by their PushPortSequence, and count gaps in it
+    sequence_tracker = SequenceTracker()
+    metrics.add_gauge("darwin_sequence_gaps", "PushPortSequence gaps seen", lambda: sequence_tracker.stats.gaps)
+    metrics.add_gauge("darwin_sequence_missing", "Sequences skipped by gaps", lambda: sequence_tracker.stats.missing)
+    metrics.add_gauge("darwin_sequence_duplicates", "Duplicates dropped", lambda: sequence_tracker.stats.duplicates)
+    metrics.add_gauge(
+        "darwin_sequence_out_of_order",
+        "Messages behind the highest sequence",
+        lambda: sequence_tracker.stats.out_of_order,
+    )
+
+    # Drop updates already written, e.g. after a consumer group rebalance or an offset reset
+    deduplicator = Deduplicator()
+    metrics.add_gauge("darwin_dedup_dropped", "Updates dropped as duplicates", lambda: deduplicator.stats.dropped)
+
+    # Optional window to merge rapid TS updates per service over, e.g. DARWIN_COALESCE_SECS=2. Offsets are
+    # only committed once the merged updates are written, so anything held is redelivered after a crash
+    coalesce_secs = float(os.environ.get("DARWIN_COALESCE_SECS", "0"))
+    coalescer = Coalescer(coalesce_secs) if coalesce_secs else None
+
+    # Current calling points of every service, e.g. state.get(rid).last_reported for where a train is now,
+    # indexed by station for board.departures(tpl, after)
+    board = DepartureBoard()
+    state = ServiceStateStore(board=board)
+    metrics.add_gauge("darwin_services_tracked", "Services held in the state store", lambda: len(state))
+
     # Create message handler
-    message_handler = RawMessageHandler(parsers={}, writer=None)
+    message_handler = RawMessageHandler(
+        parsers=parsers,
+        writer=None,
+        ingest_filter=ingest_filter,
+        workers=workers,
+        sequence_tracker=sequence_tracker,
+        deduplicator=deduplicator,
+        coalescer=coalescer,
+        state=state,
+    )
 
     # Create Kafka client
     client = KafkaClient.create(
@@ -64,6 +312,12 @@ def main() -> None:
         password=credentials.password,
         message_handler=message_handler,
         group_id=credentials.group_id,  # Use group ID from RDM portal
+        fast_decode=True,  # Keep the raw payload for the ingest filter and decode it lazily
+        batch_size=batch_size,
+        manual_commit=True,  # Commit offsets only once messages have been printed
+        max_pending=1000,  # Pause fetching before the worker pool's in-flight limit blocks polling
+        metrics=metrics,
+        catch_up=catch_up,
         # ssl_ca_location="/path/to/ca-cert.pem",  # Optional: specify CA cert location
     )
 
@@ -80,6 +334,20 @@ def main() -> None:
     # Set max_reconnect_attempts=-1 for infinite retries
     client.run_with_reconnect(max_reconnect_attempts=-1)
 
+    if message_handler.pool is not None:
+        message_handler.pool.close()
+
+    # The consumer has closed, so these offsets stay uncommitted and are delivered again on restart
+    if coalescer is not None:
+        print_messages(coalescer.flush())
+        print(coalescer.stats.summary())
+
+    metrics_server.close()
+
+    print(ingest_filter.stats.summary())
+    print(sequence_tracker.stats.summary())
+    print(deduplicator.stats.summary())
+    print(metrics.summary())
     print("Client stopped")
 
 
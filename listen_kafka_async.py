@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+
+from clients.aio import AsyncMessageSource, AsyncPipeline, AsyncSinkInterface, in_thread
+from clients.filters import IngestFilter
+from clients.kafka import KafkaClient, KafkaCredentials
+from clients.sequence import SequenceTracker
+from clients.stomp import RawMessage
+from models.common import FormattedMessage, MessageType
+from models.dedup import Deduplicator
+from models.dispatch import UpdateDispatcher
+from models.kafka import LOParser, ScheduleParser, TSParser
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+
+class PrintSink(AsyncSinkInterface):
+    """Stands in for a network sink, printing each batch."""
+
+    async def write(self, items: list[FormattedMessage]) -> None:
+        for formatted_message in items:
+            print(formatted_message)
+
+
+def dispatch_batch(dispatcher: UpdateDispatcher, raw_messages: list[RawMessage]) -> list[FormattedMessage]:
+
+    formatted_messages: list[FormattedMessage] = []
+
+    for raw_message in raw_messages:
+        try:
+            formatted_messages.extend(dispatcher.dispatch(raw_message.body))
+        except Exception as e:
+            logging.error(f"Error processing message: {e}")
+
+    return formatted_messages
+
+
+async def main() -> None:
+    """Asyncio variant of listen_kafka, with batches parsed on a thread and written concurrently."""
+
+    bootstrap_server = "pkc-z3p1v0.europe-west2.gcp.confluent.cloud:9092"
+    topic = "prod-1010-Darwin-Train-Information-Push-Port-IIII2_0-JSON"
+
+    credentials = KafkaCredentials.parse()
+
+    parsers = {MessageType.SC: ScheduleParser(), MessageType.TS: TSParser(), MessageType.LO: LOParser()}
+    dispatcher = UpdateDispatcher(parsers)
+    ingest_filter = IngestFilter(message_types=parsers.keys()).compile()
+    sequence_tracker = SequenceTracker()
+    deduplicator = Deduplicator()
+
+    source = AsyncMessageSource()
+
+    client = KafkaClient.create(
+        bootstrap_server=bootstrap_server,
+        topic=topic,
+        username=credentials.username,
+        password=credentials.password,
+        message_handler=source,
+        group_id=credentials.group_id,
+        fast_decode=True,
+        batch_size=int(os.environ.get("DARWIN_BATCH_SIZE", "100")),
+        manual_commit=True,  # Commit offsets only once the sink has written them
+        max_pending=5000,  # Pause fetching while the sink falls behind, bounding what is held in memory
+    )
+
+    def process(raw_messages: list[RawMessage]) -> list[FormattedMessage]:
+
+        # Dropped messages are still acknowledged with the rest of the batch once it is written
+        raw_messages = [raw_message for raw_message in raw_messages if sequence_tracker(raw_message)]
+        formatted_messages = dispatch_batch(
+            dispatcher, [raw_message for raw_message in raw_messages if ingest_filter(raw_message)]
+        )
+        return deduplicator(formatted_messages)
+
+    pipeline = AsyncPipeline(source, in_thread(process), PrintSink())
+
+    # The client polls on a thread, handing messages to the pipeline on the event loop
+    await asyncio.gather(
+        source.run_client(lambda: client.run_with_reconnect(max_reconnect_attempts=-1)),
+        pipeline.run(),
+    )
+
+    print(ingest_filter.stats.summary())
+    print(sequence_tracker.stats.summary())
+    print(deduplicator.stats.summary())
+    print(pipeline.metrics)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,53 @@
+"""
+Compares the xmltodict + dict parser path against PportStreamDecoder on the XML fixtures.
+
+Run from the models directory:
+
+    poetry run python -m benchmarks.decoders --number 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+
+import xmltodict
+
+from models.common import MessageParserInterface
+from models.lo import LOParser
+from models.schedule import ScheduleParser
+from models.stream import PportStreamDecoder
+from models.ts import TSParser
+
+FIXTURES: dict[str, tuple[str, MessageParserInterface]] = {
+    "TS": ("tests/fixtures/xml/ts_full.xml", TSParser()),
+    "SC": ("tests/fixtures/xml/sc_darwin_1.xml", ScheduleParser()),
+    "LO": ("tests/fixtures/xml/lo_full.xml", LOParser()),
+}
+
+
+def main() -> None:
+
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--number", type=int, default=2000)
+    args = arg_parser.parse_args()
+
+    decoder = PportStreamDecoder()
+
+    for message_type, (path, parser) in FIXTURES.items():
+
+        with open(path, "rb") as f:
+            payload = f.read()
+
+        dict_secs = timeit.timeit(lambda: parser.parse(xmltodict.parse(payload)), number=args.number)
+        stream_secs = timeit.timeit(lambda: decoder.decode(payload), number=args.number)
+
+        print(
+            f"{message_type}: xmltodict {dict_secs / args.number * 1e6:.1f}us/msg, "
+            f"stream {stream_secs / args.number * 1e6:.1f}us/msg, "
+            f"speedup {dict_secs / stream_secs:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Compares the models.kafka dict parsers against the typed PportDecoder on the Kafka JSON fixtures.
+
+Run from the models directory:
+
+    poetry run python -m benchmarks.kafka_decoders --number 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import timeit
+
+from models.common import MessageParserInterface
+from models.kafka import LOParser, PportDecoder, ScheduleParser, TSParser
+
+FIXTURES: dict[str, tuple[str, MessageParserInterface]] = {
+    "TS": ("tests/fixtures/kafka/ts.json", TSParser()),
+    "SC": ("tests/fixtures/kafka/sc.json", ScheduleParser()),
+    "LO": ("tests/fixtures/kafka/lo.json", LOParser()),
+}
+
+
+def main() -> None:
+
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--number", type=int, default=5000)
+    args = arg_parser.parse_args()
+
+    decoder = PportDecoder()
+
+    for message_type, (path, parser) in FIXTURES.items():
+
+        with open(path, "rb") as f:
+            payload = f.read()
+
+        dict_secs = timeit.timeit(lambda: parser.parse(json.loads(payload)), number=args.number)
+        typed_secs = timeit.timeit(lambda: decoder.decode(payload), number=args.number)
+
+        print(
+            f"{message_type}: json + parser {dict_secs / args.number * 1e6:.1f}us/msg, "
+            f"typed {typed_secs / args.number * 1e6:.1f}us/msg, "
+            f"speedup {dict_secs / typed_secs:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Reports the memory held by a full day of parsed schedules, built by re-keying the Kafka
+schedule fixture with a fresh rid per service and decoding each payload separately so no
+strings are shared between services by accident.
+
+Run from the models directory:
+
+    poetry run python -m benchmarks.memory --services 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import tracemalloc
+
+from models.common import FormattedMessage
+from models.kafka import ScheduleParser
+
+FIXTURE = "tests/fixtures/kafka/sc.json"
+
+
+def main() -> None:
+
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--services", type=int, default=20000)
+    args = arg_parser.parse_args()
+
+    with open(FIXTURE, "r") as f:
+        template = f.read()
+
+    rid = json.loads(template)["uR"]["schedule"]["rid"]
+    payloads = [template.replace(rid, f"{rid[:-6]}{index:06d}") for index in range(args.services)]
+    parser = ScheduleParser()
+
+    gc.collect()
+    tracemalloc.start()
+
+    messages: list[FormattedMessage] = []
+    for payload in payloads:
+        messages.extend(parser.parse(json.loads(payload)))
+
+    gc.collect()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    locations = sum(len(message.locations or []) for message in messages)
+
+    print(f"{len(messages)} services, {locations} locations, {held / 1024 / 1024:.1f}MiB held")
+    print(f"{held / len(messages):.0f} bytes/service, {held / locations:.0f} bytes/location")
+
+
+if __name__ == "__main__":
+    main()
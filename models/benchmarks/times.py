@@ -0,0 +1,55 @@
+"""
+Compares datetime.strptime against the table-driven parse_time and ServiceDayResolver on a
+day's worth of Darwin style HH:MM and HH:MM:SS times.
+
+Run from the models directory:
+
+    poetry run python -m benchmarks.times --number 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+from datetime import date, datetime
+
+from models.times import ServiceDayResolver, parse_time
+
+TIMES = [f"{hour:02d}:{minute:02d}{suffix}" for hour in range(24) for minute in range(60) for suffix in ("", ":30")]
+
+
+def _strptime(value: str) -> datetime:
+
+    try:
+        return datetime.strptime(value, "%H:%M:%S")
+    except ValueError:
+        return datetime.strptime(value, "%H:%M")
+
+
+def _resolve() -> None:
+
+    resolver = ServiceDayResolver(date(2024, 6, 25))
+
+    for value in TIMES:
+        resolver.resolve(value)
+
+
+def main() -> None:
+
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--number", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    total = len(TIMES) * args.number
+
+    strptime_secs = timeit.timeit(lambda: [_strptime(value) for value in TIMES], number=args.number)
+    table_secs = timeit.timeit(lambda: [parse_time(value) for value in TIMES], number=args.number)
+    resolver_secs = timeit.timeit(_resolve, number=args.number)
+
+    print(f"strptime {strptime_secs / total * 1e9:.0f}ns/time")
+    print(f"parse_time {table_secs / total * 1e9:.0f}ns/time, speedup {strptime_secs / table_secs:.2f}x")
+    print(f"resolve {resolver_secs / total * 1e9:.0f}ns/time, speedup {strptime_secs / resolver_secs:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Iterable
+
+from models.common import LocationType
+from models.times import EPOCH, HALF_DAY, SECONDS_PER_DAY
+
+if TYPE_CHECKING:
+    from models.state import ServiceState
+
+
+@dataclass(frozen=True, slots=True)
+class BoardEntry:
+
+    time: datetime
+    rid: str
+    type: LocationType
+
+
+def _service_day(state: ServiceState) -> int:
+    """Days since EPOCH of the service's start date, from its schedule's ssd or else the day it was sent."""
+
+    ssd = state.service.ssd or state.service.ts.date()
+    return (ssd - EPOCH.date()).days
+
+
+class DepartureBoard:
+    """
+    Index of calls by TIPLOC at their expected time, i.e. the actual or estimated time falling
+    back to the schedule, kept in sorted lists of (seconds since EPOCH, rid) per location and
+    type, so the next calls at a station after a time are a bisect and a slice.
+
+    ServiceStateStore re-indexes a service whenever its schedule changes or a forecast arrives.
+    Scheduled times already resolved to dates by the parsers' resolve_dates are used as they are,
+    and times of day are placed on the service's start date, rolling over to the next day after
+    midnight. A forecast then moves a call by its distance from the schedule. Cancelled calls are
+    left off.
+
+    A list insert or delete is O(n) in the calls on one timeline. That is one station's arrivals
+    or departures over the store's retention, a few thousand at the busiest stations, so each one
+    is a short memmove. A re-index only moves the calls whose time changed.
+    """
+
+    def __init__(self) -> None:
+        self._timelines: dict[tuple[str, LocationType], list[tuple[int, str]]] = {}
+        self._indexed: dict[str, list[tuple[tuple[str, LocationType], tuple[int, str]]]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._indexed)
+
+    def _remove(self, entries: Iterable[tuple[tuple[str, LocationType], tuple[int, str]]]) -> None:
+
+        for key, entry in entries:
+            timeline = self._timelines[key]
+            index = bisect_left(timeline, entry)
+
+            if index < len(timeline) and timeline[index] == entry:
+                del timeline[index]
+
+            if not timeline:
+                del self._timelines[key]
+
+    def index(self, state: ServiceState) -> None:
+        """Replaces the service's calls on the board with those of its current schedule."""
+
+        rid = state.service.rid
+        base = _service_day(state) * SECONDS_PER_DAY
+        entries = []
+        previous = None
+        day = 0
+
+        # Calling points are in calling order, so a time earlier than the one before is past midnight
+        for point in state.calling_points:
+            scheduled = seconds = point.scheduled_seconds
+
+            if scheduled is None or point.cancelled:
+                continue
+
+            # A time of day is under a day since EPOCH, and a resolved time is long past it
+            if scheduled < SECONDS_PER_DAY:
+                if previous is not None and scheduled < previous:
+                    day += SECONDS_PER_DAY
+
+                previous = scheduled
+                seconds = base + day + scheduled
+
+            # Forecasts are the same kind of time as the schedule, and within half a day of it
+            delay = (point.expected_seconds - scheduled + HALF_DAY) % SECONDS_PER_DAY - HALF_DAY  # type: ignore
+            entries.append(((point.tpl, point.type), (seconds + delay, rid)))
+
+        entries = list(dict.fromkeys(entries))
+
+        with self._lock:
+            old = self._indexed.get(rid, [])
+            kept = set(entries).intersection(old)
+
+            self._remove(entry for entry in old if entry not in kept)
+
+            for key, entry in entries:
+                if (key, entry) not in kept:
+                    insort(self._timelines.setdefault(key, []), entry)
+
+            self._indexed[rid] = entries
+
+    def remove(self, rid: str) -> None:
+
+        with self._lock:
+            self._remove(self._indexed.pop(rid, ()))
+
+    def calls(self, tpl: str, type: LocationType, after: datetime, limit: int = 10) -> list[BoardEntry]:
+        """The next limit calls of the given type at tpl expected from after, in naive local time like schedules."""
+
+        start = int((after.replace(tzinfo=None) - EPOCH).total_seconds())
+
+        with self._lock:
+            timeline = self._timelines.get((tpl, type), [])
+            index = bisect_left(timeline, (start, ""))
+            found = timeline[index : index + limit]
+
+        return [BoardEntry(EPOCH + timedelta(seconds=seconds), rid, type) for seconds, rid in found]
+
+    def departures(self, tpl: str, after: datetime, limit: int = 10) -> list[BoardEntry]:
+        return self.calls(tpl, LocationType.DEP, after, limit)
+
+    def arrivals(self, tpl: str, after: datetime, limit: int = 10) -> list[BoardEntry]:
+        return self.calls(tpl, LocationType.ARR, after, limit)
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Iterable, Sequence
+
+from models.common import (
+    FormattedMessage,
+    LocationType,
+    LocationUpdate,
+    ServiceUpdate,
+    TimeType,
+)
+
+DEFAULT_COALESCE_WINDOW_SECS = 2.0
+
+LocationKey = tuple[str, LocationType, TimeType]
+
+
+@dataclass
+class CoalesceStats:
+
+    received: int = 0
+    emitted: int = 0
+
+    @property
+    def merged(self) -> int:
+        return self.received - self.emitted
+
+    def summary(self) -> str:
+        return f"Coalesced {self.received} updates into {self.emitted}"
+
+
+class Emitted(list[FormattedMessage]):
+    """The messages a Coalescer emits, with the acks of the raw messages now written in full once they are."""
+
+    def __init__(self, messages: Iterable[FormattedMessage] = (), acks: Iterable[Callable[[], None]] = ()) -> None:
+        super().__init__(messages)
+        self.acks = list(acks)
+
+    def acknowledge(self) -> None:
+
+        for ack in self.acks:
+            ack()
+
+
+class _Hold:
+    """The acks passed to one add(), waiting on every pending message their updates went into."""
+
+    __slots__ = ("acks", "waiting")
+
+    def __init__(self, acks: Sequence[Callable[[], None]]) -> None:
+        self.acks = acks
+
+        # Held by add() itself until it returns, so a window closing part way through can't release it
+        self.waiting = 1
+
+    def release(self, emitted: Emitted) -> None:
+
+        self.waiting -= 1
+
+        if not self.waiting:
+            emitted.acks.extend(self.acks)
+
+
+class _Pending:
+
+    __slots__ = ("opened", "service", "locations", "holds")
+
+    def __init__(self, opened: float, message: FormattedMessage) -> None:
+        self.opened = opened
+        self.service: ServiceUpdate = message.service
+        self.locations: dict[LocationKey, LocationUpdate] = {}
+        self.holds: list[_Hold] = []
+        self.merge(message)
+
+    def hold(self, hold: _Hold) -> None:
+        hold.waiting += 1
+        self.holds.append(hold)
+
+    def emit(self, emitted: Emitted) -> None:
+
+        emitted.append(self.message())
+
+        for hold in self.holds:
+            hold.release(emitted)
+
+    def merge(self, message: FormattedMessage) -> None:
+
+        # Only forecasts are merged, so the header is always a TS one
+        self.service = message.service
+
+        # A later estimate for the same location and time replaces the earlier one in place
+        for location in message.locations or ():
+            self.locations[(location.tpl, location.type, location.time_type)] = location
+
+    def message(self) -> FormattedMessage:
+        return FormattedMessage(self.service, list(self.locations.values()))
+
+
+class Coalescer:
+    """
+    Merges the forecasts for a rid that arrive within window_secs of the first into one message,
+    keeping the latest LocationUpdate per (tpl, type, time_type) and the latest forecast header.
+
+    add() returns the merged messages whose window has closed, oldest first, and poll() does the
+    same without adding anything, so callers should call one or the other regularly. flush()
+    returns everything still pending, e.g. on shutdown. Schedules, which carry scheduled times,
+    replace a service rather than update it, so they are never merged: any pending message for
+    their rid is emitted first, then the schedule. Loading messages carry only a rid in their
+    header and are passed straight through.
+
+    Merged messages are written up to window_secs late. So that the raw messages behind them are
+    not acknowledged, and their offsets committed, while they are only held here, add() takes
+    their acks and the Emitted returned carries those of every add() whose updates have all
+    been emitted, to call once the messages are written.
+    """
+
+    def __init__(
+        self, window_secs: float = DEFAULT_COALESCE_WINDOW_SECS, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self._window_secs = window_secs
+        self._clock = clock
+        self._pending: OrderedDict[str, _Pending] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.stats = CoalesceStats()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def _emit_due(self, now: float, emitted: Emitted) -> None:
+
+        # Windows close in the order they opened
+        while self._pending:
+            rid, pending = next(iter(self._pending.items()))
+
+            if now - pending.opened < self._window_secs:
+                break
+
+            del self._pending[rid]
+            pending.emit(emitted)
+
+    def add(self, messages: list[FormattedMessage], acks: Sequence[Callable[[], None]] = ()) -> Emitted:
+
+        now = self._clock()
+        emitted = Emitted()
+        hold = _Hold(acks)
+
+        with self._lock:
+            self.stats.received += len(messages)
+            self._emit_due(now, emitted)
+
+            for message in messages:
+                rid = message.service.rid
+                pending = self._pending.get(rid)
+
+                if any(location.time_type is TimeType.SCHEDULED for location in message.locations or ()):
+                    if pending is not None:
+                        self._pending.pop(rid).emit(emitted)
+
+                    emitted.append(message)
+                elif message.loading or not message.locations:
+                    emitted.append(message)
+                else:
+                    if pending is None:
+                        pending = self._pending[rid] = _Pending(now, message)
+                    else:
+                        pending.merge(message)
+
+                    pending.hold(hold)
+
+            hold.release(emitted)
+            self.stats.emitted += len(emitted)
+
+        return emitted
+
+    def poll(self) -> Emitted:
+        return self.add([])
+
+    def flush(self) -> Emitted:
+
+        emitted = Emitted()
+
+        with self._lock:
+            for pending in self._pending.values():
+                pending.emit(emitted)
+
+            self._pending.clear()
+            self.stats.emitted += len(emitted)
+
+        return emitted
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+import sys
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from datetime import datetime
+from array import array
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
 from enum import Enum
-from typing import Optional
+from typing import Callable, Iterable, Iterator, Optional, Sequence
+
+from models.times import EPOCH, SECONDS_PER_DAY, ServiceDayResolver
+
+ONE_SECOND = timedelta(seconds=1)
 
 
 class NoValidMessageTypeFound(Exception): ...
@@ -24,6 +30,23 @@ class MessageParserInterface(ABC):
     @abstractmethod
     def parse(self, data: dict) -> list[FormattedMessage]: ...
 
+    @abstractmethod
+    def parse_elements(self, elements: list[dict], ts: datetime) -> list[FormattedMessage]:
+        """Parses this parser's uR child elements directly, for callers that have already walked the Pport."""
+
+    def parse_batch(self, payloads: Iterable[dict]) -> MessageBatch:
+        """
+        Parses many payloads at once into column arrays. This default goes through parse(), so
+        parsers override it to fill the columns directly without building a message per row.
+        """
+
+        batch = MessageBatch()
+
+        for data in payloads:
+            batch.extend(self.parse(data))
+
+        return batch
+
 
 class MessageType(str, Enum):
 
@@ -70,36 +93,86 @@ class TimeType(Enum):
     SCHEDULED = "SCHED"
 
 
-@dataclass
 class LocationUpdate:
-
-    tpl: str
-    type: LocationType
-    time_type: TimeType
-    time: datetime
-    length: int | None
-    cancelled: bool
-    avg_loading: int | None
+    """
+    A single time at a location. A day's services hold millions of these, so they are slotted,
+    share interned TIPLOC strings and keep the time as integer seconds since 1900-01-01,
+    rebuilding the (naive) datetime on access.
+    """
+
+    __slots__ = ("tpl", "type", "time_type", "seconds", "length", "cancelled", "avg_loading")
+
+    def __init__(
+        self,
+        tpl: str,
+        type: LocationType,
+        time_type: TimeType,
+        time: datetime,
+        length: int | None,
+        cancelled: bool,
+        avg_loading: int | None,
+    ) -> None:
+        self.tpl = sys.intern(tpl)
+        self.type = type
+        self.time_type = time_type
+        self.seconds = (time - EPOCH) // ONE_SECOND
+        self.length = length
+        self.cancelled = cancelled
+        self.avg_loading = avg_loading
+
+    @property
+    def time(self) -> datetime:
+        return EPOCH + timedelta(seconds=self.seconds)
+
+    @time.setter
+    def time(self, value: datetime) -> None:
+        self.seconds = (value - EPOCH) // ONE_SECOND
+
+    def _key(self) -> tuple:
+        return (self.tpl, self.type, self.time_type, self.seconds, self.length, self.cancelled, self.avg_loading)
+
+    def __eq__(self, other: object) -> bool:
+
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+
+        return self._key() == other._key()  # type: ignore
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self) -> str:
+        return (
+            f"LocationUpdate(tpl={self.tpl!r}, type={self.type!r}, time_type={self.time_type!r}, "
+            f"time={self.time!r}, length={self.length!r}, cancelled={self.cancelled!r}, "
+            f"avg_loading={self.avg_loading!r})"
+        )
 
     def to_dict(self) -> dict:
+
+        # A time of day is under a day since EPOCH, a time resolved against the service day is past it
+        time = self.time.isoformat() if self.seconds >= SECONDS_PER_DAY else self.time.strftime("%H:%M:%S")
+
         return {
             "tpl": self.tpl,
             "type": self.type.value,
             "time_type": self.time_type.value,
-            "time": self.time.strftime("%H:%M:%S"),
+            "time": time,
             "length": self.length,
             "cancelled": self.cancelled,
             "avgLoading": self.avg_loading,
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class LoadingUpdate:
 
     tpl: str
     coach_number: int
     loading: int
 
+    def __post_init__(self) -> None:
+        self.tpl = sys.intern(self.tpl)
+
     def to_dict(self) -> dict:
         return {
             "tpl": self.tpl,
@@ -108,7 +181,7 @@ class LoadingUpdate:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ServiceUpdate:
 
     rid: str
@@ -119,6 +192,12 @@ class ServiceUpdate:
     train_id: str
     cancel_reason: str | None
 
+    # Scheduled start date, which schedules carry and forecasts and loading leave out
+    ssd: Optional[date] = None
+
+    def __post_init__(self) -> None:
+        self.toc = sys.intern(self.toc)
+
     def to_dict(self) -> dict:
         return {
             "rid": self.rid,
@@ -131,7 +210,7 @@ class ServiceUpdate:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class FormattedMessage:
 
     service: ServiceUpdate
@@ -151,3 +230,342 @@ class FormattedMessage:
         data.append(self.service.to_dict())
 
         return data
+
+
+ServicePredicate = Callable[[ServiceUpdate], bool]
+
+
+class LazyFormattedMessage(FormattedMessage):
+    """
+    FormattedMessage whose service header is decoded up front, while locations and loading are
+    only decoded the first time they are accessed. Errors in the deferred part, such as
+    InvalidLocation, are therefore raised on that first access rather than by the parser.
+    """
+
+    __slots__ = ("_decode_locations", "_decode_loading", "_locations", "_loading")
+
+    def __init__(
+        self,
+        service: ServiceUpdate,
+        decode_locations: Optional[Callable[[], list[LocationUpdate]]] = None,
+        decode_loading: Optional[Callable[[], list[LoadingUpdate]]] = None,
+    ) -> None:
+        self.service = service
+        self._decode_locations = decode_locations
+        self._decode_loading = decode_loading
+        self._locations: list[LocationUpdate] | None = None
+        self._loading: list[LoadingUpdate] | None = None
+
+    @property  # type: ignore[override]
+    def locations(self) -> list[LocationUpdate] | None:
+
+        if self._decode_locations is not None:
+            self._locations = self._decode_locations()
+            self._decode_locations = None
+
+        return self._locations
+
+    @locations.setter
+    def locations(self, value: list[LocationUpdate] | None) -> None:
+        self._decode_locations = None
+        self._locations = value
+
+    @property  # type: ignore[override]
+    def loading(self) -> list[LoadingUpdate] | None:
+
+        if self._decode_loading is not None:
+            self._loading = self._decode_loading()
+            self._decode_loading = None
+
+        return self._loading
+
+    @loading.setter
+    def loading(self, value: list[LoadingUpdate] | None) -> None:
+        self._decode_loading = None
+        self._loading = value
+
+    def __eq__(self, other: object) -> bool:
+
+        if not isinstance(other, FormattedMessage):
+            return NotImplemented
+
+        return (self.service, self.locations, self.loading) == (other.service, other.locations, other.loading)
+
+
+class ServiceMessageParser(MessageParserInterface):
+    """
+    Plumbing shared by the schedule and TS parsers of both Push Port schemas. Subclasses set the
+    schema's ssd key and parse a service header, its locations, and the time a resolver starts from.
+    """
+
+    ssd_key = "ssd"
+
+    def __init__(
+        self, resolve_dates: bool = False, lazy: bool = False, predicates: Sequence[ServicePredicate] = ()
+    ) -> None:
+        # Resolve location times against the service's ssd instead of 1900-01-01 times of day
+        self._resolve_dates = resolve_dates
+        # Defer decoding locations until they are accessed, and drop services failing any predicate
+        self._lazy = lazy
+        self._predicates = predicates
+
+    @abstractmethod
+    def _parse_service(self, body: dict, ts: datetime) -> ServiceUpdate: ...
+
+    @abstractmethod
+    def _parse_service_locations(self, body: dict, ts: datetime) -> list[LocationUpdate]: ...
+
+    @abstractmethod
+    def _seed(self, resolver: ServiceDayResolver, body: dict, ts: datetime) -> None: ...
+
+    def _keep(self, service: ServiceUpdate) -> bool:
+        return all(predicate(service) for predicate in self._predicates)
+
+    def _create_resolver(self, body: dict, ts: datetime) -> Optional[ServiceDayResolver]:
+
+        if not self._resolve_dates or self.ssd_key not in body:
+            return None
+
+        resolver = ServiceDayResolver(date.fromisoformat(body[self.ssd_key]))
+        self._seed(resolver, body, ts)
+
+        return resolver
+
+    def parse_elements(self, elements: list[dict], ts: datetime) -> list[FormattedMessage]:
+
+        messages = []
+
+        for message in elements:
+            service = self._parse_service(message, ts)
+
+            if self._keep(service):
+                messages.append(self._create_message(message, service, ts))
+
+        return messages
+
+    def _create_message(self, body: dict, service: ServiceUpdate, ts: datetime) -> FormattedMessage:
+
+        if self._lazy:
+            return LazyFormattedMessage(service, decode_locations=lambda: self._parse_service_locations(body, ts))
+
+        return FormattedMessage(service=service, locations=self._parse_service_locations(body, ts))
+
+
+class ScheduleMessageParser(ServiceMessageParser):
+    """
+    Schedule parsing shared by both schemas. Subclasses set the origin, calling, passing and
+    destination keys and the working time keys, and parse a single location element.
+    """
+
+    route_keys = ("OR", "IP", "PP", "DT")
+    time_keys = ("wtd", "wta", "wtp")
+
+    @abstractmethod
+    def _parse_location(self, body: dict, resolver: Optional[ServiceDayResolver]) -> list[LocationUpdate]: ...
+
+    def _get_list(self, key: str, body: dict) -> list[dict]:
+
+        obj = body.get(key, [])
+
+        if type(obj) is dict:
+            return [obj]
+        return obj
+
+    def _seed(self, resolver: ServiceDayResolver, body: dict, ts: datetime) -> None:
+
+        # Anchor on the origin, or the first calling point if the origin is missing
+        for key in self.route_keys[:2]:
+            for raw_loc in self._get_list(key, body)[:1]:
+                for time_key in self.time_keys:
+                    if time_key in raw_loc:
+                        resolver.seed(raw_loc[time_key])
+                        return
+
+    def _route(self, body: dict, ts: datetime) -> Iterator[tuple[list[dict], Optional[ServiceDayResolver]]]:
+        """Yields the origin, calling, passing and destination elements, each with the resolver to parse them with."""
+
+        origin, calling, passing, destination = self.route_keys
+        resolver = self._create_resolver(body, ts)
+
+        # Calling and passing points each run on from the origin, and the destination from the
+        # last calling point, so every time is resolved against a neighbouring one. The forks are
+        # taken lazily, once the elements yielded before them have been parsed
+        yield self._get_list(origin, body), resolver
+
+        calling_resolver = resolver.fork() if resolver else None
+        yield self._get_list(calling, body), calling_resolver
+        yield self._get_list(passing, body), resolver.fork() if resolver else None
+        yield self._get_list(destination, body), calling_resolver.fork() if calling_resolver else None
+
+    def _parse_service_locations(self, body: dict, ts: datetime) -> list[LocationUpdate]:
+
+        origin, calling, passing, destination = (
+            [update for raw_loc in elements for update in self._parse_location(raw_loc, resolver)]
+            for elements, resolver in self._route(body, ts)
+        )
+
+        return destination + origin + calling + passing
+
+
+class TSMessageParser(ServiceMessageParser):
+    """TS parsing shared by both schemas. Subclasses parse the Location elements of a TS."""
+
+    @abstractmethod
+    def _parse_locations(self, body: dict, resolver: Optional[ServiceDayResolver]) -> list[LocationUpdate]: ...
+
+    def _seed(self, resolver: ServiceDayResolver, body: dict, ts: datetime) -> None:
+        # Forecasts are close to the time they were sent, which anchors services past midnight
+        resolver.seed(ts)
+
+    def _parse_service_locations(self, body: dict, ts: datetime) -> list[LocationUpdate]:
+        return self._parse_locations(body, self._create_resolver(body, ts))
+
+
+@dataclass(slots=True)
+class ServiceColumns:
+
+    rid: list[str] = field(default_factory=list)
+    uid: list[str] = field(default_factory=list)
+    ts: list[datetime] = field(default_factory=list)
+    passenger: list[Optional[bool]] = field(default_factory=list)
+    toc: list[str] = field(default_factory=list)
+    train_id: list[str] = field(default_factory=list)
+    cancel_reason: list[Optional[str]] = field(default_factory=list)
+
+    def add(
+        self,
+        rid: str,
+        uid: str,
+        ts: datetime,
+        passenger: Optional[bool],
+        toc: str,
+        train_id: str,
+        cancel_reason: Optional[str],
+    ) -> None:
+
+        self.rid.append(rid)
+        self.uid.append(uid)
+        self.ts.append(ts)
+        self.passenger.append(passenger)
+        self.toc.append(sys.intern(toc))
+        self.train_id.append(train_id)
+        self.cancel_reason.append(cancel_reason)
+
+    def append(self, service: ServiceUpdate) -> None:
+        self.add(
+            service.rid,
+            service.uid,
+            service.ts,
+            service.passenger,
+            service.toc,
+            service.train_id,
+            service.cancel_reason,
+        )
+
+    def __len__(self) -> int:
+        return len(self.rid)
+
+
+@dataclass(slots=True)
+class LocationColumns:
+
+    rid: list[str] = field(default_factory=list)
+    tpl: list[str] = field(default_factory=list)
+    type: list[str] = field(default_factory=list)
+    time_type: list[str] = field(default_factory=list)
+    # Seconds since 1900-01-01, see LocationUpdate.seconds
+    time: array = field(default_factory=lambda: array("q"))
+    length: list[Optional[int]] = field(default_factory=list)
+    cancelled: list[bool] = field(default_factory=list)
+    avg_loading: list[Optional[int]] = field(default_factory=list)
+
+    def add(
+        self,
+        rid: str,
+        tpl: str,
+        type: LocationType,
+        time_type: TimeType,
+        seconds: int,
+        length: Optional[int],
+        cancelled: bool,
+        avg_loading: Optional[int],
+    ) -> None:
+
+        self.rid.append(rid)
+        self.tpl.append(sys.intern(tpl))
+        self.type.append(type.value)
+        self.time_type.append(time_type.value)
+        self.time.append(seconds)
+        self.length.append(length)
+        self.cancelled.append(cancelled)
+        self.avg_loading.append(avg_loading)
+
+    def append(self, rid: str, location: LocationUpdate) -> None:
+        self.add(
+            rid,
+            location.tpl,
+            location.type,
+            location.time_type,
+            location.seconds,
+            location.length,
+            location.cancelled,
+            location.avg_loading,
+        )
+
+    def __len__(self) -> int:
+        return len(self.rid)
+
+
+@dataclass(slots=True)
+class LoadingColumns:
+
+    rid: list[str] = field(default_factory=list)
+    tpl: list[str] = field(default_factory=list)
+    coach_number: array = field(default_factory=lambda: array("q"))
+    loading: array = field(default_factory=lambda: array("q"))
+
+    def append(self, rid: str, loading: LoadingUpdate) -> None:
+
+        self.rid.append(rid)
+        self.tpl.append(loading.tpl)
+        self.coach_number.append(loading.coach_number)
+        self.loading.append(loading.loading)
+
+    def __len__(self) -> int:
+        return len(self.rid)
+
+
+@dataclass(slots=True)
+class MessageBatch:
+    """
+    Column-oriented view of many FormattedMessages, one parallel array per field. Location and
+    loading rows carry the rid of their service so they can be joined back onto services.
+    """
+
+    services: ServiceColumns = field(default_factory=ServiceColumns)
+    locations: LocationColumns = field(default_factory=LocationColumns)
+    loading: LoadingColumns = field(default_factory=LoadingColumns)
+
+    def append(self, message: FormattedMessage) -> None:
+
+        rid = message.service.rid
+        self.services.append(message.service)
+
+        for location in message.locations or []:
+            self.locations.append(rid, location)
+
+        for load in message.loading or []:
+            self.loading.append(rid, load)
+
+    def extend(self, messages: Iterable[FormattedMessage]) -> None:
+
+        for message in messages:
+            self.append(message)
+
+    @classmethod
+    def create(cls, messages: Iterable[FormattedMessage]) -> MessageBatch:
+
+        batch = cls()
+        batch.extend(messages)
+
+        return batch
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Iterable
+
+from models.common import FormattedMessage
+
+DEFAULT_WINDOW_SECS = 3600.0
+DEFAULT_MAX_ENTRIES = 100_000
+DEFAULT_FILTER_CAPACITY = 1_000_000
+DEFAULT_FALSE_POSITIVE_RATE = 1e-6
+
+DedupKey = tuple[str, datetime, bytes]
+
+
+def dedup_key(message: FormattedMessage) -> DedupKey:
+    """The rid, Push Port ts and a hash of everything parsed from the update."""
+
+    service = message.service
+
+    content = (
+        service.rid,
+        service.ts.isoformat(),
+        service.uid,
+        service.passenger,
+        service.toc,
+        service.train_id,
+        service.cancel_reason,
+        [location._key() for location in message.locations or ()],
+        [(load.tpl, load.coach_number, load.loading) for load in message.loading or ()],
+    )
+
+    return service.rid, service.ts, hashlib.blake2b(repr(content).encode(), digest_size=16).digest()
+
+
+class BloomFilter:
+    """Fixed-size approximate set of 16 byte digests, with no false negatives."""
+
+    def __init__(self, capacity: int, false_positive_rate: float) -> None:
+        self.bits = max(8, int(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self.count = 0
+        self._array = bytearray((self.bits + 7) // 8)
+
+    def _positions(self, digest: bytes) -> Iterable[int]:
+
+        # Double hashing, deriving every position from two halves of the digest
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+
+        return ((h1 + i * h2) % self.bits for i in range(self.hashes))
+
+    def add(self, digest: bytes) -> None:
+
+        for position in self._positions(digest):
+            self._array[position >> 3] |= 1 << (position & 7)
+
+        self.count += 1
+
+    def __contains__(self, digest: bytes) -> bool:
+        return all(self._array[position >> 3] >> (position & 7) & 1 for position in self._positions(digest))
+
+
+@dataclass
+class DedupStats:
+
+    seen: int = 0
+    dropped: int = 0
+    dropped_approximate: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"Deduplicated {self.seen} messages, dropped {self.dropped} "
+            f"({self.dropped_approximate} beyond the exact window)"
+        )
+
+
+class Deduplicator:
+    """
+    Drops FormattedMessages already written, such as those redelivered after a reconnect, keyed on
+    their rid, Push Port ts and a hash of their content so a genuine correction is never dropped.
+
+    The last max_entries keys seen within window_secs are held exactly, in insertion order, and
+    every key also goes into one of two Bloom filters rotated every half window, so it is kept
+    for between half and all of window_secs. A key
+    missing from the filters is new, which is the usual case. A key found in the exact set is a
+    duplicate. A key found only in the filters is older than the exact set holds, and is dropped as
+    a duplicate, which wrongly drops a new message with probability false_positive_rate.
+
+    Checks are constant time and nothing is looked up in the database.
+    """
+
+    def __init__(
+        self,
+        window_secs: float = DEFAULT_WINDOW_SECS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        filter_capacity: int = DEFAULT_FILTER_CAPACITY,
+        false_positive_rate: float = DEFAULT_FALSE_POSITIVE_RATE,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._window_secs = window_secs
+        self._max_entries = max_entries
+        self._filter_capacity = filter_capacity
+        self._false_positive_rate = false_positive_rate
+        self._clock = clock
+
+        self._recent: OrderedDict[DedupKey, float] = OrderedDict()
+
+        # Each generation covers half the window, so the older one can be dropped whole
+        self._current = BloomFilter(filter_capacity, false_positive_rate)
+        self._previous = BloomFilter(filter_capacity, false_positive_rate)
+        self._rotated_at = clock()
+
+        self._lock = threading.Lock()
+
+        self.stats = DedupStats()
+
+    def _expire(self, now: float) -> None:
+
+        while self._recent:
+            key, added = next(iter(self._recent.items()))
+
+            if len(self._recent) <= self._max_entries and now - added < self._window_secs:
+                break
+
+            self._recent.popitem(last=False)
+
+        if now - self._rotated_at >= self._window_secs / 2 or self._current.count >= self._filter_capacity:
+            self._previous = self._current
+            self._current = BloomFilter(self._filter_capacity, self._false_positive_rate)
+            self._rotated_at = now
+
+    def is_duplicate(self, message: FormattedMessage) -> bool:
+        """Returns whether message was seen within the window, remembering it if not."""
+
+        key = dedup_key(message)
+        digest = key[2]
+        now = self._clock()
+
+        with self._lock:
+            self.stats.seen += 1
+            self._expire(now)
+
+            if key in self._recent:
+                self.stats.dropped += 1
+                return True
+
+            if digest in self._current or digest in self._previous:
+                self.stats.dropped += 1
+                self.stats.dropped_approximate += 1
+                return True
+
+            self._recent[key] = now
+            self._current.add(digest)
+
+            return False
+
+    def __call__(self, messages: list[FormattedMessage]) -> list[FormattedMessage]:
+        """The messages not seen before, in order."""
+        return [message for message in messages if not self.is_duplicate(message)]
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from models.common import (
+    FormattedMessage,
+    InvalidServiceUpdate,
+    MessageParserInterface,
+    MessageType,
+)
+
+# uR child element names for each message type
+UR_ELEMENT_KEYS = {
+    "TS": MessageType.TS,
+    "schedule": MessageType.SC,
+    "scheduleFormations": MessageType.SF,
+    "association": MessageType.AS,
+    "trainOrder": MessageType.TO,
+    "formationLoading": MessageType.LO,
+    "OW": MessageType.OW,
+    "trainAlert": MessageType.NO,
+}
+
+
+class UpdateDispatcher:
+    """
+    Walks a Push Port uR once and routes every child element to the parser registered for its
+    message type, so a uR carrying e.g. both schedule and association elements is not reduced
+    to whichever one its RawMessage was typed as. Elements without a parser are skipped.
+
+    Set xml=True for xmltodict output (Pport/@ts) rather than the Kafka JSON schema (ts).
+    """
+
+    def __init__(self, parsers: dict[MessageType, MessageParserInterface], xml: bool = False) -> None:
+        self._parsers = parsers
+        self._xml = xml
+
+    def _unwrap(self, raw_body: dict) -> tuple[datetime, dict]:
+
+        data = raw_body.get("Pport", raw_body) if self._xml else raw_body
+        ts_key = "@ts" if self._xml else "ts"
+
+        try:
+            ts = datetime.fromisoformat(data[ts_key])
+        except KeyError as exception:
+            raise InvalidServiceUpdate(f"Cannot extract ts from {data}") from exception
+
+        try:
+            ur = data["uR"]
+        except KeyError as exception:
+            raise InvalidServiceUpdate(f"Cannot extract uR from {data}") from exception
+
+        return ts, ur
+
+    def dispatch(self, raw_body: dict) -> list[FormattedMessage]:
+
+        ts, ur = self._unwrap(raw_body)
+
+        messages: list[FormattedMessage] = []
+
+        for key, elements in ur.items():
+
+            # xmltodict keeps any namespace prefix on element names
+            message_type = UR_ELEMENT_KEYS.get(key.rpartition(":")[2])
+            parser = self._parsers.get(message_type) if message_type else None
+
+            if parser is None:
+                continue
+
+            if type(elements) is dict:
+                elements = [elements]
+
+            messages.extend(parser.parse_elements(elements, ts))
+
+        return messages
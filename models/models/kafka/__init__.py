@@ -0,0 +1,11 @@
+from .lo import LOParser
+from .schedule import ScheduleParser
+from .schema import PportDecoder
+from .ts import TSParser
+
+__all__ = [
+    "LOParser",
+    "PportDecoder",
+    "ScheduleParser",
+    "TSParser",
+]
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from models.common import (
+    FormattedMessage,
+    LoadingUpdate,
+    MessageParserInterface,
+    ServiceUpdate,
+)
+
+
+class InvalidServiceUpdate(Exception): ...
+
+
+class ServiceParser:
+
+    @classmethod
+    def parse(cls, body: dict, ts: datetime) -> ServiceUpdate:
+
+        try:
+            rid = body["rid"]
+        except KeyError as exception:
+            raise InvalidServiceUpdate(f"Cannot extract rid from {body}") from exception
+
+        # formationLoading carries no uid, TOC or train id
+        return ServiceUpdate(rid, "", ts, passenger=False, toc="", train_id="", cancel_reason=None)
+
+
+class LoadingParser:
+
+    @classmethod
+    def parse(cls, body: dict, tpl: str) -> list[LoadingUpdate]:
+
+        try:
+            loading_data = body["loading"]
+        except KeyError:
+            return []
+
+        if type(loading_data) is dict:
+            loading_data = [loading_data]
+
+        updates: list[LoadingUpdate] = []
+
+        for loading in loading_data:
+            try:
+                # The loading percentage is the element's text content, keyed by ""
+                coach_number = int(loading["coachNumber"])
+                loading_value = int(loading[""])
+                updates.append(LoadingUpdate(tpl=tpl, coach_number=coach_number, loading=loading_value))
+            except (KeyError, ValueError):
+                continue
+
+        return updates
+
+
+class LOParser(MessageParserInterface):
+    """Parses formationLoading elements from the Kafka JSON Push Port schema."""
+
+    def parse(self, raw_body: dict) -> list[FormattedMessage]:
+
+        try:
+            ts = datetime.fromisoformat(raw_body["ts"])
+        except KeyError as exception:
+            raise InvalidServiceUpdate(f"Cannot extract ts from {raw_body}") from exception
+
+        try:
+            formation_loading = raw_body["uR"]["formationLoading"]
+
+            if type(formation_loading) is dict:
+                formation_loading = [formation_loading]
+
+        except KeyError as exception:
+            raise InvalidServiceUpdate(f"Cannot extract uR or formationLoading from {raw_body}") from exception
+
+        return self.parse_elements(formation_loading, ts)
+
+    def parse_elements(self, elements: list[dict], ts: datetime) -> list[FormattedMessage]:
+
+        messages = []
+
+        for message in elements:
+            tpl = str(message.get("tpl", ""))
+            loading_updates = LoadingParser.parse(message, tpl)
+            service = ServiceParser.parse(message, ts)
+            messages.append(FormattedMessage(service=service, loading=loading_updates))
+
+        return messages
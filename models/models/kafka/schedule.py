@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Iterable, Optional
+
+from models.common import (
+    FormattedMessage,
+    LocationColumns,
+    LocationType,
+    LocationUpdate,
+    MessageBatch,
+    ScheduleMessageParser,
+    ServiceUpdate,
+    TimeType,
+)
+from models.times import ServiceDayResolver, parse_seconds, parse_time
+
+
+class InvalidLocation(Exception): ...
+
+
+class InvalidServiceUpdate(Exception): ...
+
+
+LOCATION_TYPE_KEYS = {"wta": LocationType.ARR, "wtd": LocationType.DEP, "wtp": LocationType.PASS}
+
+
+class ServiceParser:
+
+    @classmethod
+    def get_passenger_status(cls, data: dict) -> bool:
+
+        is_pass = data.get("isPassengerSvc", "true")
+
+        return str(is_pass).lower() == "true"
+
+    @classmethod
+    def get_cancel_reason(cls, data: dict) -> str | None:
+
+        cancel_reason = data.get("cancelReason")
+
+        # Reasons carrying attributes arrive as an object with the text content under ""
+        if type(cancel_reason) is dict:
+            return cancel_reason.get("")
+
+        return cancel_reason
+
+    @classmethod
+    def parse(cls, body: dict, ts: datetime) -> ServiceUpdate:
+
+        try:
+            rid = body["rid"]
+        except KeyError as exception:
+            raise InvalidServiceUpdate(f"Cannot extract rid from {body}") from exception
+
+        try:
+            uid = body["uid"]
+        except KeyError as exception:
+            raise InvalidServiceUpdate(f"Cannot extract uid from {body}") from exception
+
+        try:
+            train_id = body["trainId"]
+        except KeyError as exception:
+            raise InvalidServiceUpdate(f"Cannot extract trainId from {body}") from exception
+
+        try:
+            toc = body["toc"]
+        except KeyError as exception:
+            raise InvalidServiceUpdate(f"Cannot extract toc from {body}") from exception
+
+        ssd = date.fromisoformat(body["ssd"]) if "ssd" in body else None
+
+        return ServiceUpdate(
+            rid, uid, ts, cls.get_passenger_status(body), toc, train_id, cls.get_cancel_reason(body), ssd
+        )
+
+
+class LocationsParser:
+
+    @classmethod
+    def parse(cls, body: dict, resolver: Optional[ServiceDayResolver] = None) -> list[LocationUpdate]:
+
+        try:
+            tpl = body["tpl"]
+        except KeyError:
+            raise InvalidLocation(f"No tpl found on {body}")
+
+        cancelled = str(body.get("can", "false")).lower() == "true"
+        avg_loading = int(body["avgLoading"]) if "avgLoading" in body else None
+
+        updates: list[LocationUpdate] = []
+
+        for key, value in body.items():
+
+            try:
+                location_type = LOCATION_TYPE_KEYS[key]
+            except KeyError:
+                continue
+
+            time = resolver.resolve(value) if resolver else parse_time(value)
+
+            updates.append(LocationUpdate(tpl, location_type, TimeType.SCHEDULED, time, None, cancelled, avg_loading))
+
+        if not updates:
+            raise InvalidLocation(f"No LocationUpdates could be parsed from {body}")
+
+        return updates
+
+    @classmethod
+    def fill(
+        cls, columns: LocationColumns, rid: str, body: dict, resolver: Optional[ServiceDayResolver] = None
+    ) -> None:
+        """As parse(), appending the rows to columns."""
+
+        try:
+            tpl = body["tpl"]
+        except KeyError:
+            raise InvalidLocation(f"No tpl found on {body}")
+
+        cancelled = str(body.get("can", "false")).lower() == "true"
+        avg_loading = int(body["avgLoading"]) if "avgLoading" in body else None
+        count = 0
+
+        for key, value in body.items():
+            location_type = LOCATION_TYPE_KEYS.get(key)
+
+            if location_type is None:
+                continue
+
+            seconds = resolver.resolve_seconds(value) if resolver else parse_seconds(value)
+            columns.add(rid, tpl, location_type, TimeType.SCHEDULED, seconds, None, cancelled, avg_loading)
+            count += 1
+
+        if not count:
+            raise InvalidLocation(f"No LocationUpdates could be parsed from {body}")
+
+
+class ScheduleParser(ScheduleMessageParser):
+    """Parses schedule elements from the Kafka JSON Push Port schema."""
+
+    def _unwrap(self, raw_body: dict) -> tuple[list[dict], datetime]:
+
+        try:
+            ts = datetime.fromisoformat(raw_body["ts"])
+        except KeyError as exception:
+            raise InvalidServiceUpdate(f"Cannot extract ts from {raw_body}") from exception
+
+        try:
+            schedules = raw_body["uR"]["schedule"]
+
+            if type(schedules) is dict:
+                schedules = [schedules]
+
+        except KeyError as exception:
+            raise InvalidServiceUpdate(f"Cannot extract uR or schedule from {raw_body}") from exception
+
+        return schedules, ts
+
+    def parse(self, raw_body: dict) -> list[FormattedMessage]:
+        return self.parse_elements(*self._unwrap(raw_body))
+
+    def parse_batch(self, payloads: Iterable[dict]) -> MessageBatch:
+        """
+        Fills the columns straight from the payloads, building a ServiceUpdate only to check
+        predicates. Each service's locations are in route-kind order, origin first, rather than
+        the order parse() lists them in.
+        """
+
+        batch = MessageBatch()
+
+        for raw_body in payloads:
+            elements, ts = self._unwrap(raw_body)
+
+            for body in elements:
+                service = ServiceParser.parse(body, ts)
+
+                if not self._keep(service):
+                    continue
+
+                self._fill_service_locations(batch.locations, service.rid, body, ts)
+                batch.services.append(service)
+
+        return batch
+
+    def _parse_service(self, body: dict, ts: datetime) -> ServiceUpdate:
+        return ServiceParser.parse(body, ts)
+
+    def _parse_location(self, body: dict, resolver: Optional[ServiceDayResolver]) -> list[LocationUpdate]:
+        return LocationsParser.parse(body, resolver)
+
+    def _fill_service_locations(self, columns: LocationColumns, rid: str, body: dict, ts: datetime) -> None:
+
+        # Resolved against the same neighbours as in _parse_service_locations
+        for elements, resolver in self._route(body, ts):
+            for raw_loc in elements:
+                LocationsParser.fill(columns, rid, raw_loc, resolver)
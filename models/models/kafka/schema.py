@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Optional, Union
+
+import msgspec
+
+from models.common import (
+    FormattedMessage,
+    InvalidLocation,
+    LoadingUpdate,
+    LocationType,
+    LocationUpdate,
+    ServiceUpdate,
+    TimeType,
+)
+from models.times import parse_time
+
+
+class InvalidPportMessage(Exception): ...
+
+
+class Forecast(msgspec.Struct):
+
+    et: Optional[str] = None
+    at: Optional[str] = None
+
+
+class TSLocation(msgspec.Struct):
+
+    tpl: str
+    arr: Optional[Forecast] = None
+    dep: Optional[Forecast] = None
+    length: Optional[int] = None
+
+
+class TSElement(msgspec.Struct):
+
+    rid: str
+    uid: str
+    toc: str = ""
+    trainId: str = ""
+    Location: Union[TSLocation, list[TSLocation]] = []
+
+
+class ScheduleLocation(msgspec.Struct):
+
+    tpl: str
+    wta: Optional[str] = None
+    wtd: Optional[str] = None
+    wtp: Optional[str] = None
+    can: Union[bool, str] = "false"
+    avgLoading: Optional[int] = None
+
+
+class CancelReason(msgspec.Struct):
+
+    text: Optional[str] = msgspec.field(name="", default=None)
+
+
+class ScheduleElement(msgspec.Struct):
+
+    rid: str
+    uid: str
+    trainId: str
+    toc: str
+    ssd: Optional[date] = None
+    isPassengerSvc: Union[bool, str] = "true"
+    cancelReason: Union[str, CancelReason, None] = None
+    OR: Union[ScheduleLocation, list[ScheduleLocation]] = []
+    IP: Union[ScheduleLocation, list[ScheduleLocation]] = []
+    PP: Union[ScheduleLocation, list[ScheduleLocation]] = []
+    DT: Union[ScheduleLocation, list[ScheduleLocation]] = []
+
+
+class Loading(msgspec.Struct):
+
+    coachNumber: Optional[str] = None
+    value: Optional[str] = msgspec.field(name="", default=None)
+
+
+class FormationLoadingElement(msgspec.Struct):
+
+    rid: str
+    tpl: str = ""
+    loading: Union[Loading, list[Loading]] = []
+
+
+class UR(msgspec.Struct):
+
+    TS: Union[TSElement, list[TSElement]] = []
+    schedule: Union[ScheduleElement, list[ScheduleElement]] = []
+    formationLoading: Union[FormationLoadingElement, list[FormationLoadingElement]] = []
+
+
+class Pport(msgspec.Struct):
+
+    ts: str
+    uR: Optional[UR] = None
+
+
+def _as_list(value):
+
+    if type(value) is list:
+        return value
+    return [value]
+
+
+class PportDecoder:
+    """
+    Decodes Kafka JSON Push Port payloads into typed structs in one validated msgspec pass
+    and maps them onto FormattedMessages, matching the output of the models.kafka parsers.
+    """
+
+    def __init__(self) -> None:
+        # Non-strict so numeric fields such as length and avgLoading, sent as strings, are coerced
+        self._decoder = msgspec.json.Decoder(Pport, strict=False)
+
+    def decode(self, payload: bytes | str) -> list[FormattedMessage]:
+
+        try:
+            pport = self._decoder.decode(payload)
+            ts = datetime.fromisoformat(pport.ts)
+        except (msgspec.DecodeError, ValueError) as exception:
+            raise InvalidPportMessage(f"Cannot decode Push Port payload: {exception}") from exception
+
+        if pport.uR is None:
+            return []
+
+        messages = [self._map_ts(element, ts) for element in _as_list(pport.uR.TS)]
+        messages.extend(self._map_schedule(element, ts) for element in _as_list(pport.uR.schedule))
+        messages.extend(self._map_loading(element, ts) for element in _as_list(pport.uR.formationLoading))
+
+        return messages
+
+    def _map_ts(self, element: TSElement, ts: datetime) -> FormattedMessage:
+
+        updates: list[LocationUpdate] = []
+
+        for location in _as_list(element.Location):
+            for forecast, location_type in ((location.arr, LocationType.ARR), (location.dep, LocationType.DEP)):
+
+                if forecast is None:
+                    continue
+
+                if forecast.et is not None:
+                    updates.append(
+                        LocationUpdate(
+                            location.tpl, location_type, TimeType.ESTIMATED, parse_time(forecast.et), location.length, False, None
+                        )
+                    )
+
+                if forecast.at is not None:
+                    updates.append(
+                        LocationUpdate(
+                            location.tpl, location_type, TimeType.ACTUAL, parse_time(forecast.at), location.length, False, None
+                        )
+                    )
+
+        if not updates:
+            raise InvalidLocation(f"No LocationUpdates could be parsed from {element}")
+
+        service = ServiceUpdate(
+            element.rid, element.uid, ts, passenger=False, toc=element.toc, train_id=element.trainId, cancel_reason=None
+        )
+        return FormattedMessage(service=service, locations=updates)
+
+    def _map_schedule_location(self, location: ScheduleLocation) -> list[LocationUpdate]:
+
+        cancelled = str(location.can).lower() == "true"
+        updates = [
+            LocationUpdate(location.tpl, location_type, TimeType.SCHEDULED, parse_time(value), None, cancelled, location.avgLoading)
+            for value, location_type in (
+                (location.wta, LocationType.ARR),
+                (location.wtd, LocationType.DEP),
+                (location.wtp, LocationType.PASS),
+            )
+            if value is not None
+        ]
+
+        if not updates:
+            raise InvalidLocation(f"No LocationUpdates could be parsed from {location}")
+
+        return updates
+
+    def _map_schedule(self, element: ScheduleElement, ts: datetime) -> FormattedMessage:
+
+        updates: list[LocationUpdate] = []
+
+        for locations in (element.DT, element.OR, element.IP, element.PP):
+            for location in _as_list(locations):
+                updates.extend(self._map_schedule_location(location))
+
+        cancel_reason = element.cancelReason
+        if isinstance(cancel_reason, CancelReason):
+            cancel_reason = cancel_reason.text
+
+        service = ServiceUpdate(
+            element.rid,
+            element.uid,
+            ts,
+            str(element.isPassengerSvc).lower() == "true",
+            element.toc,
+            element.trainId,
+            cancel_reason,
+            element.ssd,
+        )
+        return FormattedMessage(service=service, locations=updates)
+
+    def _map_loading(self, element: FormationLoadingElement, ts: datetime) -> FormattedMessage:
+
+        updates: list[LoadingUpdate] = []
+
+        for loading in _as_list(element.loading):
+            try:
+                updates.append(LoadingUpdate(element.tpl, int(loading.coachNumber), int(loading.value)))  # type: ignore
+            except (TypeError, ValueError):
+                continue
+
+        service = ServiceUpdate(element.rid, "", ts, passenger=False, toc="", train_id="", cancel_reason=None)
+        return FormattedMessage(service=service, loading=updates)
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Iterable, Optional
+
+from models.common import (
+    FormattedMessage,
+    LocationColumns,
+    LocationType,
+    LocationUpdate,
+    MessageBatch,
+    ServiceUpdate,
+    TimeType,
+    TSMessageParser,
+)
+from models.times import ServiceDayResolver, parse_seconds, parse_time
+
+
+class InvalidLocation(Exception): ...
+
+
+class InvalidServiceUpdate(Exception): ...
+
+
+class InvalidTimeType(Exception): ...
+
+
+FORECAST_TIME_TYPES = {"et": TimeType.ESTIMATED, "at": TimeType.ACTUAL}
+
+
+class ServiceParser:
+
+    @classmethod
+    def parse(cls, body: dict, ts: datetime) -> ServiceUpdate:
+
+        try:
+            rid = body["rid"]
+        except KeyError as exception:
+            raise InvalidServiceUpdate(f"Cannot extract rid from {body}") from exception
+
+        try:
+            uid = body["uid"]
+        except KeyError as exception:
+            raise InvalidServiceUpdate(f"Cannot extract uid from {body}") from exception
+
+        toc = str(body.get("toc", ""))
+        train_id = str(body.get("trainId", ""))
+
+        return ServiceUpdate(rid, uid, ts, passenger=False, toc=toc, train_id=train_id, cancel_reason=None)
+
+
+class TimeTypeParser:
+
+    @classmethod
+    def parse(cls, key: str) -> TimeType:
+
+        if key == "et":
+            return TimeType.ESTIMATED
+        elif key == "at":
+            return TimeType.ACTUAL
+        else:
+            raise InvalidTimeType(f"Invalid time type {key}")
+
+
+class ForecastParser:
+
+    @classmethod
+    def parse(
+        cls,
+        body: dict,
+        tpl: str,
+        key: str,
+        location_type: LocationType,
+        resolver: Optional[ServiceDayResolver] = None,
+    ) -> list[LocationUpdate]:
+
+        try:
+            forecast = body[key]
+        except KeyError:
+            return []
+
+        length = int(body["length"]) if "length" in body else None
+
+        updates = []
+
+        for time_key, value in forecast.items():
+
+            try:
+                time_type = TimeTypeParser.parse(time_key)
+                time = resolver.resolve(value) if resolver else parse_time(value)
+
+                updates.append(LocationUpdate(tpl, location_type, time_type, time, length, False, None))
+
+            except InvalidTimeType:
+                continue
+
+        return updates
+
+    @classmethod
+    def fill(
+        cls,
+        columns: LocationColumns,
+        rid: str,
+        body: dict,
+        tpl: str,
+        key: str,
+        location_type: LocationType,
+        resolver: Optional[ServiceDayResolver] = None,
+    ) -> int:
+        """As parse(), appending the rows to columns, and returns how many there were."""
+
+        try:
+            forecast = body[key]
+        except KeyError:
+            return 0
+
+        length = int(body["length"]) if "length" in body else None
+        count = 0
+
+        for time_key, value in forecast.items():
+            time_type = FORECAST_TIME_TYPES.get(time_key)
+
+            if time_type is None:
+                continue
+
+            seconds = resolver.resolve_seconds(value) if resolver else parse_seconds(value)
+            columns.add(rid, tpl, location_type, time_type, seconds, length, False, None)
+            count += 1
+
+        return count
+
+
+class LocationsParser:
+
+    @classmethod
+    def parse(cls, body: dict, resolver: Optional[ServiceDayResolver] = None) -> list[LocationUpdate]:
+
+        try:
+            locations = body["Location"]
+        except KeyError as exception:
+            raise InvalidLocation(f"No Location found on {body}") from exception
+
+        if type(locations) is dict:
+            locations = [locations]
+
+        updates: list[LocationUpdate] = []
+
+        for locs in locations:
+
+            try:
+                tpl = locs["tpl"]
+            except KeyError:
+                raise InvalidLocation(f"No tpl found on {locs}")
+
+            updates.extend(ForecastParser.parse(locs, tpl, "arr", LocationType.ARR, resolver))
+            updates.extend(ForecastParser.parse(locs, tpl, "dep", LocationType.DEP, resolver))
+
+        if not updates:
+            raise InvalidLocation(f"No LocationUpdates could be parsed from {body}")
+
+        return updates
+
+    @classmethod
+    def fill(
+        cls, columns: LocationColumns, rid: str, body: dict, resolver: Optional[ServiceDayResolver] = None
+    ) -> None:
+        """As parse(), appending the rows to columns."""
+
+        try:
+            locations = body["Location"]
+        except KeyError as exception:
+            raise InvalidLocation(f"No Location found on {body}") from exception
+
+        if type(locations) is dict:
+            locations = [locations]
+
+        count = 0
+
+        for locs in locations:
+
+            try:
+                tpl = locs["tpl"]
+            except KeyError:
+                raise InvalidLocation(f"No tpl found on {locs}")
+
+            count += ForecastParser.fill(columns, rid, locs, tpl, "arr", LocationType.ARR, resolver)
+            count += ForecastParser.fill(columns, rid, locs, tpl, "dep", LocationType.DEP, resolver)
+
+        if not count:
+            raise InvalidLocation(f"No LocationUpdates could be parsed from {body}")
+
+
+class TSParser(TSMessageParser):
+    """Parses TS elements from the Kafka JSON Push Port schema."""
+
+    def _unwrap(self, raw_body: dict) -> tuple[list[dict], datetime]:
+
+        try:
+            ts = datetime.fromisoformat(raw_body["ts"])
+        except KeyError as exception:
+            raise InvalidServiceUpdate(f"Cannot extract ts from {raw_body}") from exception
+
+        try:
+            msg_ts = raw_body["uR"]["TS"]
+
+            if type(msg_ts) is dict:
+                msg_ts = [msg_ts]
+
+        except KeyError as exception:
+            raise InvalidServiceUpdate(f"Cannot extract uR or TS from {raw_body}") from exception
+
+        return msg_ts, ts
+
+    def parse(self, raw_body: dict) -> list[FormattedMessage]:
+        return self.parse_elements(*self._unwrap(raw_body))
+
+    def parse_batch(self, payloads: Iterable[dict]) -> MessageBatch:
+        """Fills the columns straight from the payloads, building a ServiceUpdate only to check predicates."""
+
+        batch = MessageBatch()
+
+        for raw_body in payloads:
+            elements, ts = self._unwrap(raw_body)
+
+            for body in elements:
+                if self._predicates:
+                    service = ServiceParser.parse(body, ts)
+
+                    if not self._keep(service):
+                        continue
+
+                try:
+                    rid = body["rid"]
+                    uid = body["uid"]
+                except KeyError as exception:
+                    raise InvalidServiceUpdate(f"Cannot extract rid or uid from {body}") from exception
+
+                LocationsParser.fill(batch.locations, rid, body, self._create_resolver(body, ts))
+                batch.services.add(
+                    rid, uid, ts, False, str(body.get("toc", "")), str(body.get("trainId", "")), None
+                )
+
+        return batch
+
+    def _parse_service(self, body: dict, ts: datetime) -> ServiceUpdate:
+        return ServiceParser.parse(body, ts)
+
+    def _parse_locations(self, body: dict, resolver: Optional[ServiceDayResolver]) -> list[LocationUpdate]:
+        return LocationsParser.parse(body, resolver)
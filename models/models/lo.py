@@ -93,9 +93,13 @@ class LOParser(MessageParserInterface):
         except KeyError as exception:
             raise InvalidServiceUpdate(f"Cannot extract uR or formationLoading from {data}") from exception
 
+        return self.parse_elements(formation_loading, ts)
+
+    def parse_elements(self, elements: list[dict], ts: datetime) -> list[FormattedMessage]:
+
         messages = []
 
-        for message in formation_loading:
+        for message in elements:
             tpl = str(message.get("@tpl", ""))
             loading_updates = LoadingParser.parse(message, tpl)
             service = ServiceParser.parse(message, ts)
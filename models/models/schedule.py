@@ -1,17 +1,19 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import date, datetime
+from typing import Optional
 
 from models.common import (
     FormattedMessage,
     InvalidLocationTypeKey,
     LocationType,
     LocationUpdate,
-    MessageParserInterface,
+    ScheduleMessageParser,
     ServiceUpdate,
     TimeType,
 )
+from models.times import ServiceDayResolver, parse_time
 
 
 class InvalidLocation(Exception): ...
@@ -63,14 +65,16 @@ class ServiceParser:
         except KeyError:
             cancel_reason = None
 
-        return ServiceUpdate(rid, uid, ts, is_passenger_service, toc, train_id, cancel_reason)
+        ssd = date.fromisoformat(body["@ssd"]) if "@ssd" in body else None
+
+        return ServiceUpdate(rid, uid, ts, is_passenger_service, toc, train_id, cancel_reason, ssd)
 
 
 @dataclass
 class LocationsParser:
 
     @classmethod
-    def parse(cls, body: dict) -> list[LocationUpdate]:
+    def parse(cls, body: dict, resolver: Optional[ServiceDayResolver] = None) -> list[LocationUpdate]:
 
         try:
             tpl = body["@tpl"]
@@ -93,11 +97,9 @@ class LocationsParser:
 
             try:
                 location_type = LocationType.create(key)
-                raw_ts = value if len(value.split(":")) == 3 else f"{value}:00"
+                time = resolver.resolve(value) if resolver else parse_time(value)
 
-                updates.append(
-                    LocationUpdate(tpl, location_type, TimeType.SCHEDULED, datetime.strptime(raw_ts, "%H:%M:%S"), None, cancelled, avg_loading)
-                )
+                updates.append(LocationUpdate(tpl, location_type, TimeType.SCHEDULED, time, None, cancelled, avg_loading))
             except InvalidLocationTypeKey:
                 continue
 
@@ -107,7 +109,11 @@ class LocationsParser:
         return updates
 
 
-class ScheduleParser(MessageParserInterface):
+class ScheduleParser(ScheduleMessageParser):
+
+    ssd_key = "@ssd"
+    route_keys = ("ns2:OR", "ns2:IP", "ns2:PP", "ns2:DT")
+    time_keys = ("@wtd", "@wta", "@wtp")
 
     def parse(self, raw_body: dict) -> list[FormattedMessage]:
 
@@ -132,31 +138,10 @@ class ScheduleParser(MessageParserInterface):
         except KeyError as exception:
             raise InvalidServiceUpdate(f"Cannot extract uR or schedule from {data}") from exception
 
-        messages = []
-
-        for message in schedules:
-            messages.append(self._parse_message(message, ts))
-
-        return messages
-
-    def _get_list(self, key: str, body: dict) -> list[dict]:
-
-        obj = body.get(key, [])
-
-        if type(obj) is dict:
-            return [obj]
-        return obj
-
-    def _parse_message(self, body: dict, ts: datetime) -> FormattedMessage:
-        raw_locs = []
-        updates = []
-
-        raw_locs.extend(self._get_list("ns2:DT", body))
-        raw_locs.extend(self._get_list("ns2:OR", body))
-        raw_locs.extend(self._get_list("ns2:IP", body))
-        raw_locs.extend(self._get_list("ns2:PP", body))
+        return self.parse_elements(schedules, ts)
 
-        for raw_loc in raw_locs:
-            updates.extend(LocationsParser.parse(raw_loc))
+    def _parse_service(self, body: dict, ts: datetime) -> ServiceUpdate:
+        return ServiceParser.parse(body, ts)
 
-        return FormattedMessage(service=ServiceParser.parse(body, ts), locations=updates)
+    def _parse_location(self, body: dict, resolver: Optional[ServiceDayResolver]) -> list[LocationUpdate]:
+        return LocationsParser.parse(body, resolver)
@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from models.board import DepartureBoard
+from models.common import (
+    FormattedMessage,
+    LocationType,
+    LocationUpdate,
+    ServiceUpdate,
+    TimeType,
+)
+from models.times import EPOCH, SECONDS_PER_DAY
+
+DEFAULT_RETAIN = timedelta(hours=36)
+SWEEP_INTERVAL = timedelta(hours=1)
+
+
+# Arrivals come before departures from the same location at the same time
+TYPE_ORDER = {LocationType.ARR: 0, LocationType.PASS: 1, LocationType.DEP: 2}
+
+
+# Calls are keyed by tpl, type and scheduled time, so a service calling at a location twice keeps both
+PointKey = tuple[str, LocationType, Optional[int]]
+
+
+def _time(seconds: Optional[int]) -> Optional[datetime]:
+    return EPOCH + timedelta(seconds=seconds) if seconds is not None else None
+
+
+def _distance(scheduled: Optional[int], seconds: int) -> int:
+    """Seconds between two times, going round midnight, so times of day and resolved times both compare."""
+
+    if scheduled is None:
+        return SECONDS_PER_DAY
+
+    distance = abs(scheduled - seconds) % SECONDS_PER_DAY
+    return min(distance, SECONDS_PER_DAY - distance)
+
+
+def _nearest(points: list[CallingPoint], seconds: int) -> CallingPoint:
+    """The occurrence of a call scheduled closest to seconds, which a forecast or moved call belongs to."""
+
+    if len(points) == 1:
+        return points[0]
+
+    return min(points, key=lambda point: _distance(point.scheduled_seconds, seconds))
+
+
+def _route_order(points: list[CallingPoint]) -> list[CallingPoint]:
+    """
+    Sorts calling points by scheduled time of day. A service runs for well under a day, so it
+    starts just after the largest gap between consecutive times, going round midnight.
+    """
+
+    points = sorted(points, key=lambda point: (point.scheduled_seconds or 0, TYPE_ORDER[point.type]))
+
+    if len(points) < 2:
+        return points
+
+    times = [point.scheduled_seconds or 0 for point in points]
+    gaps = [(times[0] + SECONDS_PER_DAY - times[-1], 0)]
+    gaps.extend((times[index] - times[index - 1], index) for index in range(1, len(times)))
+
+    start = max(gaps)[1]
+    return points[start:] + points[:start]
+
+
+@dataclass(slots=True)
+class CallingPoint:
+    """The scheduled, latest estimated and actual times of one event at a location, in seconds like LocationUpdate."""
+
+    tpl: str
+    type: LocationType
+    scheduled_seconds: Optional[int] = None
+    estimated_seconds: Optional[int] = None
+    actual_seconds: Optional[int] = None
+    cancelled: bool = False
+    length: Optional[int] = None
+    avg_loading: Optional[int] = None
+
+    @property
+    def scheduled(self) -> Optional[datetime]:
+        return _time(self.scheduled_seconds)
+
+    @property
+    def estimated(self) -> Optional[datetime]:
+        return _time(self.estimated_seconds)
+
+    @property
+    def actual(self) -> Optional[datetime]:
+        return _time(self.actual_seconds)
+
+    @property
+    def expected_seconds(self) -> Optional[int]:
+        """The actual time once there is one, otherwise the estimate, otherwise the schedule."""
+
+        if self.actual_seconds is not None:
+            return self.actual_seconds
+
+        return self.estimated_seconds if self.estimated_seconds is not None else self.scheduled_seconds
+
+    @property
+    def expected(self) -> Optional[datetime]:
+        return _time(self.expected_seconds)
+
+    @property
+    def forecast(self) -> bool:
+        return self.estimated_seconds is not None or self.actual_seconds is not None
+
+    def adopt(self, other: CallingPoint) -> None:
+        """Takes over the forecasts of another point for the same call."""
+
+        self.estimated_seconds = other.estimated_seconds
+        self.actual_seconds = other.actual_seconds
+
+        if other.length is not None:
+            self.length = other.length
+
+    def apply(self, update: LocationUpdate) -> None:
+
+        if update.time_type is TimeType.ACTUAL:
+            self.actual_seconds = update.seconds
+        elif update.time_type is TimeType.ESTIMATED:
+            self.estimated_seconds = update.seconds
+        else:
+            self.scheduled_seconds = update.seconds
+            self.cancelled = update.cancelled
+            self.avg_loading = update.avg_loading
+
+        if update.length is not None:
+            self.length = update.length
+
+
+@dataclass(slots=True)
+class ServiceState:
+    """The current state of a service: its schedule with the latest forecasts and loading merged on top."""
+
+    service: ServiceUpdate
+    updated: datetime
+    scheduled: bool = False
+    points: dict[PointKey, CallingPoint] = field(default_factory=dict)
+
+    # Latest loading per coach, by tpl
+    loading: dict[str, dict[int, int]] = field(default_factory=dict)
+
+    # Every occurrence of a call at a location in calling order, for matching forecasts to them
+    occurrences: dict[tuple[str, LocationType], list[CallingPoint]] = field(default_factory=dict, repr=False)
+
+    @property
+    def calling_points(self) -> list[CallingPoint]:
+        """Calling points in calling order, followed by any only forecast so far."""
+        return list(self.points.values())
+
+    def calling_point(self, tpl: str, type: LocationType, occurrence: int = 0) -> Optional[CallingPoint]:
+        """The call of the given type at tpl, or its later occurrences on a service calling there more than once."""
+
+        points = self.occurrences.get((tpl, type), ())
+        return points[occurrence] if occurrence < len(points) else None
+
+    @property
+    def last_reported(self) -> Optional[CallingPoint]:
+        """The last calling point with an actual time, i.e. where the train was last seen."""
+
+        for point in reversed(self.points.values()):
+            if point.actual_seconds is not None:
+                return point
+
+        return None
+
+    def _point(self, update: LocationUpdate) -> CallingPoint:
+
+        # TS locations carry no scheduled time, so a forecast goes to the occurrence scheduled
+        # closest to it. Before the schedule arrives there is one point per tpl and type
+        points = self.occurrences.get((update.tpl, update.type))
+
+        if points:
+            return _nearest(points, update.seconds)
+
+        point = self.points[(update.tpl, update.type, None)] = CallingPoint(update.tpl, update.type)
+        self.occurrences[(update.tpl, update.type)] = [point]
+
+        return point
+
+    def apply_schedule(self, service: ServiceUpdate, locations: Iterable[LocationUpdate]) -> None:
+        """Replaces the calling points with a schedule's, keeping forecasts for those still in it."""
+
+        points: dict[PointKey, CallingPoint] = {}
+
+        for update in locations:
+            key = (update.tpl, update.type, update.seconds)
+            point = points.get(key) or self.points.get(key) or CallingPoint(update.tpl, update.type)
+            point.apply(update)
+            points[key] = point
+
+        # The parsers group locations by kind, so put them back in the order they are called at
+        ordered = _route_order(list(points.values()))
+        occurrences: dict[tuple[str, LocationType], list[CallingPoint]] = {}
+
+        for point in ordered:
+            occurrences.setdefault((point.tpl, point.type), []).append(point)
+
+        # Forecasts made before the schedule arrived, or for a call it retimed, move to the
+        # nearest occurrence of that call that has none of its own
+        kept = {id(point) for point in ordered}
+
+        for old in self.points.values():
+            if id(old) in kept or not old.forecast:
+                continue
+
+            candidates = [point for point in occurrences.get((old.tpl, old.type), ()) if not point.forecast]
+
+            if candidates:
+                _nearest(candidates, old.expected_seconds or 0).adopt(old)
+
+        self.service = service
+        self.points = {(point.tpl, point.type, point.scheduled_seconds): point for point in ordered}
+        self.occurrences = occurrences
+        self.scheduled = True
+
+    def apply_forecast(self, locations: Iterable[LocationUpdate]) -> None:
+
+        for update in locations:
+            self._point(update).apply(update)
+
+
+@dataclass
+class StateStoreStats:
+
+    applied: int = 0
+    schedules: int = 0
+    forecasts: int = 0
+    loadings: int = 0
+    expired: int = 0
+
+
+class ServiceStateStore:
+    """
+    In-process current state of every service, keyed by rid. apply() takes the FormattedMessages
+    from the SC, TS and LO parsers in arrival order: a schedule sets a service's calling points
+    and header, and forecasts and loading are merged onto them as they come, including for a
+    service whose schedule hasn't arrived yet. Looking a service up is a dict access.
+
+    Services not updated within retain of the newest update seen are dropped, checked once every
+    SWEEP_INTERVAL of updates, so the store holds roughly the services running today.
+
+    Given a board, the calls of each scheduled service are kept indexed on it by station at their
+    expected times.
+    """
+
+    def __init__(self, retain: timedelta = DEFAULT_RETAIN, board: Optional[DepartureBoard] = None) -> None:
+        self._retain = retain
+        self.board = board
+        self._services: dict[str, ServiceState] = {}
+        self._newest: Optional[datetime] = None
+        self._swept: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+        self.stats = StateStoreStats()
+
+    def __len__(self) -> int:
+        return len(self._services)
+
+    def __contains__(self, rid: str) -> bool:
+        return rid in self._services
+
+    def get(self, rid: str) -> Optional[ServiceState]:
+        return self._services.get(rid)
+
+    def calling_points(self, rid: str) -> list[CallingPoint]:
+
+        state = self._services.get(rid)
+        return state.calling_points if state is not None else []
+
+    def _apply(self, message: FormattedMessage) -> None:
+
+        service = message.service
+        state = self._services.get(service.rid)
+        locations = message.locations or []
+
+        if state is None:
+            state = self._services[service.rid] = ServiceState(service, service.ts)
+
+        state.updated = max(state.updated, service.ts)
+
+        if message.loading:
+            # LO headers carry no uid, toc or train id, so only the loading is taken from them
+            for load in message.loading:
+                state.loading.setdefault(load.tpl, {})[load.coach_number] = load.loading
+
+            self.stats.loadings += 1
+
+        if any(location.time_type is TimeType.SCHEDULED for location in locations):
+            state.apply_schedule(service, locations)
+            self.stats.schedules += 1
+
+            if self.board is not None:
+                self.board.index(state)
+        elif locations:
+            # Until the schedule arrives the forecast header is the best there is
+            if not state.scheduled:
+                state.service = service
+
+            state.apply_forecast(locations)
+            self.stats.forecasts += 1
+
+            if self.board is not None and state.scheduled:
+                self.board.index(state)
+
+        self.stats.applied += 1
+
+        if self._newest is None or service.ts > self._newest:
+            self._newest = service.ts
+
+    def _sweep(self) -> None:
+
+        if self._newest is None:
+            return
+
+        if self._swept is not None and self._newest - self._swept < SWEEP_INTERVAL:
+            return
+
+        cutoff = self._newest - self._retain
+        expired = [rid for rid, state in self._services.items() if state.updated < cutoff]
+
+        for rid in expired:
+            del self._services[rid]
+
+            if self.board is not None:
+                self.board.remove(rid)
+
+        self.stats.expired += len(expired)
+        self._swept = self._newest
+
+    def apply(self, messages: Iterable[FormattedMessage]) -> None:
+
+        with self._lock:
+            for message in messages:
+                self._apply(message)
+
+            self._sweep()
@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Optional
+from xml.parsers import expat
+
+from models.common import (
+    FormattedMessage,
+    InvalidLocation,
+    InvalidServiceUpdate,
+    LoadingUpdate,
+    LocationType,
+    LocationUpdate,
+    ServiceUpdate,
+    TimeType,
+)
+from models.times import parse_time
+
+
+class InvalidPportMessage(Exception): ...
+
+
+SCHEDULE_LOCATION_KINDS = ("DT", "OR", "IP", "PP")
+
+SCHEDULE_TIME_KEYS = {"wta": LocationType.ARR, "wtd": LocationType.DEP, "wtp": LocationType.PASS}
+
+FORECAST_TIME_KEYS = {"et": TimeType.ESTIMATED, "at": TimeType.ACTUAL}
+
+FORECAST_LOCATION_TYPES = {"arr": LocationType.ARR, "dep": LocationType.DEP}
+
+
+def _local(name: str) -> str:
+    return name.rpartition(":")[2]
+
+
+class _TSBuilder:
+
+    def __init__(self, attrs: dict, ts: datetime) -> None:
+        self._attrs = attrs
+        self._ts = ts
+        self._updates: list[LocationUpdate] = []
+        self._tpl: Optional[str] = None
+        self._times: dict[LocationType, list[tuple[TimeType, datetime]]] = {}
+        self._length: Optional[int] = None
+
+    def start(self, name: str, attrs: dict) -> bool:
+
+        if name == "Location":
+            try:
+                self._tpl = attrs["tpl"]
+            except KeyError:
+                raise InvalidLocation(f"No tpl found on {attrs}")
+
+            self._times = {LocationType.ARR: [], LocationType.DEP: []}
+            self._length = None
+        elif name in FORECAST_LOCATION_TYPES and self._tpl is not None:
+            times = self._times[FORECAST_LOCATION_TYPES[name]]
+
+            for key, value in attrs.items():
+                if key in FORECAST_TIME_KEYS:
+                    times.append((FORECAST_TIME_KEYS[key], parse_time(value)))
+        elif name == "length":
+            return True
+
+        return False
+
+    def text(self, name: str, value: str) -> None:
+        self._length = int(value)
+
+    def end(self, name: str) -> None:
+
+        if name != "Location" or self._tpl is None:
+            return
+
+        for location_type, times in self._times.items():
+            for time_type, time in times:
+                self._updates.append(
+                    LocationUpdate(self._tpl, location_type, time_type, time, self._length, False, None)
+                )
+
+        self._tpl = None
+
+    def build(self) -> FormattedMessage:
+
+        try:
+            rid = self._attrs["rid"]
+            uid = self._attrs["uid"]
+        except KeyError as exception:
+            raise InvalidServiceUpdate(f"Cannot extract rid or uid from {self._attrs}") from exception
+
+        if not self._updates:
+            raise InvalidLocation(f"No LocationUpdates could be parsed from {self._attrs}")
+
+        service = ServiceUpdate(
+            rid,
+            uid,
+            self._ts,
+            passenger=False,
+            toc=self._attrs.get("toc", ""),
+            train_id=self._attrs.get("trainId", ""),
+            cancel_reason=None,
+        )
+        return FormattedMessage(service=service, locations=self._updates)
+
+
+class _ScheduleBuilder:
+
+    def __init__(self, attrs: dict, ts: datetime) -> None:
+        self._attrs = attrs
+        self._ts = ts
+        self._locations: dict[str, list[LocationUpdate]] = {kind: [] for kind in SCHEDULE_LOCATION_KINDS}
+        self._cancel_reason: Optional[str] = None
+
+    def start(self, name: str, attrs: dict) -> bool:
+
+        if name in self._locations:
+            self._locations[name].extend(self._parse_location(attrs))
+        elif name == "cancelReason":
+            return True
+
+        return False
+
+    def text(self, name: str, value: str) -> None:
+        self._cancel_reason = value
+
+    def end(self, name: str) -> None: ...
+
+    def _parse_location(self, attrs: dict) -> list[LocationUpdate]:
+
+        try:
+            tpl = attrs["tpl"]
+        except KeyError:
+            raise InvalidLocation(f"No tpl found on {attrs}")
+
+        cancelled = attrs.get("can") == "true"
+        avg_loading = int(attrs["avgLoading"]) if "avgLoading" in attrs else None
+
+        updates = [
+            LocationUpdate(
+                tpl, SCHEDULE_TIME_KEYS[key], TimeType.SCHEDULED, parse_time(value), None, cancelled, avg_loading
+            )
+            for key, value in attrs.items()
+            if key in SCHEDULE_TIME_KEYS
+        ]
+
+        if not updates:
+            raise InvalidLocation(f"No LocationUpdates could be parsed from {attrs}")
+
+        return updates
+
+    def build(self) -> FormattedMessage:
+
+        try:
+            service = ServiceUpdate(
+                self._attrs["rid"],
+                self._attrs["uid"],
+                self._ts,
+                self._attrs.get("isPassengerSvc", "true") == "true",
+                self._attrs["toc"],
+                self._attrs["trainId"],
+                self._cancel_reason,
+                date.fromisoformat(self._attrs["ssd"]) if "ssd" in self._attrs else None,
+            )
+        except KeyError as exception:
+            raise InvalidServiceUpdate(f"Cannot extract {exception} from {self._attrs}") from exception
+
+        updates: list[LocationUpdate] = []
+
+        for kind in SCHEDULE_LOCATION_KINDS:
+            updates.extend(self._locations[kind])
+
+        return FormattedMessage(service=service, locations=updates)
+
+
+class _LoadingBuilder:
+
+    def __init__(self, attrs: dict, ts: datetime) -> None:
+        self._attrs = attrs
+        self._ts = ts
+        self._tpl = attrs.get("tpl", "")
+        self._coach_number: Optional[str] = None
+        self._updates: list[LoadingUpdate] = []
+
+    def start(self, name: str, attrs: dict) -> bool:
+
+        if name == "loading":
+            self._coach_number = attrs.get("coachNumber")
+            return True
+
+        return False
+
+    def text(self, name: str, value: str) -> None:
+
+        try:
+            self._updates.append(LoadingUpdate(self._tpl, int(self._coach_number), int(value)))  # type: ignore
+        except (TypeError, ValueError):
+            pass
+
+    def end(self, name: str) -> None: ...
+
+    def build(self) -> FormattedMessage:
+
+        try:
+            rid = self._attrs["rid"]
+        except KeyError as exception:
+            raise InvalidServiceUpdate(f"Cannot extract rid from {self._attrs}") from exception
+
+        service = ServiceUpdate(rid, "", self._ts, passenger=False, toc="", train_id="", cancel_reason=None)
+        return FormattedMessage(service=service, loading=self._updates)
+
+
+BUILDERS = {
+    "TS": _TSBuilder,
+    "schedule": _ScheduleBuilder,
+    "formationLoading": _LoadingBuilder,
+}
+
+
+class _PportHandler:
+
+    def __init__(self) -> None:
+        self.messages: list[FormattedMessage] = []
+
+        self._ts: Optional[datetime] = None
+        self._in_ur = False
+        self._depth = 0
+        self._builder = None
+        self._builder_depth = 0
+        self._capture: Optional[str] = None
+        self._text: list[str] = []
+
+    def start(self, raw_name: str, attrs: dict) -> None:
+
+        name = _local(raw_name)
+        self._depth += 1
+
+        if self._builder is not None:
+            if self._builder.start(name, attrs):
+                self._capture = name
+                self._text = []
+        elif self._depth == 1 and name == "Pport":
+            try:
+                self._ts = datetime.fromisoformat(attrs["ts"])
+            except KeyError as exception:
+                raise InvalidServiceUpdate(f"Cannot extract ts from {attrs}") from exception
+        elif self._depth == 2 and name == "uR":
+            self._in_ur = True
+        elif self._depth == 3 and self._in_ur and name in BUILDERS:
+            self._builder = BUILDERS[name](attrs, self._ts)
+            self._builder_depth = self._depth
+
+    def data(self, value: str) -> None:
+
+        if self._capture is not None:
+            self._text.append(value)
+
+    def end(self, raw_name: str) -> None:
+
+        name = _local(raw_name)
+
+        if self._builder is not None:
+            if self._depth == self._builder_depth:
+                self.messages.append(self._builder.build())
+                self._builder = None
+            else:
+                if self._capture == name:
+                    self._builder.text(name, "".join(self._text).strip())
+                    self._capture = None
+
+                self._builder.end(name)
+        elif self._depth == 2 and name == "uR":
+            self._in_ur = False
+
+        self._depth -= 1
+
+
+class PportStreamDecoder:
+    """
+    Decodes a Pport XML document straight into FormattedMessages in a single expat pass,
+    skipping the intermediate xmltodict representation.
+
+    Handles TS, schedule and formationLoading elements within uR, producing the same
+    messages as TSParser, ScheduleParser and LOParser would for the xmltodict output.
+    """
+
+    def decode(self, payload: bytes | str) -> list[FormattedMessage]:
+
+        handler = _PportHandler()
+
+        parser = expat.ParserCreate()
+        parser.buffer_text = True
+        parser.StartElementHandler = handler.start
+        parser.EndElementHandler = handler.end
+        parser.CharacterDataHandler = handler.data
+
+        try:
+            parser.Parse(payload, True)
+        except expat.ExpatError as exception:
+            raise InvalidPportMessage(f"Cannot parse Pport XML: {exception}") from exception
+
+        return handler.messages
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+
+class InvalidTime(Exception): ...
+
+
+SECONDS_PER_DAY = 24 * 60 * 60
+HALF_DAY = SECONDS_PER_DAY // 2
+
+EPOCH = datetime(1900, 1, 1)
+
+# "HH:MM" -> seconds past midnight, and "SS" -> seconds
+MINUTE_TABLE = {f"{hour:02d}:{minute:02d}": hour * 3600 + minute * 60 for hour in range(24) for minute in range(60)}
+SECOND_TABLE = {f"{second:02d}": second for second in range(60)}
+
+
+def _build_time_of_day_table() -> dict[str, datetime]:
+
+    table = {}
+
+    # Darwin only uses whole and half minutes, so every time it sends is a direct lookup in here
+    for key, seconds in MINUTE_TABLE.items():
+        table[key] = table[f"{key}:00"] = EPOCH + timedelta(seconds=seconds)
+        table[f"{key}:30"] = EPOCH + timedelta(seconds=seconds + 30)
+
+    return table
+
+
+TIME_OF_DAY_TABLE = _build_time_of_day_table()
+
+
+def parse_seconds(value: str) -> int:
+    """Parse a HH:MM or HH:MM:SS time of day into seconds past midnight."""
+
+    try:
+        seconds = MINUTE_TABLE[value[:5]]
+    except (KeyError, TypeError) as exception:
+        raise InvalidTime(f"Invalid time of day {value}") from exception
+
+    if len(value) == 5:
+        return seconds
+
+    if len(value) != 8 or value[5] != ":" or value[6:] not in SECOND_TABLE:
+        raise InvalidTime(f"Invalid time of day {value}")
+
+    return seconds + SECOND_TABLE[value[6:]]
+
+
+def parse_time(value: str) -> datetime:
+    """
+    Drop-in replacement for strptime(value, "%H:%M:%S") on HH:MM[:SS] values, returning the
+    same 1900-01-01 based datetime.
+    """
+
+    try:
+        return TIME_OF_DAY_TABLE[value]
+    except KeyError:
+        return EPOCH + timedelta(seconds=parse_seconds(value))
+
+
+class ServiceDayResolver:
+    """
+    Resolves a service's HH:MM[:SS] times into real (naive, UK local) timestamps on its
+    scheduled start date (ssd).
+
+    Each time is placed on whichever day brings it closest to the previously resolved time,
+    so services running past midnight roll over onto the next day. The first time can be
+    anchored with seed(), e.g. on the origin departure or the Pport message timestamp.
+    """
+
+    def __init__(self, ssd: date) -> None:
+        self._ssd = datetime(ssd.year, ssd.month, ssd.day)
+        self._ssd_seconds = (self._ssd - EPOCH).days * SECONDS_PER_DAY
+        self._previous: Optional[int] = None
+
+    def seed(self, value: datetime | str) -> None:
+
+        if isinstance(value, datetime):
+            days = (value.date() - self._ssd.date()).days
+
+            # A timestamp days away from the ssd, e.g. on a replayed message, says nothing about rollover
+            if abs(days) <= 1:
+                self._previous = days * SECONDS_PER_DAY + value.hour * 3600 + value.minute * 60 + value.second
+        else:
+            self._previous = self._place(parse_seconds(value))
+
+    def fork(self) -> ServiceDayResolver:
+
+        resolver = ServiceDayResolver(self._ssd)
+        resolver._previous = self._previous
+
+        return resolver
+
+    def _place(self, seconds: int) -> int:
+
+        if self._previous is None:
+            return seconds
+
+        day = (self._previous - seconds + HALF_DAY) // SECONDS_PER_DAY
+
+        return day * SECONDS_PER_DAY + seconds
+
+    def resolve(self, value: str) -> datetime:
+
+        offset = self._place(parse_seconds(value))
+        self._previous = offset
+
+        return self._ssd + timedelta(seconds=offset)
+
+    def resolve_seconds(self, value: str) -> int:
+        """As resolve(), in seconds since EPOCH like LocationUpdate.seconds, without building a datetime."""
+
+        offset = self._place(parse_seconds(value))
+        self._previous = offset
+
+        return self._ssd_seconds + offset
@@ -1,15 +1,17 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Optional
 
 from models.common import (
     FormattedMessage,
     LocationType,
     LocationUpdate,
-    MessageParserInterface,
     ServiceUpdate,
     TimeType,
+    TSMessageParser,
 )
+from models.times import ServiceDayResolver, parse_time
 
 
 class InvalidLocation(Exception): ...
@@ -61,7 +63,7 @@ class TimeTypeParser:
 class ArrivalParser:
 
     @classmethod
-    def parse(cls, body: dict, tpl: str) -> list[LocationUpdate]:
+    def parse(cls, body: dict, tpl: str, resolver: Optional[ServiceDayResolver] = None) -> list[LocationUpdate]:
 
         try:
             arr = body["ns5:arr"]
@@ -79,11 +81,9 @@ class ArrivalParser:
 
             try:
                 time_type = TimeTypeParser.parse(key)
-                raw_ts = value if len(value.split(":")) == 3 else f"{value}:00"
+                time = resolver.resolve(value) if resolver else parse_time(value)
 
-                updates.append(
-                    LocationUpdate(tpl, LocationType.ARR, time_type, datetime.strptime(raw_ts, "%H:%M:%S"), length, False, None)
-                )
+                updates.append(LocationUpdate(tpl, LocationType.ARR, time_type, time, length, False, None))
 
             except InvalidTimeType:
                 continue
@@ -94,7 +94,7 @@ class ArrivalParser:
 class DepartureParser:
 
     @classmethod
-    def parse(cls, body: dict, tpl: str) -> list[LocationUpdate]:
+    def parse(cls, body: dict, tpl: str, resolver: Optional[ServiceDayResolver] = None) -> list[LocationUpdate]:
 
         try:
             arr = body["ns5:dep"]
@@ -112,11 +112,9 @@ class DepartureParser:
 
             try:
                 time_type = TimeTypeParser.parse(key)
-                raw_ts = value if len(value.split(":")) == 3 else f"{value}:00"
+                time = resolver.resolve(value) if resolver else parse_time(value)
 
-                updates.append(
-                    LocationUpdate(tpl, LocationType.DEP, time_type, datetime.strptime(raw_ts, "%H:%M:%S"), length, False, None)
-                )
+                updates.append(LocationUpdate(tpl, LocationType.DEP, time_type, time, length, False, None))
 
             except InvalidTimeType:
                 continue
@@ -127,7 +125,7 @@ class DepartureParser:
 class LocationsParser:
 
     @classmethod
-    def parse(cls, body: dict) -> list[LocationUpdate]:
+    def parse(cls, body: dict, resolver: Optional[ServiceDayResolver] = None) -> list[LocationUpdate]:
 
         locations = body["ns5:Location"]
 
@@ -143,8 +141,8 @@ class LocationsParser:
             except KeyError:
                 raise InvalidLocation(f"No @tpl found on {locs}")
 
-            arr_locs = ArrivalParser.parse(locs, tpl)
-            dep_locs = DepartureParser.parse(locs, tpl)
+            arr_locs = ArrivalParser.parse(locs, tpl, resolver)
+            dep_locs = DepartureParser.parse(locs, tpl, resolver)
 
             updates.extend(arr_locs)
             updates.extend(dep_locs)
@@ -155,7 +153,9 @@ class LocationsParser:
         return updates
 
 
-class TSParser(MessageParserInterface):
+class TSParser(TSMessageParser):
+
+    ssd_key = "@ssd"
 
     def parse(self, raw_body: dict) -> list[FormattedMessage]:
 
@@ -181,11 +181,10 @@ class TSParser(MessageParserInterface):
         except KeyError as exception:
             raise InvalidServiceUpdate(f"Cannot extract uR or schedule from {data}") from exception
 
-        messages = []
-
-        for message in msg_ts:
+        return self.parse_elements(msg_ts, ts)
 
-            locations = LocationsParser.parse(message)
-            messages.append(FormattedMessage(service=ServiceParser.parse(message, ts), locations=locations))
+    def _parse_service(self, body: dict, ts: datetime) -> ServiceUpdate:
+        return ServiceParser.parse(body, ts)
 
-        return messages
+    def _parse_locations(self, body: dict, resolver: Optional[ServiceDayResolver]) -> list[LocationUpdate]:
+        return LocationsParser.parse(body, resolver)
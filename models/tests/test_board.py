@@ -0,0 +1,170 @@
+import json
+from datetime import date, datetime, timezone
+
+from models.board import BoardEntry, DepartureBoard
+from models.common import (
+    FormattedMessage,
+    LocationType,
+    LocationUpdate,
+    ServiceUpdate,
+    TimeType,
+)
+from models.kafka import ScheduleParser
+from models.state import ServiceStateStore
+
+TS = datetime(2025, 11, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def at(time: str) -> datetime:
+    return datetime.strptime(f"1900-01-01 {time}", "%Y-%m-%d %H:%M")
+
+
+def schedule(rid: str, *calls: tuple[str, LocationType, str]) -> FormattedMessage:
+
+    service = ServiceUpdate(rid, "A", TS, True, "NT", "2W20", None)
+    locations = [
+        LocationUpdate(tpl, type, TimeType.SCHEDULED, at(time), None, False, None) for tpl, type, time in calls
+    ]
+
+    return FormattedMessage(service, locations)
+
+
+def departing(rid: str, *calls: tuple[str, str]) -> FormattedMessage:
+    return schedule(rid, *((tpl, LocationType.DEP, time) for tpl, time in calls))
+
+
+class TestDepartureBoard:
+
+    def test__next_departures(self) -> None:
+
+        board = DepartureBoard()
+        store = ServiceStateStore(board=board)
+        store.apply(
+            [
+                departing("202511010000003", ("LEEDS", "10:30"), ("YORK", "11:00")),
+                departing("202511010000001", ("LEEDS", "09:00"), ("YORK", "09:30")),
+                departing("202511010000002", ("LEEDS", "10:00"), ("YORK", "10:30")),
+            ]
+        )
+
+        departures = board.departures("LEEDS", datetime(2025, 11, 1, 9, 30), limit=2)
+
+        assert departures == [
+            BoardEntry(datetime(2025, 11, 1, 10, 0), "202511010000002", LocationType.DEP),
+            BoardEntry(datetime(2025, 11, 1, 10, 30), "202511010000003", LocationType.DEP),
+        ]
+        assert [entry.rid for entry in board.departures("YORK", datetime(2025, 11, 1, 9, 30))] == [
+            "202511010000001",
+            "202511010000002",
+            "202511010000003",
+        ]
+        assert board.departures("LEEDS", datetime(2025, 11, 2, 0, 0)) == []
+        assert board.arrivals("LEEDS", datetime(2025, 11, 1, 0, 0)) == []
+
+    def test__schedule_change_reindexes(self) -> None:
+
+        board = DepartureBoard()
+        store = ServiceStateStore(board=board)
+
+        store.apply([departing("202511010000001", ("LEEDS", "09:00"), ("YORK", "09:30"))])
+        store.apply([departing("202511010000001", ("LEEDS", "09:15"), ("HUDDFLD", "09:45"))])
+
+        assert board.departures("LEEDS", datetime(2025, 11, 1)) == [
+            BoardEntry(datetime(2025, 11, 1, 9, 15), "202511010000001", LocationType.DEP)
+        ]
+        assert board.departures("YORK", datetime(2025, 11, 1)) == []
+        assert len(board) == 1
+
+    def test__after_midnight(self) -> None:
+
+        board = DepartureBoard()
+        store = ServiceStateStore(board=board)
+        store.apply(
+            [
+                schedule(
+                    "202511010000001",
+                    ("LEEDS", LocationType.DEP, "23:50"),
+                    ("YORK", LocationType.ARR, "00:20"),
+                )
+            ]
+        )
+
+        assert board.arrivals("YORK", datetime(2025, 11, 1, 23, 0)) == [
+            BoardEntry(datetime(2025, 11, 2, 0, 20), "202511010000001", LocationType.ARR)
+        ]
+
+    def test__service_day_from_ssd(self) -> None:
+
+        board = DepartureBoard()
+        message = departing("202511010000001", ("LEEDS", "09:00"))
+        message.service.ssd = date(2025, 11, 2)
+
+        ServiceStateStore(board=board).apply([message])
+
+        assert board.departures("LEEDS", datetime(2025, 11, 1)) == [
+            BoardEntry(datetime(2025, 11, 2, 9, 0), "202511010000001", LocationType.DEP)
+        ]
+
+    def test__forecasts_reindex(self) -> None:
+
+        board = DepartureBoard()
+        store = ServiceStateStore(board=board)
+        store.apply(
+            [
+                departing("202511010000001", ("LEEDS", "09:00"), ("YORK", "09:30")),
+                departing("202511010000002", ("LEEDS", "09:10"), ("YORK", "09:40")),
+                departing("202511010000003", ("LEEDS", "23:55")),
+            ]
+        )
+
+        delayed = schedule("202511010000001", ("LEEDS", LocationType.DEP, "09:20"))
+        delayed.locations[0].time_type = TimeType.ESTIMATED
+        late = schedule("202511010000003", ("LEEDS", LocationType.DEP, "00:05"))
+        late.locations[0].time_type = TimeType.ACTUAL
+        store.apply([delayed, late])
+
+        assert board.departures("LEEDS", datetime(2025, 11, 1, 9, 0)) == [
+            BoardEntry(datetime(2025, 11, 1, 9, 10), "202511010000002", LocationType.DEP),
+            BoardEntry(datetime(2025, 11, 1, 9, 20), "202511010000001", LocationType.DEP),
+            BoardEntry(datetime(2025, 11, 2, 0, 5), "202511010000003", LocationType.DEP),
+        ]
+        assert board.departures("YORK", datetime(2025, 11, 1, 9, 0), limit=1) == [
+            BoardEntry(datetime(2025, 11, 1, 9, 30), "202511010000001", LocationType.DEP)
+        ]
+
+    def test__remove(self) -> None:
+
+        board = DepartureBoard()
+        ServiceStateStore(board=board).apply([departing("202511010000001", ("LEEDS", "09:00"))])
+
+        board.remove("202511010000001")
+
+        assert board.departures("LEEDS", datetime(2025, 11, 1)) == []
+        assert len(board) == 0
+
+    def test__resolved_dates(self) -> None:
+
+        with open("tests/fixtures/kafka/sc.json", "r") as f:
+            data = json.load(f)
+
+        board = DepartureBoard()
+        ServiceStateStore(board=board).apply(ScheduleParser(resolve_dates=True).parse(data))
+
+        # Already on the service's date, so placed as they are rather than on it again
+        assert board.departures("MNCROXR", datetime(2025, 11, 1)) == [
+            BoardEntry(datetime(2025, 11, 1, 15, 27), "202511018750847", LocationType.DEP)
+        ]
+        assert board.arrivals("SOUTHPT", datetime(2025, 11, 1)) == [
+            BoardEntry(datetime(2025, 11, 1, 16, 43), "202511018750847", LocationType.ARR)
+        ]
+
+    def test__cancelled_calls_left_off(self) -> None:
+
+        board = DepartureBoard()
+        message = departing("202511010000001", ("LEEDS", "09:00"), ("YORK", "09:30"))
+        message.locations[1].cancelled = True
+
+        ServiceStateStore(board=board).apply([message])
+
+        assert len(board.departures("LEEDS", datetime(2025, 11, 1))) == 1
+        assert board.departures("YORK", datetime(2025, 11, 1)) == []
@@ -0,0 +1,151 @@
+from datetime import datetime
+
+from models.coalesce import Coalescer
+from models.common import (
+    FormattedMessage,
+    LoadingUpdate,
+    LocationType,
+    LocationUpdate,
+    ServiceUpdate,
+    TimeType,
+)
+
+
+class Clock:
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def location(
+    tpl: str, time: str, type: LocationType = LocationType.DEP, time_type: TimeType = TimeType.ESTIMATED
+) -> LocationUpdate:
+
+    at = datetime.strptime(f"2025-11-01 {time}", "%Y-%m-%d %H:%M")
+    return LocationUpdate(tpl, type, time_type, at, 3, False, None)
+
+
+def message(rid: str, second: int, *locations: LocationUpdate) -> FormattedMessage:
+
+    service = ServiceUpdate(rid, "G56103", datetime(2025, 11, 1, 16, 55, second), True, "AW", "2W20", None)
+    return FormattedMessage(service, list(locations))
+
+
+class TestCoalescer:
+
+    def test__merges_within_window(self) -> None:
+
+        clock = Clock()
+        coalescer = Coalescer(window_secs=2, clock=clock)
+
+        assert coalescer.add([message("1", 0, location("CRDFCEN", "16:57"), location("NWPTRTG", "17:08"))]) == []
+
+        clock.now = 1
+        assert coalescer.add([message("1", 1, location("CRDFCEN", "16:58"))]) == []
+
+        clock.now = 2
+        emitted = coalescer.poll()
+
+        assert emitted == [message("1", 1, location("CRDFCEN", "16:58"), location("NWPTRTG", "17:08"))]
+        assert coalescer.pending == 0
+        assert coalescer.stats.received == 2
+        assert coalescer.stats.merged == 1
+
+    def test__keeps_time_types_apart(self) -> None:
+
+        coalescer = Coalescer()
+        coalescer.add(
+            [
+                message("1", 0, location("CRDFCEN", "16:57")),
+                message("1", 1, location("CRDFCEN", "16:57", time_type=TimeType.ACTUAL)),
+                message("1", 2, location("CRDFCEN", "16:55", type=LocationType.ARR)),
+            ]
+        )
+
+        assert len(coalescer.flush()[0].locations) == 3
+
+    def test__windows_close_in_order(self) -> None:
+
+        clock = Clock()
+        coalescer = Coalescer(window_secs=2, clock=clock)
+
+        coalescer.add([message("1", 0, location("CRDFCEN", "16:57"))])
+        clock.now = 1
+        coalescer.add([message("2", 0, location("CRDFCEN", "16:57"))])
+
+        clock.now = 2.5
+        assert [m.service.rid for m in coalescer.poll()] == ["1"]
+
+        clock.now = 3
+        assert [m.service.rid for m in coalescer.poll()] == ["2"]
+
+    def test__schedules_pass_through(self) -> None:
+
+        coalescer = Coalescer()
+        schedule = message("1", 5, location("CRDFCEN", "16:53", time_type=TimeType.SCHEDULED))
+
+        emitted = coalescer.add([message("1", 0, location("CRDFCEN", "16:57")), schedule])
+
+        assert emitted == [message("1", 0, location("CRDFCEN", "16:57")), schedule]
+        assert coalescer.pending == 0
+
+    def test__loading_passes_through(self) -> None:
+
+        coalescer = Coalescer()
+        loaded = FormattedMessage(
+            ServiceUpdate("1", "", datetime(2025, 11, 1, 16, 55, 1), True, "", "", None),
+            loading=[LoadingUpdate("ROMFORD", 1, 3)],
+        )
+
+        assert coalescer.add([message("1", 0, location("CRDFCEN", "16:57")), loaded]) == [loaded]
+
+        coalescer.add([message("1", 2, location("CRDFCEN", "16:58"))])
+        merged = coalescer.flush()[0]
+
+        # The forecast header is kept, not the LO one with no uid or toc
+        assert merged == message("1", 2, location("CRDFCEN", "16:58"))
+        assert merged.loading is None
+
+    def test__acks_held_until_emitted(self) -> None:
+
+        clock = Clock()
+        coalescer = Coalescer(window_secs=2, clock=clock)
+        acked: list[str] = []
+
+        emitted = coalescer.add([message("1", 0, location("CRDFCEN", "16:57"))], [lambda: acked.append("first")])
+        assert emitted.acks == []
+
+        clock.now = 1
+        emitted = coalescer.add(
+            [message("1", 1, location("CRDFCEN", "16:58")), message("2", 1, location("CRDFCEN", "16:57"))],
+            [lambda: acked.append("second")],
+        )
+        assert emitted.acks == []
+
+        clock.now = 2
+        emitted = coalescer.poll()
+        emitted.acknowledge()
+
+        assert [m.service.rid for m in emitted] == ["1"]
+        assert acked == ["first"]
+
+        # Only once both services the second add went into have been emitted is it acknowledged
+        clock.now = 3
+        coalescer.poll().acknowledge()
+
+        assert acked == ["first", "second"]
+
+    def test__acks_released_with_pass_through(self) -> None:
+
+        coalescer = Coalescer()
+        acked: list[str] = []
+        schedule = message("1", 5, location("CRDFCEN", "16:53", time_type=TimeType.SCHEDULED))
+
+        emitted = coalescer.add([message("1", 0, location("CRDFCEN", "16:57")), schedule], [lambda: acked.append("1")])
+        emitted.acknowledge()
+
+        assert len(emitted) == 2
+        assert acked == ["1"]
@@ -3,9 +3,12 @@ from datetime import datetime
 import pytest
 
 from models.common import (
+    FormattedMessage,
     InvalidLocationTypeKey,
+    LoadingUpdate,
     LocationType,
     LocationUpdate,
+    MessageBatch,
     MessageType,
     NoValidMessageTypeFound,
     ServiceUpdate,
@@ -115,4 +118,62 @@ class TestLocationUpdate:
             cancelled=True,
             avg_loading=100,
         )
-        assert location.to_dict() == {"tpl": "tpl", "type": "ARR", "time_type": "ACT", "time": "11:00:00", "length": 4, "cancelled": True, "avgLoading": 100}
\ No newline at end of file
+        assert location.to_dict() == {"tpl": "tpl", "type": "ARR", "time_type": "ACT", "time": "11:00:00", "length": 4, "cancelled": True, "avgLoading": 100}
+
+    def test__to_dict_resolved(self) -> None:
+
+        location = LocationUpdate(
+            tpl="tpl",
+            type=LocationType.ARR,
+            time_type=TimeType.ACTUAL,
+            time=datetime(year=2024, month=6, day=26, hour=23, minute=59, second=30),
+            length=None,
+            cancelled=False,
+            avg_loading=None,
+        )
+
+        assert location.to_dict()["time"] == "2024-06-26T23:59:30"
+
+    def test__compact(self) -> None:
+
+        first = LocationUpdate("".join(["GL", "GC"]), LocationType.ARR, TimeType.SCHEDULED, datetime(2024, 6, 26, 0, 29), None, False, None)
+        second = LocationUpdate("".join(["GL", "GC"]), LocationType.ARR, TimeType.SCHEDULED, datetime(2024, 6, 26, 0, 29), None, False, None)
+
+        assert not hasattr(first, "__dict__")
+        assert first.tpl is second.tpl
+        assert first.time == datetime(2024, 6, 26, 0, 29)
+        assert first == second
+
+
+class TestMessageBatch:
+
+    def test__create(self) -> None:
+
+        ts = datetime(2024, 8, 11)
+        messages = [
+            FormattedMessage(
+                service=ServiceUpdate("rid1", "uid1", ts, True, "SR", "1A01", None),
+                locations=[
+                    LocationUpdate("GLGC", LocationType.DEP, TimeType.SCHEDULED, datetime(1900, 1, 1, 10), None, False, 3),
+                    LocationUpdate("EDB", LocationType.ARR, TimeType.SCHEDULED, datetime(1900, 1, 1, 11, 0, 30), None, True, None),
+                ],
+            ),
+            FormattedMessage(
+                service=ServiceUpdate("rid2", "", ts, False, "EDB", "", None),
+                loading=[LoadingUpdate("EDB", 1, 40)],
+            ),
+        ]
+
+        batch = MessageBatch.create(messages)
+
+        assert batch.services.rid == ["rid1", "rid2"]
+        assert batch.services.toc == ["SR", "EDB"]
+        assert len(batch.locations) == 2
+        assert batch.locations.rid == ["rid1", "rid1"]
+        assert batch.locations.type == ["DEP", "ARR"]
+        assert batch.locations.time_type == ["SCHED", "SCHED"]
+        assert list(batch.locations.time) == [36000, 39630]
+        assert batch.locations.cancelled == [False, True]
+        assert batch.locations.avg_loading == [3, None]
+        assert batch.loading.rid == ["rid2"]
+        assert list(batch.loading.loading) == [40]
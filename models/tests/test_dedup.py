@@ -0,0 +1,90 @@
+from datetime import datetime
+
+from models.common import FormattedMessage, LocationType, LocationUpdate, ServiceUpdate, TimeType
+from models.dedup import BloomFilter, Deduplicator, dedup_key
+
+TS = datetime(2025, 11, 1, 16, 55, 17)
+
+
+class Clock:
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def create_message(rid: str = "202511017156103", ts: datetime = TS, et: str = "16:57") -> FormattedMessage:
+
+    service = ServiceUpdate(rid, "G56103", ts, True, "AW", "2W20", None)
+    time = datetime.strptime(f"2025-11-01 {et}", "%Y-%m-%d %H:%M")
+    location = LocationUpdate("CRDFCEN", LocationType.DEP, TimeType.ESTIMATED, time, 3, False, None)
+
+    return FormattedMessage(service, [location])
+
+
+class TestDedupKey:
+
+    def test__equal_for_redelivery(self) -> None:
+
+        assert dedup_key(create_message()) == dedup_key(create_message())
+
+    def test__differs_by_content(self) -> None:
+
+        assert dedup_key(create_message(et="16:57")) != dedup_key(create_message(et="16:58"))
+        assert dedup_key(create_message(rid="1")) != dedup_key(create_message(rid="2"))
+
+
+class TestBloomFilter:
+
+    def test(self) -> None:
+
+        bloom = BloomFilter(1000, 1e-6)
+        digests = [dedup_key(create_message(rid=str(rid)))[2] for rid in range(1000)]
+
+        for digest in digests[:500]:
+            bloom.add(digest)
+
+        assert all(digest in bloom for digest in digests[:500])
+        assert not any(digest in bloom for digest in digests[500:])
+
+
+class TestDeduplicator:
+
+    def test__drops_redelivery(self) -> None:
+
+        deduplicator = Deduplicator()
+
+        assert deduplicator([create_message(), create_message(et="16:58")]) == [
+            create_message(),
+            create_message(et="16:58"),
+        ]
+        assert deduplicator([create_message(), create_message(rid="2")]) == [create_message(rid="2")]
+        assert deduplicator.stats.dropped == 1
+        assert deduplicator.stats.seen == 4
+
+    def test__beyond_exact_window(self) -> None:
+
+        deduplicator = Deduplicator(max_entries=1)
+
+        assert not deduplicator.is_duplicate(create_message(rid="1"))
+        assert not deduplicator.is_duplicate(create_message(rid="2"))
+        assert deduplicator.is_duplicate(create_message(rid="1"))
+        assert deduplicator.stats.dropped_approximate == 1
+
+    def test__expires(self) -> None:
+
+        clock = Clock()
+        deduplicator = Deduplicator(window_secs=60, clock=clock)
+
+        assert not deduplicator.is_duplicate(create_message())
+
+        clock.now = 40
+        assert deduplicator.is_duplicate(create_message())
+
+        # Rotated out of both filter generations and the exact set
+        clock.now = 70
+        deduplicator.is_duplicate(create_message(rid="2"))
+        clock.now = 101
+        assert not deduplicator.is_duplicate(create_message())
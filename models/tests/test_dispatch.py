@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from models import kafka
+from models.common import InvalidServiceUpdate, MessageType
+from models.dispatch import UpdateDispatcher
+from models.lo import LOParser
+from models.schedule import ScheduleParser
+from models.ts import TSParser
+
+
+def load(path: str) -> dict:
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+class TestUpdateDispatcher:
+
+    def test__kafka(self) -> None:
+
+        sc = load("tests/fixtures/kafka/sc.json")
+        ts = load("tests/fixtures/kafka/ts.json")
+        lo = load("tests/fixtures/kafka/lo.json")
+
+        combined = dict(sc)
+        combined["uR"] = {
+            **sc["uR"],
+            "association": {"tiploc": "GLGC", "category": "JJ"},
+            "TS": ts["uR"]["TS"],
+            "formationLoading": lo["uR"]["formationLoading"],
+        }
+
+        dispatcher = UpdateDispatcher(
+            {MessageType.SC: kafka.ScheduleParser(), MessageType.TS: kafka.TSParser(), MessageType.LO: kafka.LOParser()}
+        )
+        messages = dispatcher.dispatch(combined)
+
+        rids = [message.service.rid for message in messages]
+        expected = [
+            *[message.service.rid for message in kafka.ScheduleParser().parse(sc)],
+            *[message.service.rid for message in kafka.TSParser().parse(ts)],
+            *[message.service.rid for message in kafka.LOParser().parse(lo)],
+        ]
+
+        assert rids == expected
+        assert [message.locations for message in messages[:1]] == [kafka.ScheduleParser().parse(sc)[0].locations]
+
+    def test__xml(self) -> None:
+
+        sc = load("tests/fixtures/sc/darwin_1.json")
+        ts = load("tests/fixtures/ts/ts_full.json")
+        lo = load("tests/fixtures/lo/lo_full.json")
+
+        combined = {"Pport": {**ts["Pport"], "uR": {**ts["Pport"]["uR"], "schedule": sc["Pport"]["uR"]["schedule"]}}}
+        combined["Pport"]["uR"]["formationLoading"] = lo["Pport"]["uR"]["formationLoading"]
+
+        dispatcher = UpdateDispatcher(
+            {MessageType.SC: ScheduleParser(), MessageType.TS: TSParser(), MessageType.LO: LOParser()}, xml=True
+        )
+        messages = dispatcher.dispatch(combined)
+
+        assert len(messages) == 1 + len(ScheduleParser().parse(sc)) + len(LOParser().parse(lo))
+        assert messages[0] == TSParser().parse(ts)[0]
+
+    def test__unregistered_elements_skipped(self) -> None:
+
+        dispatcher = UpdateDispatcher({MessageType.TS: kafka.TSParser()})
+
+        assert dispatcher.dispatch(load("tests/fixtures/kafka/sc.json")) == []
+
+    def test__missing_ur(self) -> None:
+
+        with pytest.raises(InvalidServiceUpdate, match="Cannot extract uR"):
+            UpdateDispatcher({}).dispatch({"ts": "2025-11-01T16:55:16.897896+00:00"})
@@ -0,0 +1,78 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from models.common import FormattedMessage, LoadingUpdate, ServiceUpdate
+from models.kafka.lo import InvalidServiceUpdate, LoadingParser, LOParser, ServiceParser
+
+
+class TestServiceParser:
+
+    def test(self) -> None:
+
+        body = {"fid": "202511018006949-001", "rid": "202511018006949", "tpl": "ROMFORD"}
+        ts = datetime.now()
+
+        assert ServiceParser.parse(body, ts) == ServiceUpdate(
+            rid="202511018006949", uid="", ts=ts, passenger=False, toc="", train_id="", cancel_reason=None
+        )
+
+    def test__missing_rid(self) -> None:
+
+        with pytest.raises(InvalidServiceUpdate, match="Cannot extract rid from"):
+            ServiceParser.parse({"fid": "202511018006949-001"}, datetime.now())
+
+
+class TestLoadingParser:
+
+    def test__single_coach(self) -> None:
+
+        body = {"loading": {"coachNumber": "1", "": "3"}}
+
+        assert LoadingParser.parse(body, "ROMFORD") == [LoadingUpdate(tpl="ROMFORD", coach_number=1, loading=3)]
+
+    def test__invalid_entries_skipped(self) -> None:
+
+        body = {"loading": [{"coachNumber": "invalid", "": "3"}, {"coachNumber": "2"}, {"coachNumber": "3", "": "14"}]}
+
+        assert LoadingParser.parse(body, "ROMFORD") == [LoadingUpdate(tpl="ROMFORD", coach_number=3, loading=14)]
+
+    def test__no_loading_data(self) -> None:
+
+        assert LoadingParser.parse({"rid": "202511018006949"}, "ROMFORD") == []
+
+
+class TestLOParser:
+
+    def test__full_message(self) -> None:
+
+        with open("tests/fixtures/kafka/lo.json", "r") as f:
+            data = json.load(f)
+
+        result = LOParser().parse(data)
+        ts = datetime(2025, 11, 1, 16, 25, 40, 406979, tzinfo=timezone(timedelta(seconds=0)))
+
+        assert result == [
+            FormattedMessage(
+                service=ServiceUpdate(
+                    rid="202511018006949", uid="", ts=ts, passenger=False, toc="", train_id="", cancel_reason=None
+                ),
+                loading=[
+                    LoadingUpdate(tpl="ROMFORD", coach_number=1, loading=3),
+                    LoadingUpdate(tpl="ROMFORD", coach_number=2, loading=14),
+                    LoadingUpdate(tpl="ROMFORD", coach_number=3, loading=14),
+                    LoadingUpdate(tpl="ROMFORD", coach_number=4, loading=13),
+                    LoadingUpdate(tpl="ROMFORD", coach_number=5, loading=5),
+                    LoadingUpdate(tpl="ROMFORD", coach_number=6, loading=14),
+                    LoadingUpdate(tpl="ROMFORD", coach_number=7, loading=9),
+                    LoadingUpdate(tpl="ROMFORD", coach_number=8, loading=8),
+                    LoadingUpdate(tpl="ROMFORD", coach_number=9, loading=10),
+                ],
+            )
+        ]
+
+    def test__missing_ts(self) -> None:
+
+        with pytest.raises(InvalidServiceUpdate, match="Cannot extract ts from"):
+            LOParser().parse({"uR": {"formationLoading": {}}})
@@ -0,0 +1,183 @@
+import json
+from dataclasses import fields
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from models.common import (
+    LazyFormattedMessage,
+    LocationColumns,
+    LocationType,
+    LocationUpdate,
+    MessageBatch,
+    ServiceUpdate,
+    TimeType,
+)
+from models.kafka.schedule import (
+    InvalidLocation,
+    InvalidServiceUpdate,
+    LocationsParser,
+    ScheduleParser,
+    ServiceParser,
+)
+
+
+class TestServiceParser:
+
+    def test(self) -> None:
+
+        data = {"rid": "202511018750847", "uid": "W50847", "trainId": "2W20", "toc": "NT", "cancelReason": "832"}
+        ts = datetime.now()
+
+        assert ServiceParser.parse(data, ts) == ServiceUpdate(
+            rid="202511018750847", uid="W50847", ts=ts, passenger=True, toc="NT", train_id="2W20", cancel_reason="832"
+        )
+
+    def test__cancel_reason_as_dict(self) -> None:
+
+        data = {
+            "rid": "202511018750847",
+            "uid": "W50847",
+            "trainId": "2W20",
+            "toc": "NT",
+            "isPassengerSvc": "false",
+            "cancelReason": {"tiploc": "BOLTON", "": "832"},
+        }
+        ts = datetime.now()
+
+        assert ServiceParser.parse(data, ts) == ServiceUpdate(
+            rid="202511018750847", uid="W50847", ts=ts, passenger=False, toc="NT", train_id="2W20", cancel_reason="832"
+        )
+
+    @pytest.mark.parametrize(
+        "input,error_msg", [({"rid": "abc"}, "Cannot extract uid from"), ({"uid": "abc"}, "Cannot extract rid from")]
+    )
+    def test__errors(self, input: dict, error_msg: str) -> None:
+
+        with pytest.raises(InvalidServiceUpdate, match=error_msg):
+            ServiceParser.parse(input, datetime.now())
+
+
+class TestLocationsParser:
+
+    @pytest.mark.parametrize(
+        "input,expected",
+        [
+            (
+                {"tpl": "MNCROXR", "act": "TB", "ptd": "15:27", "wtd": "15:27", "avgLoading": "12"},
+                [LocationUpdate("MNCROXR", LocationType.DEP, TimeType.SCHEDULED, datetime(1900, 1, 1, 15, 27), None, False, 12)],
+            ),
+            (
+                {"tpl": "MNCRDGT", "act": "T ", "pta": "15:29", "ptd": "15:33", "wta": "15:28:30", "wtd": "15:33", "can": "true"},
+                [
+                    LocationUpdate("MNCRDGT", LocationType.ARR, TimeType.SCHEDULED, datetime(1900, 1, 1, 15, 28, 30), None, True, None),
+                    LocationUpdate("MNCRDGT", LocationType.DEP, TimeType.SCHEDULED, datetime(1900, 1, 1, 15, 33), None, True, None),
+                ],
+            ),
+            (
+                {"tpl": "WATSTJN", "wtp": "15:34"},
+                [LocationUpdate("WATSTJN", LocationType.PASS, TimeType.SCHEDULED, datetime(1900, 1, 1, 15, 34), None, False, None)],
+            ),
+        ],
+    )
+    def test(self, input: dict, expected: list[LocationUpdate]) -> None:
+
+        assert LocationsParser.parse(input) == expected
+
+    def test__no_tpl(self) -> None:
+
+        with pytest.raises(InvalidLocation, match="No tpl found on"):
+            LocationsParser.parse({"act": "T ", "pta": "00:04"})
+
+    def test__no_working_times(self) -> None:
+
+        with pytest.raises(InvalidLocation):
+            LocationsParser.parse({"tpl": "THAL", "act": "T ", "pta": "00:04", "ptd": "00:04"})
+
+
+class TestScheduleParser:
+
+    def test(self) -> None:
+
+        with open("tests/fixtures/kafka/sc.json", "r") as f:
+            data = json.load(f)
+
+        msgs = ScheduleParser().parse(data)
+        ts = datetime(2025, 11, 1, 16, 55, 16, 897896, tzinfo=timezone(timedelta(seconds=0)))
+
+        assert len(msgs) == 1
+        assert msgs[0].service == ServiceUpdate(
+            rid="202511018750847",
+            uid="W50847",
+            ts=ts,
+            passenger=True,
+            toc="NT",
+            train_id="2W20",
+            cancel_reason=None,
+            ssd=date(2025, 11, 1),
+        )
+        assert len(msgs[0].locations) == 31
+        assert msgs[0].locations[:2] == [
+            LocationUpdate("SOUTHPT", LocationType.ARR, TimeType.SCHEDULED, datetime(1900, 1, 1, 16, 43), None, False, None),
+            LocationUpdate("MNCROXR", LocationType.DEP, TimeType.SCHEDULED, datetime(1900, 1, 1, 15, 27), None, False, None),
+        ]
+        assert msgs[0].locations[-1] == LocationUpdate(
+            "CRWNSTJ", LocationType.PASS, TimeType.SCHEDULED, datetime(1900, 1, 1, 15, 59, 30), None, False, None
+        )
+
+    def test__missing_schedule(self) -> None:
+
+        with pytest.raises(InvalidServiceUpdate, match="Cannot extract uR or schedule from"):
+            ScheduleParser().parse({"ts": "2025-11-01T16:55:16.897896+00:00", "uR": {"association": {}}})
+
+    def test__lazy(self) -> None:
+
+        with open("tests/fixtures/kafka/sc.json", "r") as f:
+            data = json.load(f)
+
+        [msg] = ScheduleParser(lazy=True).parse(data)
+
+        assert isinstance(msg, LazyFormattedMessage)
+        assert msg._decode_locations is not None
+        assert msg == ScheduleParser().parse(data)[0]
+        assert msg._decode_locations is None
+
+    def test__lazy_invalid_location(self) -> None:
+
+        with open("tests/fixtures/kafka/sc.json", "r") as f:
+            data = json.load(f)
+
+        del data["uR"]["schedule"]["OR"]["tpl"]
+        [msg] = ScheduleParser(lazy=True).parse(data)
+
+        with pytest.raises(InvalidLocation):
+            msg.locations
+
+    @pytest.mark.parametrize("toc,expected", [("NT", 1), ("SR", 0)])
+    def test__predicates(self, toc: str, expected: int) -> None:
+
+        with open("tests/fixtures/kafka/sc.json", "r") as f:
+            data = json.load(f)
+
+        msgs = ScheduleParser(predicates=[lambda service: service.passenger, lambda service: service.toc == toc]).parse(data)
+
+        assert len(msgs) == expected
+
+    @pytest.mark.parametrize("resolve_dates", [False, True])
+    def test__parse_batch(self, resolve_dates: bool) -> None:
+
+        with open("tests/fixtures/kafka/sc.json", "r") as f:
+            data = json.load(f)
+
+        parser = ScheduleParser(resolve_dates=resolve_dates)
+        batch = parser.parse_batch([data, data])
+        expected = MessageBatch.create(parser.parse(data) * 2)
+
+        assert batch.services == expected.services
+        assert len(batch.locations) == len(expected.locations) == 62
+
+        # Rows are grouped differently from parse(), so compare them as sets
+        columns = [getattr(batch.locations, name.name) for name in fields(LocationColumns)]
+        expected_columns = [getattr(expected.locations, name.name) for name in fields(LocationColumns)]
+
+        assert sorted(zip(*columns)) == sorted(zip(*expected_columns))
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from models.common import InvalidLocation, LoadingUpdate
+from models.kafka.lo import LOParser
+from models.kafka.schedule import ScheduleParser
+from models.kafka.schema import InvalidPportMessage, PportDecoder
+from models.kafka.ts import TSParser
+
+
+class TestPportDecoder:
+
+    @pytest.mark.parametrize(
+        "fixture,parser",
+        [
+            ("kafka/ts.json", TSParser()),
+            ("kafka/sc.json", ScheduleParser()),
+            ("kafka/lo.json", LOParser()),
+        ],
+    )
+    def test__matches_dict_parsers(self, fixture: str, parser) -> None:
+
+        with open(f"tests/fixtures/{fixture}", "rb") as f:
+            payload = f.read()
+
+        assert PportDecoder().decode(payload) == parser.parse(json.loads(payload))
+
+    def test__schedule_flags(self) -> None:
+
+        payload = json.dumps(
+            {
+                "ts": "2025-11-01T16:55:16.897896+00:00",
+                "uR": {
+                    "schedule": {
+                        "rid": "1",
+                        "uid": "A",
+                        "trainId": "2W20",
+                        "toc": "NT",
+                        "isPassengerSvc": "false",
+                        "cancelReason": {"tiploc": "BOLTON", "": "832"},
+                        "OR": {"tpl": "MNCROXR", "wtd": "15:27", "can": "true", "avgLoading": "12"},
+                    }
+                },
+            }
+        )
+
+        [message] = PportDecoder().decode(payload)
+
+        assert message.service.passenger is False
+        assert message.service.cancel_reason == "832"
+        assert [(loc.cancelled, loc.avg_loading) for loc in message.locations] == [(True, 12)]
+
+    def test__multiple_elements(self) -> None:
+
+        payload = json.dumps(
+            {
+                "ts": "2025-11-01T16:55:16.897896+00:00",
+                "uR": {
+                    "TS": {"rid": "1", "uid": "A", "Location": {"tpl": "TPL1", "arr": {"at": "10:00"}}},
+                    "formationLoading": {"rid": "2", "tpl": "TPL2", "loading": [{"coachNumber": "1", "": "26"}]},
+                },
+            }
+        )
+
+        messages = PportDecoder().decode(payload)
+
+        assert [msg.service.rid for msg in messages] == ["1", "2"]
+        assert messages[1].loading == [LoadingUpdate(tpl="TPL2", coach_number=1, loading=26)]
+
+    @pytest.mark.parametrize(
+        "payload,error",
+        [
+            ('{"uR": {}}', InvalidPportMessage),
+            ('{"ts": "2025-11-01T16:55:16+00:00", "uR": {"TS": {"uid": "A"}}}', InvalidPportMessage),
+            ('{"ts": "2025-11-01T16:55:16+00:00", "uR": {"TS": {"rid": "1", "uid": "A"}}}', InvalidLocation),
+            ("not json", InvalidPportMessage),
+        ],
+    )
+    def test__errors(self, payload: str, error: type) -> None:
+
+        with pytest.raises(error):
+            PportDecoder().decode(payload)
@@ -0,0 +1,158 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from models.common import (
+    FormattedMessage,
+    LocationType,
+    LocationUpdate,
+    MessageBatch,
+    ServiceUpdate,
+    TimeType,
+)
+from models.kafka.ts import (
+    ForecastParser,
+    InvalidLocation,
+    InvalidServiceUpdate,
+    LocationsParser,
+    ServiceParser,
+    TSParser,
+)
+
+
+class TestServiceParser:
+
+    def test(self) -> None:
+
+        body = {"rid": "202511017156103", "uid": "G56103", "ssd": "2025-11-01", "toc": "AW"}
+        ts = datetime.now()
+
+        assert ServiceParser.parse(body, ts) == ServiceUpdate(
+            "202511017156103", "G56103", ts, False, "AW", train_id="", cancel_reason=None
+        )
+
+    @pytest.mark.parametrize("input", [{"rid": "202511017156103"}, {"uid": "G56103"}])
+    def test_keyerror(self, input: dict) -> None:
+
+        with pytest.raises(InvalidServiceUpdate):
+            ServiceParser.parse(input, datetime.now())
+
+
+class TestForecastParser:
+
+    def test(self) -> None:
+
+        body = {"tpl": "CWMBRAN", "arr": {"et": "17:18", "wet": "17:19", "at": "17:20:30", "src": "Darwin"}, "length": "3"}
+
+        assert ForecastParser.parse(body, "CWMBRAN", "arr", LocationType.ARR) == [
+            LocationUpdate("CWMBRAN", LocationType.ARR, TimeType.ESTIMATED, datetime(1900, 1, 1, 17, 18), 3, False, None),
+            LocationUpdate("CWMBRAN", LocationType.ARR, TimeType.ACTUAL, datetime(1900, 1, 1, 17, 20, 30), 3, False, None),
+        ]
+
+    def test__missing_key(self) -> None:
+
+        assert ForecastParser.parse({"tpl": "CWMBRAN"}, "CWMBRAN", "dep", LocationType.DEP) == []
+
+
+class TestLocationsParser:
+
+    def test__dict_case(self) -> None:
+
+        body = {"rid": "1", "uid": "A", "Location": {"tpl": "CRDFCEN", "dep": {"et": "16:57", "src": "TD"}}}
+
+        assert LocationsParser.parse(body) == [
+            LocationUpdate("CRDFCEN", LocationType.DEP, TimeType.ESTIMATED, datetime(1900, 1, 1, 16, 57), None, False, None)
+        ]
+
+    def test__no_tpl(self) -> None:
+
+        with pytest.raises(InvalidLocation, match="No tpl found on"):
+            LocationsParser.parse({"Location": {"dep": {"et": "16:57"}}})
+
+    def test__passing_points_only(self) -> None:
+
+        with pytest.raises(InvalidLocation, match="No LocationUpdates could be parsed"):
+            LocationsParser.parse({"Location": {"tpl": "LNGDYKJ", "wtp": "16:55:30", "pass": {"et": "16:59"}}})
+
+
+class TestTSParser:
+
+    def test(self) -> None:
+
+        with open("tests/fixtures/kafka/ts.json", "r") as f:
+            data = json.load(f)
+
+        msgs = TSParser().parse(data)
+        ts = datetime(2025, 11, 1, 16, 55, 17, 776923, tzinfo=timezone(timedelta(seconds=0)))
+
+        assert len(msgs) == 1
+        assert msgs[0].service == ServiceUpdate(
+            rid="202511017156103", uid="G56103", ts=ts, passenger=False, toc="", train_id="", cancel_reason=None
+        )
+        assert len(msgs[0].locations) == 11
+        assert msgs[0].locations[:3] == [
+            LocationUpdate("CRDFCEN", LocationType.DEP, TimeType.ESTIMATED, datetime(1900, 1, 1, 16, 57), 3, False, None),
+            LocationUpdate("NWPTRTG", LocationType.ARR, TimeType.ESTIMATED, datetime(1900, 1, 1, 17, 8), 3, False, None),
+            LocationUpdate("NWPTRTG", LocationType.DEP, TimeType.ESTIMATED, datetime(1900, 1, 1, 17, 9), 3, False, None),
+        ]
+
+    def test__missing_ts(self) -> None:
+
+        with pytest.raises(InvalidServiceUpdate, match="Cannot extract ts from"):
+            TSParser().parse({"uR": {"TS": {}}})
+
+    def test__missing_ts_element(self) -> None:
+
+        with pytest.raises(InvalidServiceUpdate, match="Cannot extract uR or TS from"):
+            TSParser().parse({"ts": "2025-11-01T16:55:17.776923+00:00", "uR": {}})
+
+    def test__list_case(self) -> None:
+
+        data = {
+            "ts": "2025-11-01T16:55:17.776923+00:00",
+            "uR": {
+                "TS": [
+                    {"rid": "1", "uid": "A", "Location": {"tpl": "TPL1", "arr": {"at": "10:00"}}},
+                    {"rid": "2", "uid": "B", "Location": {"tpl": "TPL2", "dep": {"et": "11:00"}}},
+                ]
+            },
+        }
+
+        msgs = TSParser().parse(data)
+
+        assert [type(msg) for msg in msgs] == [FormattedMessage, FormattedMessage]
+        assert [msg.service.rid for msg in msgs] == ["1", "2"]
+
+    def test__parse_batch(self) -> None:
+
+        with open("tests/fixtures/kafka/ts.json", "r") as f:
+            data = json.load(f)
+
+        messages = TSParser().parse(data)
+        batch = TSParser().parse_batch([data, data])
+
+        assert len(batch.services) == 2 * len(messages)
+        assert len(batch.locations) == 2 * len(messages[0].locations)
+        assert batch.locations.tpl[0] == messages[0].locations[0].tpl
+        assert batch.locations.time[0] == messages[0].locations[0].seconds
+
+    @pytest.mark.parametrize("resolve_dates", [False, True])
+    def test__parse_batch_matches_parse(self, resolve_dates: bool) -> None:
+
+        with open("tests/fixtures/kafka/ts.json", "r") as f:
+            data = json.load(f)
+
+        parser = TSParser(resolve_dates=resolve_dates)
+
+        assert parser.parse_batch([data]) == MessageBatch.create(parser.parse(data))
+
+    def test__parse_batch_predicates(self) -> None:
+
+        with open("tests/fixtures/kafka/ts.json", "r") as f:
+            data = json.load(f)
+
+        batch = TSParser(predicates=[lambda service: False]).parse_batch([data])
+
+        assert len(batch.services) == 0
+        assert len(batch.locations) == 0
@@ -32,7 +32,7 @@ class TestServiceParser:
             uid="",
             ts=ts,
             passenger=False,
-            toc="FRSTGT",
+            toc="",
             train_id="",
             cancel_reason=None,
         )
@@ -109,7 +109,7 @@ class TestLOParser:
                 uid="",
                 ts=ts,
                 passenger=False,
-                toc="FRSTGT",
+                toc="",
                 train_id="",
                 cancel_reason=None,
             ),
@@ -1,5 +1,5 @@
 import json
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 
 import pytest
 
@@ -128,7 +128,14 @@ class TestScheduleParser:
         assert msg == [
             FormattedMessage(
                 service=ServiceUpdate(
-                    rid="202406258080789", uid="P80789", ts=ts, passenger=True, toc="SR", train_id="2J11", cancel_reason=None
+                    rid="202406258080789",
+                    uid="P80789",
+                    ts=ts,
+                    passenger=True,
+                    toc="SR",
+                    train_id="2J11",
+                    cancel_reason=None,
+                    ssd=date(2024, 6, 25),
                 ),
                 locations=[
                     LocationUpdate(
@@ -342,7 +349,14 @@ class TestScheduleParser:
             ),
             FormattedMessage(
                 service=ServiceUpdate(
-                    rid="202406268083879", uid="P83879", ts=ts, passenger=False, toc="SR", train_id="5J11", cancel_reason=None
+                    rid="202406268083879",
+                    uid="P83879",
+                    ts=ts,
+                    passenger=False,
+                    toc="SR",
+                    train_id="5J11",
+                    cancel_reason=None,
+                    ssd=date(2024, 6, 26),
                 ),
                 locations=[
                     LocationUpdate(
@@ -386,6 +400,7 @@ class TestScheduleParser:
                       toc='CH',
                       train_id='2V61',
                       cancel_reason='832',
+                      ssd=date(2025, 9, 8),
                   ),
           locations=[
                         LocationUpdate(
@@ -435,4 +450,18 @@ class TestScheduleParser:
                         ),
                     ],
       ),
-  ]
\ No newline at end of file
+  ]
+
+    def test__resolve_dates(self) -> None:
+
+        with open("tests/fixtures/sc/darwin_1.json", "r") as f:
+            data = json.load(f)
+
+        msg = ScheduleParser(resolve_dates=True).parse(data)[0]
+
+        times = {(loc.tpl, loc.type): loc.time for loc in msg.locations}
+
+        assert times[("EKILBRD", LocationType.DEP)] == datetime(2024, 6, 25, 23, 57)
+        assert times[("HARMYRL", LocationType.PASS)] == datetime(2024, 6, 25, 23, 59, 30)
+        assert times[("HARMYRS", LocationType.ARR)] == datetime(2024, 6, 26, 0, 1)
+        assert times[("GLGC", LocationType.ARR)] == datetime(2024, 6, 26, 0, 29)
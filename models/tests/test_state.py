@@ -0,0 +1,158 @@
+import copy
+import json
+from datetime import datetime, timedelta, timezone
+
+from models import kafka
+from models.common import FormattedMessage, LoadingUpdate, LocationType, LocationUpdate, ServiceUpdate, TimeType
+from models.state import ServiceStateStore
+
+RID = "202511018750847"
+
+
+def load(path: str) -> dict:
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def schedule() -> list[FormattedMessage]:
+    return kafka.ScheduleParser().parse(load("tests/fixtures/kafka/sc.json"))
+
+
+def forecast(location: dict, ts: str = "2025-11-01T16:56:00+00:00") -> list[FormattedMessage]:
+
+    data = load("tests/fixtures/kafka/ts.json")
+    data["ts"] = ts
+    data["uR"]["TS"]["rid"] = RID
+    data["uR"]["TS"]["Location"] = [location]
+
+    return kafka.TSParser().parse(data)
+
+
+def at(time: str) -> datetime:
+    return datetime.strptime(f"1900-01-01 {time}", "%Y-%m-%d %H:%M")
+
+
+class TestServiceStateStore:
+
+    def test__schedule(self) -> None:
+
+        store = ServiceStateStore()
+        store.apply(schedule())
+
+        state = store.get(RID)
+        points = store.calling_points(RID)
+
+        assert state is not None and state.scheduled
+        assert state.service.toc == "NT"
+        assert (points[0].tpl, points[0].type) == ("MNCROXR", LocationType.DEP)
+        assert (points[1].tpl, points[1].type) == ("MNCRDGT", LocationType.ARR)
+        assert points[-1].tpl == "SOUTHPT"
+        assert state.last_reported is None
+
+    def test__forecasts_merge_onto_schedule(self) -> None:
+
+        store = ServiceStateStore()
+        store.apply(schedule())
+        store.apply(forecast({"tpl": "MNCRDGT", "wta": "15:28:30", "arr": {"at": "15:30"}, "dep": {"et": "15:34"}}))
+
+        state = store.get(RID)
+        assert state is not None
+
+        arrival = state.calling_point("MNCRDGT", LocationType.ARR)
+        departure = state.calling_point("MNCRDGT", LocationType.DEP)
+
+        assert arrival is not None and departure is not None
+        assert arrival.scheduled == datetime(1900, 1, 1, 15, 28, 30)
+        assert arrival.actual == at("15:30")
+        assert departure.expected == at("15:34")
+        assert state.last_reported is arrival
+        assert state.service.toc == "NT"
+
+    def test__forecast_before_schedule(self) -> None:
+
+        store = ServiceStateStore()
+        store.apply(forecast({"tpl": "MNCRDGT", "wta": "15:28:30", "arr": {"et": "15:31"}}))
+
+        state = store.get(RID)
+        assert state is not None and not state.scheduled
+
+        store.apply(schedule())
+
+        arrival = state.calling_point("MNCRDGT", LocationType.ARR)
+        assert state.scheduled
+        assert arrival is not None and arrival.estimated == at("15:31")
+        assert len(state.calling_points) == len(schedule()[0].locations)
+
+    def test__loading(self) -> None:
+
+        store = ServiceStateStore()
+        service = ServiceUpdate(RID, "", datetime(2025, 11, 1, 16, 57, tzinfo=timezone.utc), False, "MNCRDGT", "", None)
+
+        store.apply(schedule())
+        loading = [LoadingUpdate("MNCRDGT", 1, 30), LoadingUpdate("MNCRDGT", 2, 4)]
+        store.apply([FormattedMessage(service, loading=loading)])
+        store.apply([FormattedMessage(service, loading=[LoadingUpdate("MNCRDGT", 1, 35)])])
+
+        state = store.get(RID)
+
+        assert state is not None
+        assert state.loading == {"MNCRDGT": {1: 35, 2: 4}}
+        assert state.service.toc == "NT"
+
+    def test__over_midnight(self) -> None:
+
+        ts = datetime(2025, 11, 1, 23, 0)
+        service = ServiceUpdate("1", "A", ts, True, "NT", "2W20", None)
+        locations = [
+            LocationUpdate("LATE", LocationType.ARR, TimeType.SCHEDULED, at("00:20"), None, False, None),
+            LocationUpdate("EARLY", LocationType.DEP, TimeType.SCHEDULED, at("23:40"), None, False, None),
+            LocationUpdate("MIDDLE", LocationType.PASS, TimeType.SCHEDULED, at("23:55"), None, False, None),
+        ]
+
+        store = ServiceStateStore()
+        store.apply([FormattedMessage(service, locations)])
+
+        assert [point.tpl for point in store.calling_points("1")] == ["EARLY", "MIDDLE", "LATE"]
+
+    def test__looping_service(self) -> None:
+
+        ts = datetime(2025, 11, 1, 9, 0)
+        service = ServiceUpdate("1", "A", ts, True, "NT", "2W20", None)
+        locations = [
+            LocationUpdate("LOOP", LocationType.DEP, TimeType.SCHEDULED, at("10:00"), None, False, None),
+            LocationUpdate("LOOP", LocationType.DEP, TimeType.SCHEDULED, at("11:00"), None, False, None),
+            LocationUpdate("MIDDLE", LocationType.PASS, TimeType.SCHEDULED, at("10:30"), None, False, None),
+        ]
+        early = LocationUpdate("LOOP", LocationType.DEP, TimeType.ESTIMATED, at("10:02"), None, False, None)
+        late = LocationUpdate("LOOP", LocationType.DEP, TimeType.ACTUAL, at("11:05"), None, False, None)
+
+        store = ServiceStateStore()
+        store.apply([FormattedMessage(service, [early])])
+        store.apply([FormattedMessage(service, locations)])
+        store.apply([FormattedMessage(service, [late])])
+
+        state = store.get("1")
+        assert state is not None
+
+        first = state.calling_point("LOOP", LocationType.DEP)
+        second = state.calling_point("LOOP", LocationType.DEP, occurrence=1)
+
+        assert [point.tpl for point in state.calling_points] == ["LOOP", "MIDDLE", "LOOP"]
+        assert first is not None and first.scheduled == at("10:00") and first.estimated == at("10:02")
+        assert second is not None and second.scheduled == at("11:00") and second.actual == at("11:05")
+        assert first.actual is None and second.estimated is None
+        assert state.last_reported is second
+
+    def test__expires_old_services(self) -> None:
+
+        store = ServiceStateStore(retain=timedelta(hours=2))
+        store.apply(schedule())
+
+        later = copy.deepcopy(schedule())
+        later[0].service.rid = "other"
+        later[0].service.ts += timedelta(hours=3)
+        store.apply(later)
+
+        assert RID not in store
+        assert "other" in store
+        assert store.stats.expired == 1
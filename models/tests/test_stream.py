@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from models.common import InvalidLocation, InvalidServiceUpdate, LoadingUpdate
+from models.lo import LOParser
+from models.schedule import ScheduleParser
+from models.stream import InvalidPportMessage, PportStreamDecoder
+from models.ts import TSParser
+
+
+class TestPportStreamDecoder:
+
+    @pytest.mark.parametrize(
+        "xml_fixture,json_fixture,parser",
+        [
+            ("xml/ts_full.xml", "ts/ts_full.json", TSParser()),
+            ("xml/sc_darwin_1.xml", "sc/darwin_1.json", ScheduleParser()),
+            ("xml/sc_darwin_cancel_w_loading.xml", "sc/darwin_cancel_w_loading.json", ScheduleParser()),
+            ("xml/lo_full.xml", "lo/lo_full.json", LOParser()),
+        ],
+    )
+    def test__matches_dict_parsers(self, xml_fixture: str, json_fixture: str, parser) -> None:
+
+        with open(f"tests/fixtures/{xml_fixture}", "rb") as f:
+            payload = f.read()
+
+        with open(f"tests/fixtures/{json_fixture}", "r") as f:
+            data = json.load(f)
+
+        assert PportStreamDecoder().decode(payload) == parser.parse(data)
+
+    def test__multiple_elements(self) -> None:
+
+        payload = (
+            '<Pport xmlns:ns5="ns5" xmlns:ns6="ns6" ts="2024-06-25T18:57:01.3811322+01:00"><uR>'
+            '<TS rid="1" uid="A"><ns5:Location tpl="TPL1"><ns5:arr et="17:37"/></ns5:Location></TS>'
+            '<formationLoading rid="2" tpl="TPL2"><ns6:loading coachNumber="1">26</ns6:loading></formationLoading>'
+            "</uR></Pport>"
+        )
+
+        messages = PportStreamDecoder().decode(payload)
+
+        assert [msg.service.rid for msg in messages] == ["1", "2"]
+        assert messages[1].loading == [LoadingUpdate(tpl="TPL2", coach_number=1, loading=26)]
+
+    def test__ignores_unknown_elements(self) -> None:
+
+        payload = '<Pport ts="2024-06-25T18:57:01+01:00"><uR><OW id="1"><Msg>Hello</Msg></OW></uR></Pport>'
+
+        assert PportStreamDecoder().decode(payload) == []
+
+    @pytest.mark.parametrize(
+        "payload,error",
+        [
+            ("<Pport><uR/></Pport>", InvalidServiceUpdate),
+            ('<Pport ts="2024-06-25T18:57:01+01:00"><uR><TS uid="A"/></uR></Pport>', InvalidServiceUpdate),
+            ('<Pport ts="2024-06-25T18:57:01+01:00"><uR><TS rid="1" uid="A"/></uR></Pport>', InvalidLocation),
+            ("<Pport", InvalidPportMessage),
+        ],
+    )
+    def test__errors(self, payload: str, error: type) -> None:
+
+        with pytest.raises(error):
+            PportStreamDecoder().decode(payload)
@@ -0,0 +1,95 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from models.times import InvalidTime, ServiceDayResolver, parse_seconds, parse_time
+
+
+class TestParseSeconds:
+
+    @pytest.mark.parametrize(
+        "input,expected", [("00:00", 0), ("17:03", 61380), ("15:28:30", 55710), ("23:59:59", 86399), ("08:15:07", 29707)]
+    )
+    def test(self, input: str, expected: int) -> None:
+
+        assert parse_seconds(input) == expected
+
+    @pytest.mark.parametrize("input", ["", "24:00", "17:60", "1703", "17:03:", "17:03:60", "17:03-30", None])
+    def test__invalid(self, input: str) -> None:
+
+        with pytest.raises(InvalidTime):
+            parse_seconds(input)
+
+
+class TestParseTime:
+
+    @pytest.mark.parametrize("input", ["00:00", "17:03", "17:03:00", "15:28:30", "08:15:07", "23:59:59"])
+    def test__matches_strptime(self, input: str) -> None:
+
+        raw_ts = input if len(input.split(":")) == 3 else f"{input}:00"
+
+        assert parse_time(input) == datetime.strptime(raw_ts, "%H:%M:%S")
+
+    def test__invalid(self) -> None:
+
+        with pytest.raises(InvalidTime):
+            parse_time("25:00")
+
+
+class TestServiceDayResolver:
+
+    def test__same_day(self) -> None:
+
+        resolver = ServiceDayResolver(date(2024, 6, 25))
+
+        assert [resolver.resolve(value) for value in ["15:27", "15:28:30", "16:43"]] == [
+            datetime(2024, 6, 25, 15, 27),
+            datetime(2024, 6, 25, 15, 28, 30),
+            datetime(2024, 6, 25, 16, 43),
+        ]
+
+    def test__past_midnight(self) -> None:
+
+        resolver = ServiceDayResolver(date(2024, 6, 25))
+        resolver.seed("23:57")
+
+        assert [resolver.resolve(value) for value in ["00:29", "23:59:30", "00:01"]] == [
+            datetime(2024, 6, 26, 0, 29),
+            datetime(2024, 6, 25, 23, 59, 30),
+            datetime(2024, 6, 26, 0, 1),
+        ]
+
+    def test__seeded_from_message_timestamp(self) -> None:
+
+        resolver = ServiceDayResolver(date(2024, 6, 25))
+        resolver.seed(datetime(2024, 6, 26, 0, 10, tzinfo=timezone(timedelta(hours=1))))
+
+        assert resolver.resolve("00:29") == datetime(2024, 6, 26, 0, 29)
+
+    def test__long_running_service(self) -> None:
+
+        resolver = ServiceDayResolver(date(2024, 6, 25))
+
+        assert [resolver.resolve(value) for value in ["06:00", "13:00", "20:30", "02:15"]] == [
+            datetime(2024, 6, 25, 6, 0),
+            datetime(2024, 6, 25, 13, 0),
+            datetime(2024, 6, 25, 20, 30),
+            datetime(2024, 6, 26, 2, 15),
+        ]
+
+    def test__fork(self) -> None:
+
+        resolver = ServiceDayResolver(date(2024, 6, 25))
+        resolver.seed("23:57")
+
+        fork = resolver.fork()
+        fork.resolve("00:30")
+
+        assert resolver.resolve("23:58") == datetime(2024, 6, 25, 23, 58)
+
+    def test__distant_seed_ignored(self) -> None:
+
+        resolver = ServiceDayResolver(date(2024, 7, 18))
+        resolver.seed(datetime(2024, 6, 25, 20, 37))
+
+        assert resolver.resolve("17:08") == datetime(2024, 7, 18, 17, 8)
@@ -380,3 +380,22 @@ class TestTSParser:
                 ],
             )
         ]
+
+    def test__resolve_dates(self) -> None:
+
+        with open("tests/fixtures/ts/ts_full.json", "r") as f:
+            data = json.load(f)
+
+        [msg] = TSParser(resolve_dates=True).parse(data)
+
+        assert [loc.time for loc in msg.locations[:2]] == [datetime(2024, 7, 18, 17, 8), datetime(2024, 7, 18, 17, 23)]
+
+    def test__lazy_with_predicates(self) -> None:
+
+        with open("tests/fixtures/ts/ts_full.json", "r") as f:
+            data = json.load(f)
+
+        [msg] = TSParser(lazy=True, predicates=[lambda service: service.rid.startswith("2024")]).parse(data)
+
+        assert msg == TSParser().parse(data)[0]
+        assert TSParser(predicates=[lambda service: service.toc == "XX"]).parse(data) == []
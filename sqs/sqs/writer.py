@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import json
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
@@ -8,6 +9,7 @@ import boto3
 import botocore
 from mypy_boto3_sqs import SQSClient
 
+from clients.aio import AsyncSinkInterface
 from clients.stomp import WriterInterface
 
 
@@ -37,6 +39,10 @@ class BufferInterface(ABC):
     @abstractmethod
     def get_messages(self, split: bool = False) -> list[BufferedMessage]: ...
 
+    @abstractmethod
+    def flush(self) -> list[BufferedMessage]:
+        """Empties the buffer, however few messages it holds."""
+
 
 @dataclass
 class Buffer(BufferInterface):
@@ -58,6 +64,13 @@ class Buffer(BufferInterface):
             return to_return
         return []
 
+    def flush(self) -> list[BufferedMessage]:
+
+        to_return = self._buffer
+        self._buffer = []
+
+        return to_return
+
 
 class SQSWriter(WriterInterface):
 
@@ -92,6 +105,35 @@ class SQSWriter(WriterInterface):
 
         self._write(msgs)
 
+    def write_batch(self, msgs: list[tuple[dict, str]]) -> None:
+
+        # Callers acknowledge the batch once this returns, so it is sent now along with anything
+        # already buffered, rather than held until the buffer fills
+        for msg, message_type in msgs:
+            self._buffer.add(BufferedMessage.create(msg, message_type))
+
+        self._write([msg_to_write.format() for msg_to_write in self._buffer.flush()])
+
     @classmethod
     def create(cls, queue_url: str) -> SQSWriter:
         return cls(boto3.client("sqs"), queue_url, Buffer())
+
+
+class SQSSink(AsyncSinkInterface):
+    """
+    Async sink sending each batch to SQS as one message, for clients.aio.AsyncPipeline. Batches
+    are sent on threads, as boto3 blocks, so concurrent batches overlap their round trips.
+    """
+
+    def __init__(self, writer: SQSWriter) -> None:
+        self._writer = writer
+
+    async def write(self, items: list[tuple[dict, str]]) -> None:
+
+        data = [BufferedMessage.create(msg, message_type).format() for msg, message_type in items]
+
+        await asyncio.to_thread(self._writer._write, data)
+
+    @classmethod
+    def create(cls, queue_url: str) -> SQSSink:
+        return cls(SQSWriter.create(queue_url))
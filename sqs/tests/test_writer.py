@@ -1,8 +1,10 @@
+import asyncio
+
 import boto3
 from freezegun import freeze_time
 from moto import mock_aws
 
-from sqs.sqs.writer import Buffer, BufferedMessage, BufferInterface, SQSWriter
+from sqs.sqs.writer import Buffer, BufferedMessage, BufferInterface, SQSSink, SQSWriter
 
 
 class MockBuffer(BufferInterface):
@@ -17,6 +19,9 @@ class MockBuffer(BufferInterface):
     def get_messages(self, split: bool = False) -> list[BufferedMessage]:
         return self._msgs
 
+    def flush(self) -> list[BufferedMessage]:
+        return self._msgs
+
 
 class BlankBuffer(BufferInterface):
 
@@ -26,6 +31,9 @@ class BlankBuffer(BufferInterface):
     def get_messages(self, split: bool = False) -> list[BufferedMessage]:
         return []
 
+    def flush(self) -> list[BufferedMessage]:
+        return []
+
 
 class TestSQSWriter:
 
@@ -67,6 +75,63 @@ class TestSQSWriter:
 
         assert "Messages" not in resp
 
+    @freeze_time("2024-08-11")
+    @mock_aws
+    def test__write_batch(self) -> None:
+
+        sqs = boto3.client("sqs")
+
+        response = sqs.create_queue(QueueName="test")
+        url = response["QueueUrl"]
+
+        writer = SQSWriter(sqs, url, MockBuffer())
+
+        writer.write_batch([({"input": "data"}, "TS"), ({"input": "more"}, "SC")])
+        resp = sqs.receive_message(QueueUrl=url, AttributeNames=["All"], MaxNumberOfMessages=10)
+
+        assert len(resp["Messages"]) == 1
+        assert resp["Messages"][0]["Body"] == (
+            '[{"input": "data", "message_type": "TS"}, {"input": "more", "message_type": "SC"}]'
+        )
+
+    @freeze_time("2024-08-11")
+    @mock_aws
+    def test__write_batch_flushes_buffer(self) -> None:
+
+        sqs = boto3.client("sqs")
+
+        response = sqs.create_queue(QueueName="test")
+        url = response["QueueUrl"]
+
+        writer = SQSWriter(sqs, url, Buffer())
+
+        writer.write({"input": "data"}, "TS")
+        writer.write_batch([({"input": "more"}, "SC")])
+        resp = sqs.receive_message(QueueUrl=url, AttributeNames=["All"], MaxNumberOfMessages=10)
+
+        assert resp["Messages"][0]["Body"] == (
+            '[{"input": "data", "message_type": "TS"}, {"input": "more", "message_type": "SC"}]'
+        )
+
+
+class TestSQSSink:
+
+    @freeze_time("2024-08-11")
+    @mock_aws
+    def test(self) -> None:
+
+        sqs = boto3.client("sqs")
+
+        response = sqs.create_queue(QueueName="test")
+        url = response["QueueUrl"]
+
+        sink = SQSSink(SQSWriter(sqs, url, BlankBuffer()))
+
+        asyncio.run(sink.write([({"input": "data"}, "TS")]))
+        resp = sqs.receive_message(QueueUrl=url, AttributeNames=["All"], MaxNumberOfMessages=10)
+
+        assert resp["Messages"][0]["Body"] == '[{"input": "data", "message_type": "TS"}]'
+
 
 class TestBuffer:
 
@@ -87,3 +152,13 @@ class TestBuffer:
             buffer.add(msg)
 
         assert buffer.get_messages() == msgs
+
+    def test__flush(self) -> None:
+
+        buffer = Buffer()
+        msg = BufferedMessage({"data": "yes"}, "TS")
+
+        buffer.add(msg)
+
+        assert buffer.flush() == [msg]
+        assert buffer.flush() == []